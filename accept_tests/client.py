@@ -1,15 +1,17 @@
 ''' mock json rpc2 client implementation '''
 import socket
-import json
 import time
 
+from context import get_codec
+
 
 class MockJsonRPC2Client:
-    def __init__(self, host, port):
+    def __init__(self, host, port, codec=None):
         self.socket = socket.socket()
         self.host = host
         self.port = port
         self.is_connected = False
+        self.codec = codec or get_codec()
 
     def connect(self, times=0):
         ''' connect to server, will try to connect 5 times,
@@ -31,7 +33,7 @@ class MockJsonRPC2Client:
                     self.is_connected = True
 
     def send_data(self, data):
-        data_bytes = json.dumps(data).encode()
+        data_bytes = self.codec.dumps(data)
         self.socket.send(data_bytes + b"\n")
 
     def send_raw_data(self, data):
@@ -43,4 +45,4 @@ class MockJsonRPC2Client:
             self.is_connected = False
 
     def recv(self):
-        return json.loads(self.socket.recv(1024).decode())
+        return self.codec.loads(self.socket.recv(1024))
@@ -3,3 +3,4 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ajson_rpc2.server import JsonRPC2
+from ajson_rpc2.codec import get_codec
@@ -0,0 +1,110 @@
+''' access log for json-rpc2 server
+
+Each record contains the peer, method, id, status and latency of a rpc call,
+which are also attached to the record as `rpc_peer`, `rpc_method`, `rpc_id`,
+`rpc_status` and `rpc_latency` attributes, so they can be used by formatters.
+The record is built only when the logger is enabled (and the call is sampled),
+so it costs nearly nothing when access log is turned off '''
+import logging
+import random
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+
+from .models.response import ErrorResponse
+from .models.batch_response import BatchResponse
+from .typedef import Any, Optional, Union
+
+ACCESS_LOGGER_NAME = "ajson_rpc2.access"
+
+
+class AccessLog:
+    '''
+    Usage example::
+
+        import logging
+        logging.getLogger("ajson_rpc2.access").setLevel(logging.INFO)
+
+        # only log 1% rpc calls
+        server = JsonRPC2(access_log=AccessLog(sample_rate=0.01))
+
+    :param logger: the logger to write access log, defaults to the "ajson_rpc2.access" logger
+    :param level: the level of access log records
+    :param sample_rate: the ratio of rpc calls to be logged, which should between 0 and 1
+    '''
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 level: int = logging.INFO,
+                 sample_rate: float = 1.0):
+        if logger is None:
+            logger = logging.getLogger(ACCESS_LOGGER_NAME)
+        self.logger = logger
+        self.level = level
+        self.sample_rate = sample_rate
+
+    def sample(self) -> bool:
+        ''' return true if the current rpc call should be logged '''
+        if not self.logger.isEnabledFor(self.level):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def log(self, peer: Any, request_json: Any,
+            response: Union[ErrorResponse, BatchResponse, Any, None],
+            latency: float,
+            status: Optional[str] = None):
+        ''' write one access log record
+
+        :param peer: the address of client
+        :param request_json: the request(or batched request) object
+        :param response: the response which is sent back to client, None for notifications
+        :param latency: how long the rpc call takes, in seconds
+        :param status: the status of rpc call, defaults to the status of *response*, it's
+                       given when the response is not kept (like the streamed batch response)
+        '''
+        if isinstance(request_json, list):
+            method = f'batch[{len(request_json)}]'
+            req_id = None
+        elif isinstance(request_json, dict):
+            method = request_json.get('method')
+            req_id = request_json.get('id')
+        else:
+            method = None
+            req_id = None
+
+        if status is None:
+            if response is None:
+                status = "-"
+            elif isinstance(response, ErrorResponse):
+                status = response.error.err_code
+            elif isinstance(response, BatchResponse):
+                status = f'errors={sum(1 for resp in response if isinstance(resp, ErrorResponse))}'
+            else:
+                status = "ok"
+
+        self.logger.log(self.level, '%s %s id=%s status=%s %.3fms',
+                        peer, method, req_id, status, latency * 1000,
+                        extra={
+                            "rpc_peer": peer,
+                            "rpc_method": method,
+                            "rpc_id": req_id,
+                            "rpc_status": status,
+                            "rpc_latency": latency
+                        })
+
+
+def use_queue_handler(*handlers: logging.Handler,
+                      logger: Optional[logging.Logger] = None) -> QueueListener:
+    ''' make the logger only put records to a queue(the records are not propagated to
+    the parent loggers), and the records will be handled by *handlers* in a background
+    thread, so writing log doesn't block the event loop.  The returned listener is
+    started already, call `listener.stop()` to flush and stop it
+
+    :param handlers: the handlers which actually handle records
+    :param logger: the logger to change, defaults to the "ajson_rpc2.access" logger
+    '''
+    if logger is None:
+        logger = logging.getLogger(ACCESS_LOGGER_NAME)
+    queue = Queue()
+    logger.addHandler(QueueHandler(queue))
+    logger.propagate = False
+    listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,167 @@
+''' admission control for json-rpc2 server, which limits the number of connections
+and in-flight calls of the whole server, so the latency stays bounded when the
+server is overloaded, the excess requests are rejected with ServerBusyError fast
+
+A request(or batched request) is admitted as a whole, it takes one slot for each
+call in it, both in the global limit and in the limit of its method.  When the
+slots are not enough, the request waits in a bounded FIFO queue, and it's rejected
+when the queue is full or it waits longer than *queue_timeout* '''
+import asyncio
+from collections import deque
+
+from .models.errors import ServerBusyError
+from .typedef import Dict, List, Optional
+
+
+class Admission:
+    ''' the slots held by an admitted request, which should be released
+    by `AdmissionControl.release` when the request is completed '''
+    __slots__ = ('calls', 'method_calls')
+
+    def __init__(self, calls: int, method_calls: Dict[str, int]):
+        self.calls = calls
+        self.method_calls = method_calls
+
+
+class AdmissionControl:
+    '''
+    Usage example::
+
+        admission = AdmissionControl(max_connections=1000,
+                                     max_inflight=256,
+                                     method_limits={"report": 4},
+                                     max_queue=128,
+                                     queue_timeout=0.5)
+        server = JsonRPC2(admission=admission)
+
+    :param max_connections: the max number of connections, the connections beyond it
+                            receive a ServerBusyError and are closed.  None means no limit
+    :param max_inflight: the max number of calls which are running at the same time in
+                         the server.  None means no limit
+    :param method_limits: the map of method name to the max number of its calls which are
+                          running at the same time, the name is the one used in requests
+                          (like "module.method")
+    :param max_queue: the max number of requests which wait for the slots, the requests
+                      beyond it are rejected immediately.  Defaults is 0, which rejects the
+                      request as soon as the limit is reached
+    :param queue_timeout: the max seconds a request waits in the queue, None means it
+                          waits until it's admitted
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, max_connections: Optional[int] = None,
+                 max_inflight: Optional[int] = None,
+                 method_limits: Optional[Dict[str, int]] = None,
+                 max_queue: int = 0,
+                 queue_timeout: Optional[float] = None):
+        self.max_connections = max_connections
+        self.max_inflight = max_inflight
+        self.method_limits = method_limits or {}
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.connections = 0
+        self.inflight = 0
+        # method name -> the number of its running calls, only for the limited methods
+        self.method_inflight = {}
+        # the number of rejected connections and requests
+        self.rejected = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self) -> int:
+        ''' the number of requests waiting in the queue '''
+        return len(self._waiters)
+
+    def open_connection(self) -> bool:
+        ''' count a new connection, return False if the connection should be rejected '''
+        if self.max_connections is not None and self.connections >= self.max_connections:
+            self.rejected += 1
+            return False
+        self.connections += 1
+        return True
+
+    def close_connection(self):
+        ''' a connection which is accepted by `open_connection` is closed '''
+        self.connections -= 1
+
+    async def acquire(self, methods: List[Optional[str]]) -> Admission:
+        ''' take the slots for the calls of *methods* in a request, wait in the queue
+        if the slots are not enough, and raise ServerBusyError when the request is
+        rejected.  The name of method is None for the invalid call '''
+        admission = self._make_admission(methods)
+        # the queue is FIFO, so the new request can't go ahead of the waiting ones
+        if not self._waiters and self._can_admit(admission):
+            self._take(admission)
+            return admission
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusyError("Server busy")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (admission, waiter)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # it's admitted right before it's cancelled
+                self.release(admission)
+            else:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                # the requests behind it may be admitted now
+                self._wake_waiters()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise ServerBusyError("Server busy")
+            raise
+        return admission
+
+    def release(self, admission: Admission):
+        ''' give back the slots of a completed request, and admit the waiting requests '''
+        self.inflight -= admission.calls
+        for method, calls in admission.method_calls.items():
+            self.method_inflight[method] -= calls
+        self._wake_waiters()
+
+    def _make_admission(self, methods: List[Optional[str]]) -> Admission:
+        ''' the request which has more calls than a limit takes all the slots of
+        that limit, so it's still admitted when the server is idle '''
+        calls = len(methods)
+        if self.max_inflight is not None:
+            calls = min(calls, self.max_inflight)
+        method_calls = {}
+        if self.method_limits:
+            for method in methods:
+                if method in self.method_limits:
+                    method_calls[method] = method_calls.get(method, 0) + 1
+            for method in method_calls:
+                method_calls[method] = min(method_calls[method], self.method_limits[method])
+        return Admission(calls, method_calls)
+
+    def _can_admit(self, admission: Admission) -> bool:
+        if self.max_inflight is not None and self.inflight + admission.calls > self.max_inflight:
+            return False
+        for method, calls in admission.method_calls.items():
+            if self.method_inflight.get(method, 0) + calls > self.method_limits[method]:
+                return False
+        return True
+
+    def _take(self, admission: Admission):
+        self.inflight += admission.calls
+        for method, calls in admission.method_calls.items():
+            self.method_inflight[method] = self.method_inflight.get(method, 0) + calls
+
+    def _wake_waiters(self):
+        ''' admit the waiting requests in order, until the head of queue can't be admitted '''
+        waiters = self._waiters
+        while waiters:
+            admission, waiter = waiters[0]
+            if waiter.done():
+                # it's cancelled, the request is rejected already
+                waiters.popleft()
+                continue
+            if not self._can_admit(admission):
+                return
+            waiters.popleft()
+            self._take(admission)
+            waiter.set_result(None)
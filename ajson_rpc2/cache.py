@@ -0,0 +1,154 @@
+''' result cache for the rpc methods which are pure functions of their params
+
+The results are keyed on the method name and the canonical JSON of params (the
+keys of objects are sorted), so ``{"a": 1, "b": 2}`` and ``{"b": 2, "a": 1}`` share
+one entry, but the positional and named params of the same call don't.  Only the
+successful results are cached, the errors (including timeout) are sent back to the
+callers and the next call executes the method again.
+
+The concurrent calls with the same key share one execution (single-flight), the
+first call executes the method, and others wait for its result, so a slow method
+isn't executed many times when its entry is missing or expired '''
+import asyncio
+import functools
+import json
+import time
+from collections import OrderedDict
+
+from .typedef import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# the key of a cached result, the method name and the canonical JSON of params
+CacheKey = Tuple[str, str]
+
+
+class ResultCache:
+    '''
+    Usage example::
+
+        # cache at most 1024 results, which expire after 60 seconds
+        @server.rpc_call(cache=ResultCache(max_size=1024, ttl=60))
+        def get_user(user_id):
+            return query_user(user_id)
+
+        # use the default cache
+        @server.rpc_call(cache=True)
+        def fib(n):
+            return fib_impl(n)
+
+        # the results are stale after the user is updated
+        server.invalidate_cache("get_user", [user_id])
+
+    A cache can be shared by the methods with different names.  The cached result is
+    sent to all the callers of the same key, so the method should not return an object
+    which is mutated later.
+
+    :param max_size: the max number of cached results, the least recently used result is
+                     evicted when it's exceeded.  None means no limit.  Defaults is 1024
+    :param ttl: the seconds a result can be used after it's cached, None means it doesn't
+                expire
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, max_size: Optional[int] = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (result, expire time), in the order of use, the least recently used first
+        self._entries = OrderedDict()
+        # key -> the task which executes the method
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        # the calls which wait for the execution of an identical call
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(method_name: str, params: Any) -> CacheKey:
+        ''' return the cache key of calling *method_name* with *params* '''
+        return method_name, json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        ''' return (True, result) if the result of *key* is cached and not expired,
+        otherwise return (False, None), the hits and misses are not counted '''
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        result, expire_time = entry
+        if expire_time is not None and expire_time <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, result
+
+    def set(self, key: CacheKey, result: Any):
+        ''' cache the *result* of *key*, and evict the least recently used results
+        if the cache is full '''
+        expire_time = None if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = (result, expire_time)
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_call(self, key: CacheKey, func: Callable[[], Awaitable]) -> Any:
+        ''' return the cached result of *key*, if it's not cached, run *func* to get the
+        result, the concurrent calls of the same key wait for the same run.  The run
+        isn't cancelled when a caller is cancelled, so others can still get the result '''
+        found, result = self.get(key)
+        if found:
+            self.hits += 1
+            return result
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._on_call_done, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _on_call_done(self, key: CacheKey, task: asyncio.Future):
+        # the run which is started before invalidation can't fill the cache
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    def invalidate(self, method_name: Optional[str] = None, params: Any = None) -> int:
+        ''' drop the cached results, and return the number of dropped results
+
+        :param method_name: drop the results of this method, None means all results
+        :param params: drop the result of calling *method_name* with these params,
+                       None means all the results of *method_name*
+        '''
+        if method_name is None:
+            keys = list(self._entries)
+            self._inflight.clear()
+        elif params is not None:
+            keys = [self.make_key(method_name, params)]
+            self._inflight.pop(keys[0], None)
+        else:
+            keys = [key for key in self._entries if key[0] == method_name]
+            for key in [key for key in self._inflight if key[0] == method_name]:
+                del self._inflight[key]
+
+        dropped = 0
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                dropped += 1
+        return dropped
+
+    def to_json(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions
+        }
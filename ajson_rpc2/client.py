@@ -0,0 +1,449 @@
+''' asyncio json-rpc2 client, which keeps a pool of connections to the server,
+and multiplexes the calls over them, so the calls don't wait for each other
+and don't open a socket for each call
+
+The responses of a connection are read by a background task, and dispatched to
+the waiting calls by id, so the server can send them back in any order (the server
+should enable pipelining to run the calls of a connection concurrently) '''
+import asyncio
+import itertools
+import logging
+from asyncio import StreamReader, StreamWriter, Future, IncompleteReadError
+
+from .codec import JsonCodec, get_codec
+from .framing import Framer, NewlineFramer, FrameError
+from .models.errors import error_from_json
+from .typedef import Any, Dict, List, Optional, Union, Tuple
+
+logger = logging.getLogger(__name__)
+
+Params = Union[List, Dict, None]
+
+
+class ClientConnection:
+    '''
+    One connection to the server, the calls are written to the connection
+    directly, and the responses are dispatched to the futures of calls by id
+
+    :param reader: the StreamReader of connection
+    :param writer: the StreamWriter of connection
+    :param framer: the framer to split the responses and frame the requests
+    :param codec: the json codec to dump requests and load responses
+    :param max_response_size: the max bytes of one response(or batched response)
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, reader: StreamReader, writer: StreamWriter,
+                 framer: Framer, codec: JsonCodec,
+                 max_response_size: Optional[int] = None):
+        self.reader = reader
+        self.writer = writer
+        self.framer = framer
+        self.codec = codec
+        self.max_response_size = max_response_size
+        # request id -> the future of its result
+        self.pending = {}
+        self.closed = False
+        self._read_task = asyncio.ensure_future(self._read_responses())
+
+    @property
+    def inflight(self) -> int:
+        ''' the number of calls which are waiting for responses '''
+        return len(self.pending)
+
+    async def send(self, payload: Union[Dict, List], ids: List[Any],
+                   futures: Optional[List[Future]] = None) -> List[Future]:
+        ''' send a request(or batched request), and return the futures of results for *ids*,
+        which are the ids of calls in the request, the notifications have no future
+
+        :param futures: the futures to complete with the results of *ids*, defaults to new futures
+        '''
+        if self.closed:
+            raise ConnectionError('connection is closed')
+        if futures is None:
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for _ in ids]
+        for req_id, future in zip(ids, futures):
+            self.pending[req_id] = future
+        try:
+            self.writer.write(self.framer.frame(self.codec.dumps(payload)))
+            await self.writer.drain()
+        except Exception as e:
+            for req_id in ids:
+                self.pending.pop(req_id, None)
+            # the connection is broken
+            self.closed = True
+            self.writer.close()
+            self._fail_pending(ConnectionError(f'connection is broken: {e}'))
+            raise
+        return futures
+
+    def forget(self, req_id: Any):
+        ''' stop waiting for the response of *req_id*, like when the call is timed out '''
+        self.pending.pop(req_id, None)
+
+    async def close(self):
+        ''' close the connection, the calls waiting for responses fail with ConnectionError '''
+        self.closed = True
+        self.writer.close()
+        self._fail_pending(ConnectionError('connection is closed'))
+        self._read_task.cancel()
+        try:
+            await self._read_task
+        except asyncio.CancelledError:
+            pass
+
+    async def _read_responses(self):
+        error = ConnectionError('connection is closed by server')
+        try:
+            while True:
+                response_raw = await self.framer.read_frame(self.reader, self.max_response_size)
+                if not response_raw:
+                    break
+                try:
+                    response_json = self.codec.loads(response_raw)
+                except self.codec.decode_errors as e:
+                    logger.error('invalid response from server: %s', e)
+                    continue
+                if isinstance(response_json, list):
+                    for item in response_json:
+                        self._dispatch_response(item)
+                else:
+                    self._dispatch_response(response_json)
+        except (FrameError, IncompleteReadError, ConnectionError) as e:
+            # the response which is lost can't be known, so the connection is dropped
+            error = ConnectionError(f'connection is broken: {e}')
+        finally:
+            self.closed = True
+            self.writer.close()
+            self._fail_pending(error)
+
+    def _dispatch_response(self, response_json: Any):
+        if not isinstance(response_json, dict):
+            logger.error('invalid response from server: %r', response_json)
+            return
+        req_id = response_json.get('id')
+        if 'error' in response_json and req_id in (None, 'null'):
+            # the server can't tell which request is failed (like the request which
+            # is too large or can't be parsed), so the calls waiting on the
+            # connection fail with the error instead of waiting forever
+            logger.warning('error response without id: %r', response_json)
+            self._fail_pending(error_from_json(response_json['error']))
+            return
+        future = self.pending.pop(req_id, None)
+        if future is None:
+            # like the response of the call which is timed out
+            if 'error' in response_json:
+                logger.warning('error response without pending call: %r', response_json)
+            return
+        if future.done():
+            return
+        if 'error' in response_json:
+            future.set_exception(error_from_json(response_json['error']))
+        else:
+            future.set_result(response_json.get('result'))
+
+    def _fail_pending(self, error: Exception):
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class JsonRPC2Client:
+    '''
+    Usage example::
+
+        async with JsonRPC2Client("localhost", 9999) as client:
+            result = await client.call("subtract", [42, 23])
+            await client.notify("log", {"message": "hello"})
+
+            batch = client.batch()
+            subtract = batch.call("subtract", [42, 23])
+            add = batch.call("add", [1, 2])
+            batch.notify("log", {"message": "hello"})
+            await batch.send()
+            subtract.result(), add.result()
+
+    When *coalesce_delay* is given, the calls and notifications issued in the delay are
+    sent as one batched request transparently, which saves the framing, syscalls and
+    dispatching of server for the chatty client::
+
+        client = JsonRPC2Client("localhost", 9999, coalesce_delay=0.001, max_batch_size=64)
+        # sent as one batched request
+        await asyncio.gather(*[client.call("add", [i, i]) for i in range(10)])
+
+    The error response of a call is raised as the JsonRPC2Error subclass of its code
+    (like MethodNotFoundError), and the calls fail with ConnectionError when the
+    connection is broken
+
+    :param host: the host of server
+    :param port: the port of server
+    :param pool_size: the max number of connections, a new connection is opened when all
+                      connections have calls waiting for responses.  Defaults is 1
+    :param framer: an instance of ajson_rpc2.framing.Framer, which should be the same as
+                   the server.  Defaults is None, which will use NewlineFramer
+    :param codec: an instance of ajson_rpc2.codec.JsonCodec.  Defaults is None, which will use
+                  orjson or ujson if it's installed, otherwise the json module in standard library
+    :param timeout: the default max seconds to wait for the result of a call, None means no limit
+    :param max_response_size: the max bytes of one response(or batched response).  Defaults is 16 MiB
+    :param coalesce_delay: the max seconds a call waits to be coalesced with the following calls,
+                           0 means the calls issued in the same loop iteration are coalesced.
+                           Defaults is None, which sends each call immediately
+    :param max_batch_size: the max number of calls and notifications coalesced into one batched
+                           request, they are sent immediately when the limit is reached
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, host: str, port: int,
+                 pool_size: int = 1,
+                 framer: Framer = None,
+                 codec: JsonCodec = None,
+                 timeout: Optional[float] = None,
+                 max_response_size: int = 2 ** 24,
+                 coalesce_delay: Optional[float] = None,
+                 max_batch_size: int = 64):
+        if framer is None:
+            framer = NewlineFramer()
+        if codec is None:
+            codec = get_codec()
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.framer = framer
+        self.codec = codec
+        self.timeout = timeout
+        self.max_response_size = max_response_size
+        self.coalesce_delay = coalesce_delay
+        self.max_batch_size = max_batch_size
+        self.connections = []
+        self._ids = itertools.count(1)
+        self._connect_lock = None
+        # the (request, id, future) of calls to be coalesced, the id
+        # and future of notification are None
+        self._coalesced = []
+        self._flush_handle = None
+        self._flush_tasks = set()
+
+    async def __aenter__(self) -> 'JsonRPC2Client':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def next_id(self) -> int:
+        ''' allocate an id for a call, which is unique in this client '''
+        return next(self._ids)
+
+    async def call(self, method: str, params: Params = None,
+                   timeout: Optional[float] = None) -> Any:
+        ''' call *method* with *params*, and return the result
+
+        :param timeout: the max seconds to wait for the result, defaults to the timeout of client,
+                        asyncio.TimeoutError is raised when it's expired
+        '''
+        req_id = self.next_id()
+        request = self._make_request(method, params, req_id)
+        if self.coalesce_delay is not None:
+            future = asyncio.get_running_loop().create_future()
+            self._coalesce(request, req_id, future)
+            try:
+                return await self._wait(future, timeout)
+            finally:
+                for connection in self.connections:
+                    connection.forget(req_id)
+
+        connection = await self.get_connection()
+        [future] = await connection.send(request, [req_id])
+        try:
+            return await self._wait(future, timeout)
+        finally:
+            connection.forget(req_id)
+
+    async def notify(self, method: str, params: Params = None):
+        ''' send a notification, which has no response.  When the calls are coalesced,
+        it returns before the notification is sent '''
+        request = self._make_request(method, params)
+        if self.coalesce_delay is not None:
+            self._coalesce(request, None, None)
+            return
+        connection = await self.get_connection()
+        await connection.send(request, [])
+
+    def batch(self) -> 'BatchCall':
+        ''' return a new BatchCall, the calls and notifications added to it
+        are sent as one batched request '''
+        return BatchCall(self)
+
+    async def get_connection(self) -> ClientConnection:
+        ''' return the connection which has the least calls waiting for responses,
+        a new connection is opened when all connections are busy and the pool is not full '''
+        connection = self._pick_connection()
+        if connection is not None:
+            return connection
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            # another call may open a connection while waiting for the lock
+            connection = self._pick_connection()
+            if connection is None:
+                connection = await self._open_connection()
+                self.connections.append(connection)
+            return connection
+
+    def _pick_connection(self) -> Optional[ClientConnection]:
+        ''' return the connection which has the least calls waiting for responses, or None
+        if a new connection should be opened '''
+        connections = self.connections = [connection for connection in self.connections
+                                          if not connection.closed]
+        if not connections:
+            return None
+        connection = min(connections, key=lambda connection: connection.inflight)
+        if connection.inflight == 0 or len(connections) >= self.pool_size:
+            return connection
+        return None
+
+    def flush(self):
+        ''' send the coalesced calls and notifications now '''
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # the call which is timed out or cancelled before it's sent is dropped
+        coalesced = [item for item in self._coalesced if item[2] is None or not item[2].done()]
+        self._coalesced = []
+        if not coalesced:
+            return
+        task = asyncio.ensure_future(self._send_coalesced(coalesced))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _coalesce(self, request: Dict, req_id: Any, future: Optional[Future]):
+        self._coalesced.append((request, req_id, future))
+        if len(self._coalesced) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.coalesce_delay > 0:
+                self._flush_handle = loop.call_later(self.coalesce_delay, self.flush)
+            else:
+                self._flush_handle = loop.call_soon(self.flush)
+
+    async def _send_coalesced(self, coalesced: List[Tuple[Dict, Any, Optional[Future]]]):
+        ''' send the coalesced calls as one batched request, the single call is
+        sent as a request, the responses complete the futures of calls by id '''
+        if len(coalesced) == 1:
+            payload = coalesced[0][0]
+        else:
+            payload = [request for request, _, _ in coalesced]
+        ids = [req_id for _, req_id, future in coalesced if future is not None]
+        futures = [future for _, _, future in coalesced if future is not None]
+        try:
+            connection = await self.get_connection()
+            await connection.send(payload, ids, futures)
+        except Exception as e:
+            if not futures:
+                logger.error('failed to send notifications: %s', e)
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        ''' send the coalesced calls, then close all connections '''
+        self.flush()
+        if self._flush_tasks:
+            await asyncio.wait(self._flush_tasks)
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def _open_connection(self) -> ClientConnection:
+        # the reader of NewlineFramer buffers the whole response line, so the
+        # limit of reader should allow the largest response
+        reader, writer = await asyncio.open_connection(self.host, self.port,
+                                                       limit=self.max_response_size)
+        return ClientConnection(reader, writer, self.framer, self.codec, self.max_response_size)
+
+    def _make_request(self, method: str, params: Params, req_id: Any = None) -> Dict:
+        request = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            request["params"] = params
+        if req_id is not None:
+            request["id"] = req_id
+        return request
+
+    async def _wait(self, future: Future, timeout: Optional[float]) -> Any:
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    def _make_batch(self, requests: List[Tuple[str, Params, bool]]) -> Tuple[List, List]:
+        ''' make the batched request of (method, params, is_notification) *requests*,
+        return the batched request and the ids of calls in it '''
+        payload = []
+        ids = []
+        for method, params, is_notification in requests:
+            if is_notification:
+                payload.append(self._make_request(method, params))
+            else:
+                req_id = self.next_id()
+                ids.append(req_id)
+                payload.append(self._make_request(method, params, req_id))
+        return payload, ids
+
+
+class BatchCall:
+    '''
+    Collect calls and notifications, and send them as one batched request,
+    created by `JsonRPC2Client.batch`
+
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, client: JsonRPC2Client):
+        self.client = client
+        self._requests = []
+        self._futures = []
+
+    def call(self, method: str, params: Params = None) -> Future:
+        ''' add a call, and return the future of its result, which is
+        completed after the batch is sent '''
+        future = asyncio.get_running_loop().create_future()
+        self._requests.append((method, params, False))
+        self._futures.append(future)
+        return future
+
+    def notify(self, method: str, params: Params = None):
+        ''' add a notification '''
+        self._requests.append((method, params, True))
+
+    async def send(self, timeout: Optional[float] = None,
+                   return_exceptions: bool = False) -> List[Any]:
+        ''' send the batch, and return the results of calls in the order they are added,
+        the first error is raised unless *return_exceptions* is True, then the errors
+        are returned as results
+
+        :param timeout: the max seconds to wait for the results, defaults to the timeout of
+                        client, asyncio.TimeoutError is raised when it's expired
+        '''
+        if not self._requests:
+            return []
+        payload, ids = self.client._make_batch(self._requests)
+        connection = await self.client.get_connection()
+        sent_futures = await connection.send(payload, ids)
+        if timeout is None:
+            timeout = self.client.timeout
+        try:
+            if sent_futures:
+                await asyncio.wait(sent_futures, timeout=timeout)
+        finally:
+            for req_id in ids:
+                connection.forget(req_id)
+
+        for future, sent_future in zip(self._futures, sent_futures):
+            if not sent_future.done():
+                future.set_exception(asyncio.TimeoutError())
+            elif sent_future.exception() is not None:
+                future.set_exception(sent_future.exception())
+            else:
+                future.set_result(sent_future.result())
+        return await asyncio.gather(*self._futures, return_exceptions=return_exceptions)
@@ -0,0 +1,104 @@
+''' json codec for json-rpc2, the codec works directly on bytes,
+so it can load the request body and dump the response body
+without an intermediate str object.
+
+If orjson or ujson is installed, it will be used automatically,
+otherwise the json module in standard library is used.  The objects which
+the fast codecs can't dump (like the integers beyond 64 bits) are dumped by
+the json module, so the responses are the same whichever codec is used '''
+import json
+from .typedef import Any, Optional
+
+
+class JsonCodec:
+    ''' base class for the json codec '''
+    name = None
+    # the errors which will be raised when loads an invalid json document
+    decode_errors = (ValueError, TypeError)
+    # the errors which will be raised when dumps an object which can't be serialized
+    encode_errors = (ValueError, TypeError, OverflowError)
+
+    def loads(self, data: bytes) -> Any:
+        ''' convert json document in bytes to python object '''
+        raise NotImplementedError()
+
+    def dumps(self, obj: Any) -> bytes:
+        ''' convert python object to json document in bytes '''
+        raise NotImplementedError()
+
+
+class StdlibCodec(JsonCodec):
+    ''' codec which is based on the json module in standard library '''
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+class UjsonCodec(JsonCodec):
+    ''' codec which is based on ujson '''
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data: bytes) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._ujson.dumps(obj, ensure_ascii=False).encode()
+        except (TypeError, OverflowError):
+            # like the integers beyond 64 bits, which can be dumped by the json module
+            return json.dumps(obj, ensure_ascii=False).encode()
+
+
+class OrjsonCodec(JsonCodec):
+    ''' codec which is based on orjson, orjson loads from bytes
+    and dumps to bytes natively '''
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.loads = orjson.loads
+        self._dumps = orjson.dumps
+        # the keys of dict which are not str are converted to str, like the json module
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._dumps(obj, option=self._option)
+        except TypeError:   # orjson.JSONEncodeError is a subclass of TypeError
+            # like the integers beyond 64 bits, which can be dumped by the json module
+            return json.dumps(obj, ensure_ascii=False).encode()
+
+
+_CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    StdlibCodec.name: StdlibCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    ''' create and return a json codec
+
+    :param name: the name of codec, which can be "orjson", "ujson" or "json".  If the name is None,
+                 the fastest codec which is installed will be returned
+    '''
+    if name is not None:
+        try:
+            codec_class = _CODECS[name]
+        except KeyError:
+            raise ValueError(f'The codec "{name}" is not supported')
+        return codec_class()
+
+    for codec_class in _CODECS.values():
+        try:
+            return codec_class()
+        except ImportError:
+            continue
@@ -1,8 +1,9 @@
 ''' basic container '''
 import functools
 
+from .cache import ResultCache
 from .method import ExtraNeed, RpcMethod
-from .typedef import Callable
+from .typedef import Callable, Optional, Union
 
 
 class _MethodContainer:
@@ -10,7 +11,8 @@ class _MethodContainer:
     def __init__(self):
         self.methods = {}
 
-    def rpc_call(self, func):
+    def rpc_call(self, func: Callable = None, *, timeout: Optional[float] = None,
+                 cache: Union[bool, ResultCache, None] = None):
         '''
         decorator function to make a function rpc_callable
         Usage example::
@@ -25,17 +27,35 @@ class _MethodContainer:
             async def io_bound_call(num1):
                 await asyncio.sleep(3)
                 return num1
+
+            # the call will fail with timeout error after 5 seconds
+            @server.rpc_call(timeout=5)
+            async def slow_call():
+                await asyncio.sleep(10)
+
+            # the results are cached, the method is executed once for the same params
+            @server.rpc_call(cache=True)
+            def fib(n):
+                return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+        .. versionadded:: 0.6
+           The timeout and cache parameters were added
         '''
+        if func is None:
+            return functools.partial(self.rpc_call, timeout=timeout, cache=cache)
+
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
             return func(*args, **kwargs)
-        self.add_method(func)
+        self.add_method(func, timeout=timeout, cache=cache)
         return wrapped
 
     def add_method(self, method,
                    restrict=True,
                    need_multiprocessing=False,
-                   need_multithreading=False):
+                   need_multithreading=False,
+                   timeout: Optional[float] = None,
+                   cache: Union[bool, ResultCache, None] = None):
         ''' add method to json rpc, to make it rpc callable
 
         :param method: which method to be rpc callable
@@ -51,8 +71,20 @@ class _MethodContainer:
                                     is useful for the IO-bound method.  When all need_multiprocessing
                                     and need_multithreading are True, the method will be added as
                                     need multiprocessing method
+        :param timeout: the max seconds the method can run, when it's expired, a timeout error is
+                        sent back, the async function is cancelled, and the process pool is
+                        recycled for the method which need multiprocessing (the function running
+                        in a thread can't be stopped, only the result is dropped).  The timeout
+                        can't be applied to the sync function which doesn't need multiprocessing
+                        or multithreading.  Defaults is None, which uses the default timeout of server
+        :param cache: an instance of ajson_rpc2.cache.ResultCache, which caches the results of
+                      method by its params, it should only be used for the method which is a pure
+                      function of params.  True means a ResultCache with the default size and no
+                      ttl.  Defaults is None, which executes the method for each call
         .. versionadded:: 0.3
            The `need_multiprocessing`, `need_multithreading` parameters were added
+        .. versionadded:: 0.6
+           The `timeout` and `cache` parameters were added
         '''
         if need_multiprocessing:
             extra_need = ExtraNeed.PROCESS
@@ -60,11 +92,15 @@ class _MethodContainer:
             extra_need = ExtraNeed.THREAD
         else:
             extra_need = ExtraNeed.NOTHING
+        if cache is True:
+            cache = ResultCache()
+        elif cache is False:
+            cache = None
 
         if restrict and method.__name__ in self.methods:
             raise ValueError("The method is existed")
         else:
-            self.methods[method.__name__] = RpcMethod(method, extra_need)
+            self.methods[method.__name__] = RpcMethod(method, extra_need, timeout, cache)
 
     def get_rpc_method(self, method_name: str) -> RpcMethod:
         ''' get and return the instance of RpcMethod which is directly in the Container
@@ -0,0 +1,155 @@
+''' framing for json-rpc2 messages, which splits the byte stream of
+a connection into messages, and frames the messages to be sent
+
+Two framers are provided:
+
+NewlineFramer
+    each message is one line, which is the default framer
+ContentLengthFramer
+    each message is preceded by a `Content-Length` header, which is the base
+    protocol of language server protocol, so the message can contain newlines
+'''
+from asyncio import StreamReader, IncompleteReadError, LimitOverrunError
+
+from .typedef import Optional
+
+# the size of chunks read when discarding an oversized message
+DISCARD_CHUNK_SIZE = 2 ** 16
+
+
+class FrameError(Exception):
+    ''' the byte stream doesn't follow the framing protocol '''
+
+
+class FrameTooLarge(FrameError):
+    ''' the message exceeds the max size, it's discarded already,
+    so the following messages can still be read '''
+
+
+class Framer:
+    ''' base class for the framer '''
+    # True if frame() only appends a terminator to the payload, then the payload
+    # can be written in pieces, and only the last piece is framed
+    streaming = False
+
+    async def read_frame(self, reader: StreamReader, max_size: Optional[int] = None) -> bytes:
+        ''' read and return the content of one message,
+        return empty bytes when the connection is closed.  When the content
+        is larger than *max_size* bytes, the message should be discarded
+        without buffering it fully, and FrameTooLarge is raised '''
+        raise NotImplementedError()
+
+    def frame(self, payload: bytes) -> bytes:
+        ''' return the bytes to be sent for message *payload* '''
+        raise NotImplementedError()
+
+
+class NewlineFramer(Framer):
+    ''' each message is one line, so the message can't contain newline.
+    The line is buffered by the reader until the newline is found, so the limit of
+    reader should not be larger than *max_size* (the server creates the reader with
+    the limit of max request size), then the oversized line is discarded when the
+    buffer exceeds the limit '''
+    streaming = True
+
+    async def read_frame(self, reader: StreamReader, max_size: Optional[int] = None) -> bytes:
+        try:
+            line = await reader.readuntil(b'\n')
+        except IncompleteReadError as e:
+            # the last line without newline
+            line = e.partial
+        except LimitOverrunError as e:
+            await self._discard_line(reader, e.consumed)
+            raise FrameTooLarge('message exceeds the limit of reader')
+
+        # the newline is not counted, as the limit of reader
+        if max_size is not None and len(line) > max_size + 1:
+            raise FrameTooLarge(f'message exceeds the max size {max_size}')
+        return line
+
+    async def _discard_line(self, reader: StreamReader, consumed: int):
+        ''' discard the data until the next newline, *consumed* bytes of the
+        buffered data are known to be in the current line '''
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b'\n')
+                return
+            except IncompleteReadError:
+                return
+            except LimitOverrunError as e:
+                consumed = e.consumed
+
+    def frame(self, payload: bytes) -> bytes:
+        return payload + b'\n'
+
+
+class ContentLengthFramer(Framer):
+    '''
+    each message is preceded by headers, and the `Content-Length` header
+    is required, which is the length of content in bytes.  Each header line
+    ends with CRLF, and the headers end with an empty line, for example::
+
+        Content-Length: 45
+
+        {"jsonrpc": "2.0", "method": "exit", "id": 1}
+
+    The content is read with readexactly, so it doesn't need to be scanned.
+    .. versionadded:: 0.6
+    '''
+    async def read_frame(self, reader: StreamReader, max_size: Optional[int] = None) -> bytes:
+        content_length = self._parse_content_length(await self._read_headers(reader))
+        if content_length is None:
+            return b''  # Client close connection
+        if max_size is not None and content_length > max_size:
+            await self._discard_content(reader, content_length)
+            raise FrameTooLarge(f'message exceeds the max size {max_size}')
+        try:
+            return await reader.readexactly(content_length)
+        except IncompleteReadError:
+            # the connection is closed in the middle of message
+            return b''
+
+    async def _discard_content(self, reader: StreamReader, content_length: int):
+        ''' discard the content in chunks, so it's never buffered fully '''
+        while content_length > 0:
+            chunk = await reader.read(min(content_length, DISCARD_CHUNK_SIZE))
+            if not chunk:
+                return  # Client close connection
+            content_length -= len(chunk)
+
+    def frame(self, payload: bytes) -> bytes:
+        return b'Content-Length: %d\r\n\r\n' % len(payload) + payload
+
+    async def _read_headers(self, reader: StreamReader):
+        ''' read and return the header lines of message, return None when
+        the connection is closed before any header is read '''
+        headers = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                if headers:
+                    raise FrameError('connection is closed in the middle of headers')
+                return None
+            line = line.strip()
+            if line:
+                headers.append(line)
+            elif headers:
+                # empty line after headers, the content begins
+                return headers
+
+    def _parse_content_length(self, headers):
+        if headers is None:
+            return None
+        for header in headers:
+            name, _, value = header.partition(b':')
+            if name.strip().lower() == b'content-length':
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    raise FrameError(f'invalid Content-Length header {header!r}')
+                if content_length <= 0:
+                    # the message can't be empty
+                    raise FrameError(f'invalid Content-Length header {header!r}')
+                return content_length
+        raise FrameError('Content-Length header is required')
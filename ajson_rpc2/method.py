@@ -1,6 +1,9 @@
 import enum
 import asyncio
-from typing import Callable, Any
+from typing import Callable, Any, Optional
+
+from .signature import MethodSignature
+from .cache import ResultCache
 
 
 class ExtraNeed(enum.Enum):
@@ -13,11 +16,26 @@ class ExtraNeed(enum.Enum):
 class RpcMethod:
     ''' wrap for rpc function, which includes more informations
     it contains which way we need to invoke the rpc method
-    like run it in separate process, or run it in separate thread '''
-    def __init__(self, func: Callable[..., Any], extra_need: ExtraNeed):
+    like run it in separate process, or run it in separate thread
+
+    The signature of the function is computed once, and the params validator
+    which is built from it is used to check the params of each request
+
+    :param timeout: the max seconds the method can run, None means the default
+                    timeout of server is used
+    :param cache: the ResultCache which caches the results of method, None means
+                  the method is executed for each call '''
+    def __init__(self, func: Callable[..., Any], extra_need: ExtraNeed,
+                 timeout: Optional[float] = None,
+                 cache: Optional[ResultCache] = None):
         self.func = func
+        self.timeout = timeout
+        self.cache = cache
         self.name = func.__name__
-        if asyncio.iscoroutinefunction(func):
+        self.is_coroutine = asyncio.iscoroutinefunction(func)
+        self.signature = MethodSignature(func)
+        self.is_params_invalid = self.signature.compile_validator()
+        if self.is_coroutine:
             self.extra_need = ExtraNeed.NOTHING
         else:
             self.extra_need = extra_need
@@ -0,0 +1,225 @@
+''' metrics for json-rpc2 server, which records the calls, errors and latency
+of each rpc method, and the gauges (like open connections) and counters (like
+cache hits) of server
+
+The latency of a call is split into phases:
+
+parse
+    decode the request from bytes
+validate
+    check the request and parse it into the request object
+queue
+    wait in the queue of admission control
+execute
+    run the method, including the time waiting for a free worker in the executor
+serialize
+    encode the response to bytes
+
+The requests in a batch are parsed, queued and serialized together, these phases
+are recorded under the "rpc.batch" method, and the time from the batch starts
+to the response of a request is ready is recorded as the execute phase of its
+method.  The calls with invalid or unknown method are recorded under the
+"rpc.invalid" method.  Recording is only some counter increments and a bisect of
+the buckets, the gauges and counters are computed when the metrics are dumped '''
+from bisect import bisect_left
+
+from .typedef import Any, Callable, Dict, Iterable, List, Optional
+
+PHASES = ('parse', 'validate', 'queue', 'execute', 'serialize')
+# the upper bounds of histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+BATCH_METHOD = "rpc.batch"
+INVALID_METHOD = "rpc.invalid"
+
+
+class Histogram:
+    ''' histogram with fixed buckets, *buckets* are the sorted upper bounds, and
+    the values larger than the last bound are counted in the +Inf bucket '''
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_json(self) -> Dict:
+        ''' convert the histogram to dict, the counts of buckets are not cumulative '''
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": self.sum,
+            "count": self.count
+        }
+
+
+class MethodMetrics:
+    ''' the metrics of one rpc method '''
+    __slots__ = ('calls', 'errors', 'phases')
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.calls = 0
+        # error code -> the number of errors
+        self.errors = {}
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+
+    def to_json(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": {str(code): count for code, count in self.errors.items()},
+            "latency": {phase: histogram.to_json()
+                        for phase, histogram in self.phases.items() if histogram.count}
+        }
+
+
+class Metrics:
+    '''
+    Usage example::
+
+        metrics = Metrics()
+        server = JsonRPC2(metrics=metrics)
+
+        # the metrics can be got by calling the "rpc.metrics" method,
+        # or dumped in prometheus text format
+        print(metrics.to_prometheus())
+
+    :param buckets: the upper bounds of latency histogram buckets, in seconds
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # method name -> MethodMetrics
+        self.methods = {}
+        # gauge name -> (the function which returns the value, help text)
+        self.gauges = {}
+        # counter name -> (the function which returns the value, help text)
+        self.counters = {}
+
+    def get_method_metrics(self, method: str) -> MethodMetrics:
+        method_metrics = self.methods.get(method)
+        if method_metrics is None:
+            method_metrics = self.methods[method] = MethodMetrics(self.buckets)
+        return method_metrics
+
+    def count_call(self, method: str, err_code: Optional[int] = None):
+        ''' count a call of method, and count the error if *err_code* is given '''
+        method_metrics = self.methods.get(method) or self.get_method_metrics(method)
+        method_metrics.calls += 1
+        if err_code is not None:
+            self.count_error(method, err_code)
+
+    def count_error(self, method: str, err_code: int):
+        errors = self.get_method_metrics(method).errors
+        errors[err_code] = errors.get(err_code, 0) + 1
+
+    def observe(self, method: str, phase: str, seconds: float):
+        ''' record the latency of a phase of call '''
+        method_metrics = self.methods.get(method) or self.get_method_metrics(method)
+        method_metrics.phases[phase].observe(seconds)
+
+    def add_gauge(self, name: str, func: Callable[[], Optional[float]], help_text: str = ""):
+        ''' add a gauge, *func* is called when the metrics are dumped, and the
+        gauge is omitted when it returns None '''
+        self.gauges[name] = (func, help_text)
+
+    def add_counter(self, name: str, func: Callable[[], Optional[float]], help_text: str = ""):
+        ''' add a counter, which is like a gauge, but its value only increases, and it's
+        dumped as "<name>_total" counter in prometheus text format
+
+        .. versionadded:: 0.6
+        '''
+        self.counters[name] = (func, help_text)
+
+    def get_gauges(self) -> Dict[str, float]:
+        return _collect(self.gauges)
+
+    def get_counters(self) -> Dict[str, float]:
+        return _collect(self.counters)
+
+    def to_json(self) -> Dict[str, Any]:
+        ''' convert the metrics to dict, which is the result of "rpc.metrics" method '''
+        return {
+            "methods": {method: method_metrics.to_json()
+                        for method, method_metrics in self.methods.items()},
+            "gauges": self.get_gauges(),
+            "counters": self.get_counters()
+        }
+
+    def to_prometheus(self, namespace: str = "ajson_rpc2") -> str:
+        ''' dump the metrics in prometheus text exposition format '''
+        lines = []
+        self._dump_counters(lines, namespace)
+        self._dump_histograms(lines, namespace)
+
+        gauges = self.get_gauges()
+        for name, (_, help_text) in self.gauges.items():
+            if name not in gauges:
+                continue
+            full_name = f'{namespace}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} gauge')
+            lines.append(f'{full_name} {_format_value(gauges[name])}')
+
+        counters = self.get_counters()
+        for name, (_, help_text) in self.counters.items():
+            if name not in counters:
+                continue
+            full_name = f'{namespace}_{name}_total'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} counter')
+            lines.append(f'{full_name} {_format_value(counters[name])}')
+        return '\n'.join(lines) + '\n'
+
+    def _dump_counters(self, lines: List[str], namespace: str):
+        lines.append(f'# HELP {namespace}_calls_total The number of rpc calls.')
+        lines.append(f'# TYPE {namespace}_calls_total counter')
+        for method, method_metrics in self.methods.items():
+            lines.append(f'{namespace}_calls_total{{method="{_escape(method)}"}} {method_metrics.calls}')
+
+        lines.append(f'# HELP {namespace}_errors_total The number of error responses by error code.')
+        lines.append(f'# TYPE {namespace}_errors_total counter')
+        for method, method_metrics in self.methods.items():
+            for code, count in method_metrics.errors.items():
+                lines.append(f'{namespace}_errors_total{{method="{_escape(method)}",code="{code}"}} {count}')
+
+    def _dump_histograms(self, lines: List[str], namespace: str):
+        full_name = f'{namespace}_latency_seconds'
+        lines.append(f'# HELP {full_name} The latency of each phase of rpc calls.')
+        lines.append(f'# TYPE {full_name} histogram')
+        for method, method_metrics in self.methods.items():
+            for phase, histogram in method_metrics.phases.items():
+                if not histogram.count:
+                    continue
+                labels = f'method="{_escape(method)}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{full_name}_bucket{{{labels},le="{_format_value(bound)}"}} {cumulative}')
+                lines.append(f'{full_name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{full_name}_sum{{{labels}}} {_format_value(histogram.sum)}')
+                lines.append(f'{full_name}_count{{{labels}}} {histogram.count}')
+
+
+def _collect(funcs: Dict[str, tuple]) -> Dict[str, float]:
+    ''' call the functions of gauges or counters, the None values are omitted '''
+    values = {}
+    for name, (func, _) in funcs.items():
+        value = func()
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
@@ -3,7 +3,7 @@ the Client MAY send an Array filled with Request objects.
 This module defines the class for batch request'''
 from ..typedef import List, Dict
 from .request import Request, Notification
-from .fixed_list import FixedList
+from .slot_list import SlotList
 
 
 class BatchRequest:
@@ -11,12 +11,20 @@ class BatchRequest:
     BatchRequest represent several rpc-call at the same time
     Use batch request should improve client or server performance
     Due to it can save the transfer time
+
+    :param requests: the SlotList of requests
+    :param notifications: the SlotList of notifications
+    :param check_type: check the type of each request when it's added, which is useful
+                       for debugging
+    .. versionchanged:: 0.6
+       The requests and notifications are stored in SlotList instead of FixedList
     '''
-    def __init__(self, requests: FixedList=None, notifications: FixedList=None):
+    def __init__(self, requests: SlotList = None, notifications: SlotList = None,
+                 check_type: bool = False):
         if requests is None:
-            requests = FixedList(Request)
+            requests = SlotList(item_type=Request if check_type else None)
         if notifications is None:
-            notifications = FixedList(Notification)
+            notifications = SlotList(item_type=Notification if check_type else None)
         self.requests = requests
         self.notifications = notifications
 
@@ -8,43 +8,71 @@ the response from the Server MUST be a single Response object.
 If there are no Response objects contained within the Response array as it is to be sent to the client,
 the server MUST NOT return an empty Array and should return nothing at all.
 '''
-from ..typedef import Union, List
+import itertools
+
+from ..typedef import Iterable, Union, List
 from .response import SuccessResponse, ErrorResponse
-from .fixed_list import FixedList
+from .slot_list import SlotList
 
 
 class BatchResponse:
     '''
     BatchResponse represent the response
     to several rpc-call at the same time
+
+    The responses are stored in a SlotList, which can be preallocated
+    with one slot for each request in the batch
+
+    :param size: the number of preallocated slots
+    :param check_type: check the type of each response when it's added, which is useful
+                       for debugging
+    .. versionchanged:: 0.6
+       The successes and errors parameters were replaced by size and check_type, use
+       :meth:`from_responses` to create it from the lists of responses
     '''
-    def __init__(self, successes: FixedList=None, errors: FixedList=None):
-        if successes is None:
-            successes = FixedList(SuccessResponse)
-        if errors is None:
-            errors = FixedList(ErrorResponse)
-        self.successes = successes
-        self.errors = errors
+    __slots__ = ('responses',)
+
+    def __init__(self, size: int = 0, check_type: bool = False):
+        item_type = (SuccessResponse, ErrorResponse) if check_type else None
+        self.responses = SlotList(size, item_type)
+
+    @classmethod
+    def from_responses(cls, successes: Iterable[SuccessResponse] = (),
+                       errors: Iterable[ErrorResponse] = (),
+                       check_type: bool = False):
+        ''' create a BatchResponse from the success responses and error responses,
+        like the constructor before 0.6
+
+        .. versionadded:: 0.6
+        '''
+        batch_response = cls(check_type=check_type)
+        for resp in itertools.chain(successes, errors):
+            batch_response.append(resp)
+        return batch_response
+
+    @property
+    def successes(self) -> List[SuccessResponse]:
+        ''' a new list of the success responses, the responses should be added by
+        append or index instead of changing this list '''
+        return [resp for resp in self.responses if isinstance(resp, SuccessResponse)]
+
+    @property
+    def errors(self) -> List[ErrorResponse]:
+        ''' a new list of the error responses, the responses should be added by
+        append or index instead of changing this list '''
+        return [resp for resp in self.responses if isinstance(resp, ErrorResponse)]
 
     def to_json(self) -> List:
-        result_list = []
-        for success in self.successes:
-            result_list.append(success.to_json())
-        for error in self.errors:
-            result_list.append(error.to_json())
-        return result_list
+        return [resp.to_json() for resp in self.responses]
 
     def append(self, resp: Union[SuccessResponse, ErrorResponse]):
-        if isinstance(resp, SuccessResponse):
-            self.successes.append(resp)
-        else:
-            self.errors.append(resp)
+        self.responses.append(resp)
+
+    def __setitem__(self, index: int, resp: Union[SuccessResponse, ErrorResponse]):
+        self.responses[index] = resp
 
     def __len__(self):
-        return len(self.successes) + len(self.errors)
+        return len(self.responses)
 
     def __iter__(self):
-        for response in self.successes:
-            yield response
-        for error in self.errors:
-            yield error
+        return iter(self.responses)
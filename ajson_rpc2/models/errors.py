@@ -50,3 +50,47 @@ class InvalidParamsError(JsonRPC2Error):
 class InternalError(JsonRPC2Error):
     ''' Internal JSON-RPC error '''
     err_code = -32603
+
+
+class MethodTimeoutError(JsonRPC2Error):
+    ''' The method doesn't complete in its timeout, which is a server error
+    defined by ajson-rpc2
+
+    .. versionadded:: 0.6
+    '''
+    err_code = -32001
+
+
+class ServerBusyError(JsonRPC2Error):
+    ''' The server is overloaded and rejects the request, the client can
+    retry it later, which is a server error defined by ajson-rpc2
+
+    .. versionadded:: 0.6
+    '''
+    err_code = -32002
+
+
+def error_from_json(error_json: dict) -> JsonRPC2Error:
+    ''' convert the error object of response to an instance of the JsonRPC2Error
+    subclass which has the same code, the error with unknown code is converted
+    to JsonRPC2Error with the code, the data of error is set to the `data` attribute
+
+    .. versionadded:: 0.6
+    '''
+    code = error_json.get("code")
+    message = error_json.get("message", "")
+    for error_class in _ERROR_CLASSES:
+        if error_class.err_code == code:
+            error = error_class(message)
+            break
+    else:
+        error = JsonRPC2Error(message)
+        error.err_code = code
+    error.data = error_json.get("data")
+    return error
+
+
+_ERROR_CLASSES = (
+    ParseError, InvalidRequestError, MethodNotFoundError, InvalidParamsError,
+    InternalError, MethodTimeoutError, ServerBusyError
+)
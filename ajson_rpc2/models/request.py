@@ -4,6 +4,7 @@ from ..typedef import List, Mapping, Union
 
 class _BaseRequest:
     ''' base class for the request object, which contains the jsonrpc version '''
+    __slots__ = ()
     JSONRPC = "2.0"
 
     @classmethod
@@ -29,6 +30,7 @@ class Request(_BaseRequest):
         The value SHOULD normally not be Null [1] and Numbers SHOULD NOT contain fractional parts.
 
     The Server MUST reply with the same value in the Response object if included. This member is used to correlate the context between the two objects.'''
+    __slots__ = ('method', 'params', 'req_id')
 
     def __init__(self, method: str, params: Union[List, Mapping], id: Union[int, str]):
         super(Request, self).__init__()
@@ -52,6 +54,7 @@ class Notification(_BaseRequest):
 
     Notifications are not confirmable by definition, since they do not have a Response object to be returned.
     As such, the Client would not be aware of any errors (like e.g. "Invalid params","Internal rror").'''
+    __slots__ = ('method', 'params')
 
     def __init__(self, method: str, params: Union[List, Mapping]):
         super(Notification, self).__init__()
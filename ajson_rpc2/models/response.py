@@ -27,6 +27,7 @@ from .errors import JsonRPC2Error
 
 class _Response:
     ''' base class for the json rpc2 response object '''
+    __slots__ = ('resp_id',)
     JSONRPC = "2.0"
 
     def __init__(self, id: int):
@@ -39,6 +40,7 @@ class _Response:
 
 class SuccessResponse(_Response):
     ''' response object for no errors '''
+    __slots__ = ('result',)
 
     def __init__(self, result: str, id: int):
         super(SuccessResponse, self).__init__(id)
@@ -54,6 +56,7 @@ class SuccessResponse(_Response):
 
 class ErrorResponse(_Response):
     ''' response object for errors '''
+    __slots__ = ('error',)
 
     def __init__(self, error: JsonRPC2Error, id: int):
         super(ErrorResponse, self).__init__(id)
@@ -0,0 +1,65 @@
+''' define a preallocated list of slots, which is used by the batch objects '''
+from ..typedef import Any, Iterable, Iterator, Optional, Union, Tuple
+
+
+class SlotList:
+    ''' A list of slots which can be preallocated, each slot is indexed by the position
+    of request in batch, and the empty slots (like the slots for notifications) are skipped
+    when iterating.  The type of item is only checked when *item_type* is given, which is
+    useful for debugging, so the hot path only stores the item
+    Usage example::
+
+        slots = SlotList(3)
+        slots[2] = "c"
+        slots[0] = "a"
+        list(slots)   # ["a", "c"]
+
+        slots = SlotList(item_type=int)
+        slots.append("abc")   # which will raise an TypeError, because "abc" is not a type of int
+
+    :param size: the number of preallocated slots
+    :param item_type: the type (or tuple of types) of item, None means the type is not checked
+    .. versionadded:: 0.6
+    '''
+    __slots__ = ('items', 'item_type', '_filled')
+
+    def __init__(self, size: int = 0, item_type: Union[type, Tuple[type, ...], None] = None):
+        self.items = [None] * size
+        self.item_type = item_type
+        self._filled = 0
+
+    def _check_type(self, item: Any):
+        if not isinstance(item, self.item_type):
+            raise TypeError(f'type of item should be {self.item_type}')
+
+    def __setitem__(self, index: int, item: Any):
+        ''' put the item to slot *index* '''
+        if self.item_type is not None:
+            self._check_type(item)
+        if self.items[index] is None:
+            self._filled += 1
+        self.items[index] = item
+
+    def __getitem__(self, index: int) -> Optional[Any]:
+        return self.items[index]
+
+    def append(self, item: Any):
+        ''' add a new slot which contains the item '''
+        if self.item_type is not None:
+            self._check_type(item)
+        self.items.append(item)
+        self._filled += 1
+
+    def extend(self, iterable: Iterable):
+        for item in iterable:
+            self.append(item)
+
+    def __len__(self) -> int:
+        ''' the number of filled slots '''
+        return self._filled
+
+    def __iter__(self) -> Iterator:
+        ''' iterate the items in the filled slots by index '''
+        for item in self.items:
+            if item is not None:
+                yield item
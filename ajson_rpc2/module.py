@@ -1,4 +1,7 @@
 from .container import _MethodContainer
+from .method import RpcMethod
+from .cache import ResultCache
+from .typedef import Callable, Optional, Union
 
 
 class Module(_MethodContainer):
@@ -25,3 +28,25 @@ class Module(_MethodContainer):
     def __init__(self, name: str):
         super(Module, self).__init__()
         self.name = name
+        self._listeners = []
+
+    def add_listener(self, listener: Callable[[RpcMethod], None]):
+        ''' call *listener* with the RpcMethod when a method is added to the module,
+        the server uses it to update the dispatch table
+
+        .. versionadded:: 0.6
+        '''
+        self._listeners.append(listener)
+
+    def add_method(self, method,
+                   restrict=True,
+                   need_multiprocessing=False,
+                   need_multithreading=False,
+                   timeout: Optional[float] = None,
+                   cache: Union[bool, ResultCache, None] = None):
+        super(Module, self).add_method(method, restrict,
+                                       need_multiprocessing,
+                                       need_multithreading,
+                                       timeout, cache)
+        for listener in self._listeners:
+            listener(self.methods[method.__name__])
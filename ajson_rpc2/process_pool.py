@@ -0,0 +1,127 @@
+''' process pool for the rpc methods which need multiprocessing
+
+The rpc methods are installed in each worker process once when the worker
+starts, then a call only sends the method name and params to the worker,
+instead of pickling the function for every call.  On the platforms which
+support fork, the methods are inherited by the workers without pickling,
+so lambdas and closures can be called in the pool too '''
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .typedef import Any, Callable, Dict, Optional, Union, List, Tuple
+
+# the rpc methods installed in current worker process
+_worker_methods = {}
+
+
+def _install_methods(methods: Dict[str, Callable]):
+    ''' initializer of worker process '''
+    _worker_methods.clear()
+    _worker_methods.update(methods)
+
+
+def call_function(func: Callable, params: Union[List, Dict, None]) -> Any:
+    ''' call function with the params of request '''
+    if isinstance(params, dict):
+        return func(**params)
+    elif isinstance(params, list):
+        return func(*params)
+    else:
+        # the method have no parameter
+        return func()
+
+
+def call_method(method_name: str, params: Union[List, Dict, None]) -> Any:
+    ''' call the rpc method which is installed in current worker process '''
+    return call_function(_worker_methods[method_name], params)
+
+
+def call_function_chunk(func: Callable, params_list: List) -> List[Tuple[bool, Any]]:
+    ''' call function with each params in *params_list*, and return the list of
+    (succeeded, result) pairs, the result is None when the call raises an exception '''
+    outcomes = []
+    for params in params_list:
+        try:
+            outcomes.append((True, call_function(func, params)))
+        except Exception as e:
+            outcomes.append((False, None))
+    return outcomes
+
+
+def call_method_chunk(method_name: str, params_list: List) -> List[Tuple[bool, Any]]:
+    ''' the same as call_function_chunk, but call the rpc method
+    which is installed in current worker process '''
+    return call_function_chunk(_worker_methods[method_name], params_list)
+
+
+def _noop():
+    pass
+
+
+def _get_mp_context():
+    try:
+        return multiprocessing.get_context("fork")
+    except ValueError:
+        # fork is not supported (like Windows), the methods will be pickled
+        # once for each worker when it starts
+        return None
+
+
+class MethodProcessPool(ProcessPoolExecutor):
+    '''
+    ProcessPoolExecutor which installs *methods* in each worker process
+    Usage example::
+
+        pool = MethodProcessPool({"square": lambda num: num * num})
+        pool.submit(call_method, "square", [3]).result()  # 9
+
+    :param methods: the map of rpc method name to the function
+    :param max_workers: the max number of worker processes, defaults to the number of CPUs
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, methods: Dict[str, Callable], max_workers: Optional[int] = None):
+        super(MethodProcessPool, self).__init__(max_workers=max_workers,
+                                                mp_context=_get_mp_context(),
+                                                initializer=_install_methods,
+                                                initargs=(methods,))
+        self.methods = methods
+        # the futures in event loop which wait for the calls in the pool
+        self._waiters = set()
+        self.retired = False
+        self.terminated = False
+
+    def add_waiter(self, future: asyncio.Future):
+        ''' track *future* which waits for a call in the pool, the retired pool
+        is terminated when all the tracked futures are done '''
+        self._waiters.add(future)
+        future.add_done_callback(self._on_waiter_done)
+
+    def _on_waiter_done(self, future: asyncio.Future):
+        self._waiters.discard(future)
+        if self.retired and not self._waiters:
+            self.terminate()
+
+    def retire(self):
+        ''' terminate the pool when the futures waiting for its calls are all done, either
+        completed or cancelled by their own timeout.  So a worker which is stuck in a timed
+        out call is killed without failing the other calls which are running in the pool,
+        the new calls should be submitted to another pool '''
+        self.retired = True
+        if all(waiter.done() for waiter in self._waiters):
+            self.terminate()
+
+    def terminate(self):
+        ''' kill the worker processes and shutdown the pool without waiting, the pending
+        calls will fail with BrokenProcessPool '''
+        self.terminated = True
+        processes = list((self._processes or {}).values())
+        self.shutdown(wait=False)
+        for process in processes:
+            process.terminate()
+
+    def prewarm(self):
+        ''' start all worker processes, and wait until they are ready '''
+        futures = [self.submit(_noop) for _ in range(self._max_workers)]
+        for future in futures:
+            future.result()
@@ -1,21 +1,23 @@
 ''' json-rpc2 implementation base on asyncio '''
-import json
 import logging
 import asyncio
 import functools
-import re
+import os
+import signal
+import time
 from asyncio import StreamReader, StreamWriter, Future, AbstractEventLoop
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from .utils import (
     is_method_not_exist,
-    is_request_invalid, is_params_invalid
+    is_request_invalid
 )
 
 from .models.errors import (
     ParseError, InvalidRequestError,
     MethodNotFoundError, InvalidParamsError,
-    InternalError, JsonRPC2Error
+    InternalError, JsonRPC2Error, MethodTimeoutError,
+    ServerBusyError
 )
 from .models.request import Request, Notification
 from .models.response import SuccessResponse, ErrorResponse, _Response
@@ -23,17 +25,38 @@ from .models.batch_response import BatchResponse
 from .module import Module
 from .method import RpcMethod, ExtraNeed
 from .container import _MethodContainer
-from .typedef import Union, Optional, Any, JSON, List, Callable
+from .codec import JsonCodec, get_codec
+from .writer import ResponseWriter, OverflowPolicy
+from .access_log import AccessLog
+from .admission import AdmissionControl
+from .metrics import Metrics, BATCH_METHOD, INVALID_METHOD
+from .cache import ResultCache
+from .supervisor import Supervisor
+from .framing import Framer, NewlineFramer, FrameTooLarge
+from .process_pool import (
+    MethodProcessPool, call_method, call_function,
+    call_method_chunk, call_function_chunk
+)
+
+from .typedef import (
+    Union, Optional, Any, JSON, List, Callable, Dict, Tuple,
+    Iterable, AsyncIterator
+)
+
+logger = logging.getLogger(__name__)
 
 
 class _RequestGroup:
+    ''' the indexes of requests in a batch, grouped by the way to invoke them '''
     def __init__(self,
-                 simple: List = None,
-                 process: List = None,
-                 thread: List = None):
-        self.simple_requests = simple or []
-        self.process_requests = process or []
-        self.thread_requests = thread or []
+                 simple: List[int] = None,
+                 process: List[int] = None,
+                 thread: List[int] = None,
+                 coroutine: List[int] = None):
+        self.simple_indexes = simple or []
+        self.process_indexes = process or []
+        self.thread_indexes = thread or []
+        self.coroutine_indexes = coroutine or []
 
 
 class JsonRPC2(_MethodContainer):
@@ -64,153 +87,581 @@ class JsonRPC2(_MethodContainer):
     :param process_executor: an instance of concurrent.futures.ProcessPoolExecutor, you can
                              pass it to the server, when server is calling CPU-bound method,
                              it will be executed in another process by this executor.  Defaults
-                             is None, which will make Server create a ProcessPoolExecutor with 4
-                             max workers
+                             is None, which will make Server create a MethodProcessPool with
+                             *process_workers* max workers when it's needed for the first time, the
+                             rpc methods are installed in the workers when the pool starts, so only
+                             the method name and params are sent for a call
     :param thread_executor: an instance of concurrent.futures.ThreadPoolExecutor, you can
                             pass it to the server, when server is calling IO-bound method,
                             it will be executed in another process by this executor  Defaults
-                            is None, which will make Server create a ThreadPoolExecutor with 4
-                            max workers
+                            is None, which will make Server create a ThreadPoolExecutor with
+                            *thread_workers* max workers when it's needed for the first time
+    :param pipelining: if the value is True, the server keeps reading requests from a connection
+                       while the earlier requests are still running, each request is dispatched
+                       as its own task and the responses are sent back as soon as they complete
+                       (the client should correlate them by id).  Defaults is False, which
+                       handles the requests of a connection one by one
+    :param max_inflight_requests: the max number of requests which can run at the same time for
+                                  one connection when pipelining is enabled, when the limit is
+                                  reached the server stops reading until one of them completes
+    :param codec: an instance of ajson_rpc2.codec.JsonCodec, which is used to load requests and
+                  dump responses.  Defaults is None, which will use orjson or ujson if it's
+                  installed, otherwise the json module in standard library
+    :param write_buffer_limit: the max bytes of responses which can be buffered for one connection
+                               when the client doesn't read them fast enough, None means no limit.
+                               Defaults is 1 MiB
+    :param write_buffer_policy: an instance of ajson_rpc2.writer.OverflowPolicy, which controls the
+                                behavior when the write buffer exceeds the limit, BLOCK will wait until
+                                the client reads enough data, CLOSE will drop the connection.
+                                Defaults is BLOCK
+    :param access_log: an instance of ajson_rpc2.access_log.AccessLog, which logs the method, id,
+                       status and latency of rpc calls when the "ajson_rpc2.access" logger is
+                       enabled.  Defaults is None, which will create an AccessLog without sampling
+    :param shutdown_timeout: how long the worker waits for the running requests to complete
+                             when it's shutting down in multi-process mode, the idle connections
+                             are closed at once
+    :param process_chunk_size: in batched request, the requests for the same method which need
+                               multiprocessing are grouped into chunks of this size, and each chunk
+                               is executed in one worker round trip (like the chunksize argument of
+                               Executor.map).  The requests for the method which has timeout are
+                               always submitted separately, so each of them has its own deadline.
+                               Defaults is 1, which submits each request separately
+    :param process_workers: the max workers of the process pool created by the server,
+                            defaults is None, which means the number of CPUs
+    :param thread_workers: the max workers of the thread pool created by the server,
+                           defaults is None, which means the number of CPUs
+    :param framer: an instance of ajson_rpc2.framing.Framer, which splits the byte stream into
+                   requests and frames the responses, it can also be set for each listener in
+                   `start`.  Defaults is None, which will use NewlineFramer, so each request is
+                   one line.  Use ContentLengthFramer for language server protocol
+    :param max_request_size: the max bytes of one request(or batched request), it's enforced while
+                             reading, the oversized request is discarded without buffering it fully,
+                             and an Invalid Request error is sent back, the connection is kept alive.
+                             Defaults is 1 MiB
+    :param stream_batch_responses: if the value is True, the responses of batched request are written
+                                   to the client as soon as they complete (in the order of completion),
+                                   instead of building the whole array before sending it.  It's only
+                                   used with a framer which supports streaming (like NewlineFramer)
+                                   and when pipelining is disabled, otherwise the responses are sent
+                                   as a whole.  Defaults is False
+    :param method_timeout: the default max seconds a rpc method can run, which is used when the
+                           timeout of method is not given in `add_method` or `rpc_call`, when it's
+                           expired, a MethodTimeoutError is sent back.  Defaults is None, which
+                           means no timeout
+    :param max_batch_concurrency: in batched request, the requests for async functions run
+                                  concurrently, this is the max number of them which can run at
+                                  the same time for one batch.  Defaults is None, which means no limit
+    :param admission: an instance of ajson_rpc2.admission.AdmissionControl, which limits the
+                      connections and in-flight calls of the server, the requests beyond the limits
+                      wait in a bounded queue or are rejected with a ServerBusyError.  In multi-process
+                      mode, the limits are applied to each worker.  Defaults is None, which means no limit
+    :param metrics: an instance of ajson_rpc2.metrics.Metrics, which records the calls, errors
+                    and latency of each rpc method, and the gauges of server.  The metrics can be
+                    got by calling the reserved "rpc.metrics" method.  In multi-process mode,
+                    each worker has its own metrics.  Defaults is None, which records nothing
     .. versionadded:: 0.3
        The process_executor and thread_executor parameters were added
+    .. versionadded:: 0.6
+       The pipelining, max_inflight_requests, codec, write_buffer_limit,
+       write_buffer_policy, access_log, shutdown_timeout, process_chunk_size,
+       max_batch_concurrency, process_workers, thread_workers, framer, max_request_size,
+       stream_batch_responses, method_timeout, admission and metrics parameters were added
     '''
     def __init__(self,
                  loop: AbstractEventLoop = None,
                  process_executor: ProcessPoolExecutor = None,
-                 thread_executor: ThreadPoolExecutor = None):
+                 thread_executor: ThreadPoolExecutor = None,
+                 pipelining: bool = False,
+                 max_inflight_requests: int = 64,
+                 codec: JsonCodec = None,
+                 write_buffer_limit: Optional[int] = 2 ** 20,
+                 write_buffer_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 access_log: AccessLog = None,
+                 shutdown_timeout: float = 5.0,
+                 process_chunk_size: int = 1,
+                 max_batch_concurrency: Optional[int] = None,
+                 process_workers: Optional[int] = None,
+                 thread_workers: Optional[int] = None,
+                 framer: Framer = None,
+                 max_request_size: int = 2 ** 20,
+                 stream_batch_responses: bool = False,
+                 method_timeout: Optional[float] = None,
+                 admission: AdmissionControl = None,
+                 metrics: Metrics = None):
         super(JsonRPC2, self).__init__()
         if loop is None:
             # asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
             loop = asyncio.new_event_loop()
-        if process_executor is None:
-            process_executor = ProcessPoolExecutor(max_workers=4)
-        if thread_executor is None:
-            thread_executor = ThreadPoolExecutor(max_workers=4)
+        self._own_thread_executor = thread_executor is None
+        if codec is None:
+            codec = get_codec()
+        if access_log is None:
+            access_log = AccessLog()
+        if framer is None:
+            framer = NewlineFramer()
 
         self.loop = loop
         self.process_executor = process_executor
         self.thread_executor = thread_executor
+        # the executors are created when they are needed for the first time
+        self._process_pool = None
+        # the recycled process pools, which are waiting for their calls to complete
+        self._retired_process_pools = []
         self.modules = {}
+        # full qualified method name -> RpcMethod, for both the methods in
+        # server and in modules, it's rebuilt when the methods are changed
+        self._dispatch_table = {}
+        self.pipelining = pipelining
+        self.max_inflight_requests = max_inflight_requests
+        self.codec = codec
+        self.write_buffer_limit = write_buffer_limit
+        self.write_buffer_policy = write_buffer_policy
+        self.access_log = access_log
+        self.shutdown_timeout = shutdown_timeout
+        self.process_chunk_size = process_chunk_size
+        self.max_batch_concurrency = max_batch_concurrency
+        self.process_workers = process_workers or os.cpu_count()
+        self.thread_workers = thread_workers or os.cpu_count()
+        self.framer = framer
+        self.max_request_size = max_request_size
+        self.stream_batch_responses = stream_batch_responses
+        self.method_timeout = method_timeout
+        self.admission = admission
+        self.metrics = metrics
+        # the number of open connections
+        self.connections = 0
+        # the response writers of connections which are waiting for the next request
+        # without running requests, they are closed when the server is closing
+        self._idle_writers = set()
+        self._closing = False
+        if metrics is not None:
+            self._add_metrics_gauges(metrics)
+            self._metrics_method = RpcMethod(metrics.to_json, ExtraNeed.NOTHING)
+            self._metrics_method.name = "rpc.metrics"
+            self._rebuild_dispatch_table()
 
-    async def handle_client(self, reader: StreamReader, writer: StreamWriter):
+    async def handle_client(self, reader: StreamReader, writer: StreamWriter,
+                            framer: Framer = None):
         ''' main handler for each client connection '''
-        peer = writer.get_extra_info('socket').getpeername()
-        logging.info(f'got a connection from {peer}')
+        peer = writer.get_extra_info('peername')
+        logger.info('got a connection from %s', peer)
+        if self.admission is not None and not self.admission.open_connection():
+            logger.warning('reject the connection from %s, too many connections', peer)
+            response = ErrorResponse(ServerBusyError("Server busy"), None)
+            writer.write(self.serialize_response(response, framer))
+            writer.close()
+            return
+
+        self.connections += 1
         try:
-            await self.handle_rpc_call(reader, writer)
+            await self.handle_rpc_call(reader, writer, framer)
         except Exception as e:
-            logging.error(f'error {e} from {peer}')
+            logger.error('error %s from %s', e, peer)
         else:
-            logging.info(f'end connection from {peer}')
+            logger.info('end connection from %s', peer)
         finally:
+            self.connections -= 1
             writer.close()
+            if self.admission is not None:
+                self.admission.close_connection()
+
+    async def handle_rpc_call(self, reader: StreamReader, writer: StreamWriter,
+                              framer: Framer = None):
+        ''' handle rpc call async
+
+        :param framer: the framer of connection, defaults to the framer of server
+        '''
+        framer = framer or self.framer
+        response_writer = ResponseWriter(writer, self.loop,
+                                         self.write_buffer_limit,
+                                         self.write_buffer_policy)
+        peer = writer.get_extra_info('peername')
+        try:
+            if self.pipelining:
+                await self._handle_pipelined_rpc_call(reader, response_writer, peer, framer)
+                return
+
+            while not self._closing:
+                self._mark_idle(response_writer)
+                try:
+                    request_raw = await self._read_request(reader, response_writer, framer)
+                finally:
+                    self._idle_writers.discard(response_writer)
+                if not request_raw:
+                    break   # Client close connection, Clean close
+                await self.handle_request_raw(response_writer, request_raw, peer, framer)
+        finally:
+            # the idle connection which is closed by server has sent its responses
+            if not writer.is_closing():
+                await response_writer.drain()
+
+    async def _handle_pipelined_rpc_call(self, reader: StreamReader,
+                                         response_writer: ResponseWriter,
+                                         peer: Any = None,
+                                         framer: Framer = None):
+        ''' handle rpc call async, but keep reading requests while the earlier
+        requests are still running.  At most *max_inflight_requests* requests
+        are running at the same time for one connection '''
+        inflight = asyncio.Semaphore(self.max_inflight_requests)
+        pending = set()
+        reading = False
+
+        def on_request_done(task: Future):
+            pending.discard(task)
+            inflight.release()
+            if not task.cancelled() and task.exception() is not None:
+                logger.error('error %s when handling request from %s', task.exception(), peer)
+            if reading and not pending:
+                self._mark_idle(response_writer)
+
+        try:
+            while not self._closing:
+                if not pending:
+                    self._mark_idle(response_writer)
+                reading = True
+                try:
+                    request_raw = await self._read_request(reader, response_writer, framer)
+                finally:
+                    reading = False
+                    self._idle_writers.discard(response_writer)
+                if not request_raw:
+                    break   # Client close connection, Clean close
+                await inflight.acquire()
+                task = self.loop.create_task(self.handle_request_raw(response_writer, request_raw,
+                                                                     peer, framer))
+                pending.add(task)
+                task.add_done_callback(on_request_done)
+        finally:
+            # the responses of running requests still need to be sent back
+            if pending:
+                await asyncio.wait(pending)
 
-    async def handle_rpc_call(self, reader: StreamReader, writer: StreamWriter):
-        ''' handle rpc call async '''
+    def _mark_idle(self, response_writer: ResponseWriter):
+        ''' mark the connection of *response_writer* idle, it's closed at once if the
+        server is closing '''
+        if self._closing:
+            response_writer.close()
+        else:
+            self._idle_writers.add(response_writer)
+
+    def close_idle_connections(self):
+        ''' stop reading new requests, and close the connections which are waiting for the
+        next request without running requests, the other connections are closed when their
+        running requests complete
+
+        .. versionadded:: 0.6
+        '''
+        self._closing = True
+        idle_writers, self._idle_writers = self._idle_writers, set()
+        for response_writer in idle_writers:
+            response_writer.close()
+
+    async def _read_request(self, reader: StreamReader,
+                            response_writer: ResponseWriter,
+                            framer: Framer = None) -> bytes:
+        ''' read the next request, the requests larger than *max_request_size*
+        are discarded, and an Invalid Request error is sent back for each of them '''
         while True:
-            peer = writer.get_extra_info('socket').getpeername()
-            request_raw = await self.read(reader)
-            logging.info(f"get data from {peer}")
-            if not request_raw:
-                break   # Client close connection, Clean close
-            request_raw = request_raw.decode()
-
-            # check for invalid json first
-            request_json = None
             try:
-                request_json = json.loads(request_raw)
-            except (json.JSONDecodeError, TypeError) as e:
-                response = ErrorResponse(ParseError("Parse error"),
-                                         None)
-                self.send_response(writer,
-                                   response)
+                return await self.read(reader, framer)
+            except FrameTooLarge as e:
+                logger.warning('discard request: %s', e)
+                response = ErrorResponse(InvalidRequestError("Request too large"), None)
+                await response_writer.write(self.serialize_response(response, framer))
+
+    async def handle_request_raw(self, response_writer: ResponseWriter,
+                                 request_raw: bytes,
+                                 peer: Any = None,
+                                 framer: Framer = None):
+        ''' handle one request(or batched request) read from client,
+        and send the response back if it need result '''
+        framer = framer or self.framer
+        need_access_log = self.access_log.sample()
+        if need_access_log:
+            start_time = time.perf_counter()
+        metrics = self.metrics
+        if metrics is not None:
+            phase_start = time.perf_counter()
+
+        # check for invalid json first
+        request_json = None
+        try:
+            request_json = self.codec.loads(request_raw)
+        except self.codec.decode_errors as e:
+            response = ErrorResponse(ParseError("Parse error"),
+                                     None)
+            if metrics is not None:
+                metrics_method = INVALID_METHOD
+                metrics.count_call(metrics_method, ParseError.err_code)
+                metrics.observe(metrics_method, 'parse', time.perf_counter() - phase_start)
+        else:
+            if metrics is not None:
+                metrics_method = self._get_metrics_method(request_json)
+                if metrics_method == BATCH_METHOD:
+                    metrics.count_call(metrics_method)
+                phase_end = time.perf_counter()
+                metrics.observe(metrics_method, 'parse', phase_end - phase_start)
+                phase_start = phase_end
+
+            admission = None
+            try:
+                if self.admission is not None:
+                    admission = await self.admission.acquire(self._get_called_methods(request_json))
+                    if metrics is not None:
+                        metrics.observe(metrics_method, 'queue', time.perf_counter() - phase_start)
+            except ServerBusyError as e:
+                response = self._generate_busy_response(request_json, e)
+                if metrics is not None:
+                    for method in self._get_called_methods(request_json):
+                        metrics.count_call(self._get_metrics_method_by_name(method), e.err_code)
             else:
-                if isinstance(request_json, list):
-                    response = await self.handle_batched_rpc_call(request_json)
-                else:
-                    response = await self.handle_simple_rpc_call(request_json)
+                try:
+                    if isinstance(request_json, list) and self._can_stream_batch(request_json, framer):
+                        error_count = await self._stream_batched_rpc_call(request_json,
+                                                                          response_writer, framer)
+                        if need_access_log:
+                            self.access_log.log(peer, request_json, None,
+                                                time.perf_counter() - start_time,
+                                                status=None if error_count is None
+                                                else f'errors={error_count}')
+                        return
+                    elif isinstance(request_json, list):
+                        response = await self.handle_batched_rpc_call(request_json)
+                    else:
+                        response = await self.handle_simple_rpc_call(request_json)
+                finally:
+                    if admission is not None:
+                        self.admission.release(admission)
 
-                if response:
-                    self.send_response(writer, response)
+        if need_access_log:
+            self.access_log.log(peer, request_json, response, time.perf_counter() - start_time)
+        if response:
+            if metrics is None:
+                data = self.serialize_response(response, framer)
+            else:
+                phase_start = time.perf_counter()
+                data = self.serialize_response(response, framer)
+                metrics.observe(metrics_method, 'serialize', time.perf_counter() - phase_start)
+            await response_writer.write(data)
+
+    def _get_called_methods(self, request_json: JSON) -> List[Optional[str]]:
+        ''' return the method names of calls in the request(or batched request),
+        the name is None for the call which is invalid '''
+        if isinstance(request_json, list):
+            return [self._get_called_method(call_json) for call_json in request_json]
+        return [self._get_called_method(request_json)]
+
+    def _get_called_method(self, request_json: JSON) -> Optional[str]:
+        if isinstance(request_json, dict):
+            method = request_json.get('method')
+            if isinstance(method, str):
+                return method
+        return None
+
+    def _get_metrics_method(self, request_json: JSON) -> str:
+        ''' return the method name which the metrics of request are recorded under '''
+        if isinstance(request_json, list):
+            return BATCH_METHOD
+        return self._get_metrics_method_by_name(self._get_called_method(request_json))
+
+    def _get_metrics_method_by_name(self, method: Optional[str]) -> str:
+        if method in self._dispatch_table:
+            return method
+        return INVALID_METHOD
+
+    def _generate_busy_response(self, request_json: JSON,
+                                error: ServerBusyError) -> Union[ErrorResponse, BatchResponse, None]:
+        ''' generate the response for a rejected request(or batched request), each call
+        except the notification receives the error '''
+        if isinstance(request_json, list):
+            batch_response = BatchResponse(len(request_json))
+            for index, call_json in enumerate(request_json):
+                if not isinstance(call_json, dict):
+                    batch_response[index] = ErrorResponse(error, None)
+                elif 'id' in call_json:
+                    batch_response[index] = ErrorResponse(error, call_json['id'])
+            if len(batch_response) != 0:
+                return batch_response
+            return None
+        if not isinstance(request_json, dict):
+            return ErrorResponse(error, None)
+        if 'id' in request_json:
+            return ErrorResponse(error, request_json['id'])
+        return None
 
     async def handle_simple_rpc_call(self, request_json: JSON) -> Optional[_Response]:
         ''' handle for a request, and return a response object(if it need result) '''
+        metrics = self.metrics
+        if metrics is not None:
+            phase_start = time.perf_counter()
         error = self.check_errors(request_json)
         if error:
+            if metrics is not None:
+                metrics.count_call(self._get_metrics_method(request_json), error.err_code)
             return self._generate_error_response(request_json, error)
 
         request = self._parse_request(request_json)
+        if metrics is not None:
+            phase_end = time.perf_counter()
+            metrics.observe(request.method, 'validate', phase_end - phase_start)
+            phase_start = phase_end
+
+        err_code = None
         try:
             result = await self.invoke_method(request)
+        except MethodTimeoutError as e:
+            err_code = e.err_code
+            outcome = self._generate_error_response(request_json, e) \
+                if isinstance(request, Request) else None
         except Exception as e:
             # there is an error during the method executing procedure
             # defined by json rpc2, we need to expose it as InternalError
-            response = self._generate_error_response(request_json, InternalError("Internal error"))
+            err_code = InternalError.err_code
+            outcome = self._generate_error_response(request_json, InternalError("Internal error")) \
+                if isinstance(request, Request) else None
         else:
-            if isinstance(request, Request):
-                response = SuccessResponse(result, request.req_id)
+            outcome = SuccessResponse(result, request.req_id) if isinstance(request, Request) else None
 
-        if isinstance(request, Request):
-            return response
+        if metrics is not None:
+            metrics.observe(request.method, 'execute', time.perf_counter() - phase_start)
+            metrics.count_call(request.method, err_code)
+        return outcome
 
     async def handle_batched_rpc_call(self, request_json: List) -> Union[ErrorResponse, BatchResponse, None]:
         ''' handle for batched request, but there are something to noted:
         1. When receive an empty array, server will return a Response
         2. When receive array with one element, but the request is Invalid Request,
            server will return a BatchResponse with one element
-        3. if all requests are Notifications, server will response nothing'''
+        3. if all requests are Notifications, server will response nothing
+        The responses are in the same order as the requests, so the client can
+        correlate them by position'''
         # handle for empty array
         if len(request_json) == 0:
             response = ErrorResponse(InvalidRequestError("Invalid Request"),
                                      None)
             return response
-        batch_response = BatchResponse()
+        # one slot for each request, the response is put into the slot
+        # of its request, and the slots of notifications are left empty
+        batch_response = BatchResponse(len(request_json))
+        async for index, response in self._iter_batch_responses(request_json):
+            batch_response[index] = response
+
+        if len(batch_response) != 0:
+            return batch_response
+        return None
 
+    async def _iter_batch_responses(self, request_json: List) -> AsyncIterator[Tuple[int, _Response]]:
+        ''' handle for the requests in batch, and yield the (index, response) pairs as soon as
+        the responses are ready, *index* is the position of request in batch '''
         request_group = self._group_requests(request_json)
+        metrics = self.metrics
+        if metrics is not None:
+            # the requests in executors are recorded here, others are
+            # recorded by handle_simple_rpc_call
+            batch_start = time.perf_counter()
+            executor_indexes = set(request_group.thread_indexes)
+            executor_indexes.update(request_group.process_indexes)
+            for index in executor_indexes:
+                metrics.count_call(self._get_metrics_method(request_json[index]))
 
         # process requests
-        thread_responses = self._handle_thread_requests(request_group.thread_requests)
+        thread_indexes = request_group.thread_indexes
+        thread_futures = self._handle_thread_requests([request_json[index]
+                                                       for index in thread_indexes])
 
         # In ProcessPoolExecutor, we can only submit pickle object,
         # which include function but not instance method.  So we have to run only rpc_method
         # in another process.  Which is different to multi thread programming
         # and it's more complicate than ThreadPoolExecutor
-        [process_responses, process_errors] = self._handle_process_requests(request_group.process_requests)
+        process_indexes = request_group.process_indexes
+        [process_futures, process_errors] = self._handle_process_requests(
+            [request_json[index] for index in process_indexes], process_indexes
+        )
+
+        # the requests for async functions run concurrently, and also
+        # overlap with the thread and process requests
+        coroutine_indexes = request_group.coroutine_indexes
+        coroutine_tasks = self._handle_coroutine_requests([request_json[index]
+                                                           for index in coroutine_indexes])
 
         # add errors to batch responses
-        for process_error in process_errors:
-            batch_response.append(process_error)
+        for index, process_error in process_errors:
+            if metrics is not None:
+                self._record_batch_response(request_json[index], process_error, batch_start)
+            yield index, process_error
 
-        # wait for multi-processing response
-        if len(process_responses) > 0:
-            rpc_call_results = await asyncio.wait(process_responses)
-            rpc_call_responses = self._convert_to_response(rpc_call_results)
+        # handle for rpc method which doesn't have special need resource
+        # and it's not asynchronous function, so it won't be suspended
+        for index in request_group.simple_indexes:
+            response = await self.handle_simple_rpc_call(request_json[index])
+            if response:
+                yield index, response
 
-            for result in rpc_call_responses:
-                batch_response.append(result)
+        # the future of a thread request or a coroutine request -> the index of request
+        future_indexes = dict(zip(thread_futures, thread_indexes))
+        future_indexes.update(zip(coroutine_tasks, coroutine_indexes))
+        pending = set(future_indexes)
+        pending.update(process_futures)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future in future_indexes:
+                    response = future.result()
+                    if response:
+                        index = future_indexes[future]
+                        if metrics is not None and index in executor_indexes:
+                            self._record_batch_response(request_json[index], response, batch_start)
+                        yield index, response
+                else:   # the future of process requests
+                    for index, response in self._convert_to_response([future]):
+                        if metrics is not None:
+                            self._record_batch_response(request_json[index], response, batch_start)
+                        yield index, response
 
-        # wait for multi-threading response
-        if len(thread_responses) > 0:
-            rpc_call_responses = await asyncio.wait(thread_responses)
+    def _record_batch_response(self, request_json: JSON, response: _Response, batch_start: float):
+        ''' record the response of a request in batch, which runs in executor '''
+        method = self._get_metrics_method(request_json)
+        self.metrics.observe(method, 'execute', time.perf_counter() - batch_start)
+        if isinstance(response, ErrorResponse):
+            self.metrics.count_error(method, response.error.err_code)
 
-            for result in rpc_call_responses[0]:
-                batch_response.append(result.result())
+    def _can_stream_batch(self, request_json: List, framer: Framer) -> bool:
+        ''' return true if the responses of batched request can be streamed, note that
+        the responses of pipelined requests are written concurrently, so a streamed batch
+        response would be interleaved with them '''
+        return self.stream_batch_responses and framer.streaming and \
+            not self.pipelining and len(request_json) > 0
 
-        # handle for rpc method which doesn't have special need resource
-        # it can be asynchronous function
-        for req in request_group.simple_requests:
-            response = await self.handle_simple_rpc_call(req)
-            if response:
-                batch_response.append(response)
+    async def _stream_batched_rpc_call(self, request_json: List,
+                                       response_writer: ResponseWriter,
+                                       framer: Framer) -> Optional[int]:
+        ''' handle for batched request, and write each response to client as soon as it's
+        ready, the responses are in the order of completion.  The opening "[" is written
+        with the first response, so nothing is written if all requests are notifications.
+        Return the number of error responses, or None if nothing is written '''
+        error_count = None
+        async for index, response in self._iter_batch_responses(request_json):
+            try:
+                data = self.codec.dumps(response.to_json())
+            except self.codec.encode_errors:
+                response = self._replace_unserializable(response)
+                data = self.codec.dumps(response.to_json())
+            if error_count is None:
+                error_count = 0
+                await response_writer.write(b'[' + data)
+            else:
+                await response_writer.write(b',' + data)
+            if isinstance(response, ErrorResponse):
+                error_count += 1
 
-        if len(batch_response) != 0:
-            return batch_response
-        return None
+        if error_count is not None:
+            await response_writer.write(framer.frame(b']'))
+        return error_count
 
-    async def read(self, reader: StreamReader) -> bytes:
+    async def read(self, reader: StreamReader, framer: Framer = None) -> bytes:
         ''' read a request from client
         it's needed to return the content of json body'''
-        return await reader.readline()
+        return await (framer or self.framer).read_frame(reader, self.max_request_size)
 
     def _invoke_method_impl(self,
                             request: Union[Request, Notification],
@@ -218,11 +669,14 @@ class JsonRPC2(_MethodContainer):
         ''' invoke a rpc-method according to request,
         assume that the request is always valid
         which means that the request method exist, and argument is valid too '''
-        method = self.get_method(request.method)
+        method = self._dispatch_table[request.method].func
         if need_resource:
             # when need resource, the method will be invoked
             # in another process, then it will return a future
             # object
+            if self.process_executor is None:
+                # the method is installed in the pool already
+                return self._run_in_process_pool(call_method, request.method, request.params)
             if isinstance(request.params, dict):
                 result_future = self.loop.run_in_executor(self.process_executor,
                                                           functools.partial(method, **request.params))
@@ -235,7 +689,6 @@ class JsonRPC2(_MethodContainer):
                                                           method)
             return result_future
         else:
-            logging.info(f'going to invoke method {request.method}')
             if isinstance(request.params, dict):
                 result = method(**request.params)
             elif isinstance(request.params, list):
@@ -246,44 +699,139 @@ class JsonRPC2(_MethodContainer):
             return result
 
     async def invoke_method(self, request: Union[Request, Notification]) -> Any:
-        result = self._invoke_method_impl(request)
-
-        if asyncio.iscoroutine(result):
-            # await the method and extract the result out
-            result = await result
+        ''' invoke a rpc-method according to request, the method which need multiprocessing
+        or multithreading runs in the executor, and a MethodTimeoutError is raised when the
+        async function or the function in executor doesn't complete in its timeout.
+        The result of method which has cache is got from the cache if it's cached '''
+        rpc_method = self._dispatch_table[request.method]
+        if rpc_method.cache is not None:
+            key = rpc_method.cache.make_key(self._get_qualified_name(request.method), request.params)
+            result = await rpc_method.cache.get_or_call(
+                key, functools.partial(self._invoke_rpc_method, rpc_method, request)
+            )
+        else:
+            result = await self._invoke_rpc_method(rpc_method, request)
         if isinstance(request, Request):
             return result
 
-    def get_method(self, method_name: str) -> Callable:
-        ''' get and return actual rpc method, which may in the modules or in the server
+    async def _invoke_rpc_method(self, rpc_method: RpcMethod,
+                                 request: Union[Request, Notification]) -> Any:
+        if rpc_method.extra_need == ExtraNeed.PROCESS:
+            result = self._invoke_method_impl(request, need_resource=True)
+        elif rpc_method.extra_need == ExtraNeed.THREAD:
+            result = self.loop.run_in_executor(self._get_thread_executor(),
+                                               call_function,
+                                               rpc_method.func,
+                                               request.params)
+        else:
+            result = self._invoke_method_impl(request)
+
+        if asyncio.iscoroutine(result) or asyncio.isfuture(result):
+            # await the method and extract the result out
+            result = await self._wait_for_method(result, rpc_method)
+        return result
+
+    def _get_method_timeout(self, rpc_method: RpcMethod) -> Optional[float]:
+        if rpc_method.timeout is not None:
+            return rpc_method.timeout
+        return self.method_timeout
+
+    async def _wait_for_method(self, awaitable, rpc_method: RpcMethod) -> Any:
+        ''' wait for the result of a call of rpc_method, when the timeout is expired, the
+        async function is cancelled, and the process pool is recycled if the method need
+        multiprocessing, then MethodTimeoutError is raised '''
+        timeout = self._get_method_timeout(rpc_method)
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            logger.warning('method %s does not complete in %s seconds', rpc_method.name, timeout)
+            if rpc_method.extra_need == ExtraNeed.PROCESS:
+                self._recycle_process_pool()
+            raise MethodTimeoutError("Method timeout")
+
+    def get_rpc_method(self, method_name: str) -> RpcMethod:
+        ''' get and return the instance of RpcMethod, which may in the modules or in the server,
+        the method in module is named like "module.method" or "module/method"
         if the method is not existed, a ValueError will occured'''
-        method = self._get_method_in_module(method_name)
-        if method is None:
-            method = super(JsonRPC2, self).get_method(method_name)
-        return method
+        try:
+            return self._dispatch_table[method_name]
+        except KeyError:
+            raise ValueError(f'The method "{method_name}" is not registered in the Server')
 
-    def _get_method_in_module(self, method_name: str) -> Callable:
-        if len(self.modules) == 0:
-            return None
-        splitters = ['.', '/']
-        module_level = 2
-        for splitter in splitters:
-            method_component = method_name.split(splitter)
-            if len(method_component) > module_level:
-                return None
-            elif len(method_component) == module_level:
-                module_name, method_name = method_component
-                return self.modules[module_name].get_method(method_name)
-        return None
+    def invalidate_cache(self, method_name: Optional[str] = None, params: Any = None) -> int:
+        ''' drop the cached results of rpc methods, and return the number of dropped results,
+        the calls which are running don't fill the cache when they complete
+
+        :param method_name: drop the results of this method, which may in the modules or in
+                            the server, None means the results of all methods
+        :param params: drop the result of calling *method_name* with these params, None means
+                       all the results of *method_name*
+        .. versionadded:: 0.6
+        '''
+        if method_name is None:
+            return sum(cache.invalidate() for cache in self._get_caches())
+        rpc_method = self.get_rpc_method(method_name)
+        if rpc_method.cache is None:
+            raise ValueError(f'The method "{method_name}" has no cache')
+        return rpc_method.cache.invalidate(self._get_qualified_name(method_name), params)
+
+    @staticmethod
+    def _get_qualified_name(method_name: str) -> str:
+        ''' return the full qualified name of method, "module/method" is the same as
+        "module.method", so the methods with the same name in different modules have
+        different cache keys '''
+        return method_name.replace('/', '.', 1)
+
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        ''' return the map of method name to the size, hits, misses, coalesced calls and
+        evictions of its cache, the methods which share a cache have the same stats
+
+        .. versionadded:: 0.6
+        '''
+        return {name: rpc_method.cache.to_json()
+                for name, rpc_method in self._dispatch_table.items()
+                if rpc_method.cache is not None and '/' not in name}
+
+    def _get_caches(self) -> List[ResultCache]:
+        ''' return the distinct caches of rpc methods '''
+        caches = {}
+        for rpc_method in self._dispatch_table.values():
+            if rpc_method.cache is not None:
+                caches[id(rpc_method.cache)] = rpc_method.cache
+        return list(caches.values())
 
     def send_response(self, writer: StreamWriter,
                       response: Union[SuccessResponse, ErrorResponse, BatchResponse]):
         ''' send json-rpc2 response back to client '''
+        writer.write(self.serialize_response(response))
+
+    def serialize_response(self, response: Union[SuccessResponse, ErrorResponse, BatchResponse],
+                           framer: Framer = None) -> bytes:
+        ''' convert json-rpc2 response to bytes which can be sent to client, the results
+        which can't be serialized are replaced by InternalError, so the connection is kept '''
         # extract the response object to json-dict
-        logging.info(response)
-        resp_body = response.to_json()
-        logging.info(resp_body)
-        writer.write(json.dumps(resp_body).encode() + b'\n')
+        try:
+            data = self.codec.dumps(response.to_json())
+        except self.codec.encode_errors:
+            data = self.codec.dumps(self._replace_unserializable(response).to_json())
+        return (framer or self.framer).frame(data)
+
+    def _replace_unserializable(self, response: Union[SuccessResponse, ErrorResponse, BatchResponse]):
+        ''' return the response in which the success responses whose result can't be
+        serialized are replaced by InternalError responses '''
+        if isinstance(response, BatchResponse):
+            batch_response = BatchResponse(len(response))
+            for index, item in enumerate(response):
+                batch_response[index] = self._replace_unserializable(item)
+            return batch_response
+        try:
+            self.codec.dumps(response.to_json())
+        except self.codec.encode_errors:
+            logger.exception('failed to serialize the response for request %r', response.resp_id)
+            return ErrorResponse(InternalError("Internal error"), response.resp_id)
+        return response
 
     def get_request_id(self, request_json: JSON, err: JsonRPC2Error) -> Union[str, int]:
         ''' when an error is detected,
@@ -299,23 +847,104 @@ class JsonRPC2(_MethodContainer):
         if so, return an error object, else return None '''
         if is_request_invalid(request_json):
             return InvalidRequestError("Invalid Request")
-        if is_method_not_exist(request_json['method'], self.methods):
+        if is_method_not_exist(request_json['method'], self._dispatch_table):
             return MethodNotFoundError("Method not found")
-        method = self.get_method(request_json['method'])
+        rpc_method = self._dispatch_table[request_json['method']]
 
-        if is_params_invalid(method, request_json.get('params', None)):
+        if rpc_method.is_params_invalid(request_json.get('params', None)):
             return InvalidParamsError("Invalid params")
         return None
 
-    def start(self, port: int = 8080):
-        ''' start the server and listen to client '''
-        server = asyncio.start_server(self.handle_client, port=port, loop=self.loop)
+    def start(self, port: int = 8080, workers: int = 1, framer: Framer = None):
+        ''' start the server and listen to client
+
+        :param port: the port to listen
+        :param workers: the number of worker processes.  When it's larger than 1, the server
+                        forks *workers* processes, each process runs its own event loop and
+                        listens to the same port with SO_REUSEPORT, the main process restarts
+                        the dead workers and shutdown the workers gracefully when receives
+                        SIGINT or SIGTERM.  The registered methods and modules are inherited by
+                        the workers, it's only supported on the platforms which support fork and
+                        SO_REUSEPORT (like Linux)
+        :param framer: the framer for the connections of this listener, defaults to the
+                       framer of server
+        .. versionadded:: 0.6
+           The workers and framer parameters were added
+        '''
+        if workers > 1:
+            supervisor = Supervisor(functools.partial(self._run_worker, port, framer), workers)
+            supervisor.run()
+            return
+
+        self._prewarm_process_pool()
+        # the reader stops buffering an oversized request when it exceeds the limit
+        server = asyncio.start_server(self._get_client_handler(framer), port=port,
+                                      limit=self.max_request_size)
         server = self.loop.run_until_complete(server)
         try:
             self.loop.run_forever()
         finally:
+            self.shutdown_executors()
             self.loop.close()
 
+    def _get_client_handler(self, framer: Framer = None) -> Callable:
+        ''' return the handler for the connections which use *framer* '''
+        if framer is None:
+            return self.handle_client
+        return functools.partial(self.handle_client, framer=framer)
+
+    def _run_worker(self, port: int, framer: Framer = None):
+        ''' entry of worker process in multi-process mode '''
+        # the event loop and executors of the main process can't be shared
+        # with the forked worker, so create new ones
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._process_pool = None
+        self._retired_process_pools = []
+        if self._own_thread_executor:
+            self.thread_executor = None
+        self._prewarm_process_pool()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(signum, self.loop.stop)
+
+        server = asyncio.start_server(self._get_client_handler(framer), port=port,
+                                      limit=self.max_request_size, reuse_port=True)
+        server = self.loop.run_until_complete(server)
+        try:
+            self.loop.run_forever()
+        finally:
+            # stop accepting new connections, close the idle connections,
+            # and give the running requests a chance to complete
+            server.close()
+            self.close_idle_connections()
+            tasks = asyncio.all_tasks(self.loop)
+            if tasks:
+                self.loop.run_until_complete(asyncio.wait(tasks, timeout=self.shutdown_timeout))
+                for task in tasks:
+                    task.cancel()
+                # let the cancelled tasks run their cleanup before the loop is closed
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.shutdown_executors()
+            self.loop.close()
+
+    def add_method(self, method,
+                   restrict=True,
+                   need_multiprocessing=False,
+                   need_multithreading=False,
+                   timeout: Optional[float] = None,
+                   cache: Union[bool, ResultCache, None] = None):
+        ''' add method to json rpc, to make it rpc callable, the parameters are the same
+        as _MethodContainer.add_method.  When the method need multiprocessing, the process
+        pool will be recreated, so the method is installed in the new workers '''
+        super(JsonRPC2, self).add_method(method, restrict,
+                                         need_multiprocessing,
+                                         need_multithreading,
+                                         timeout, cache)
+        self._rebuild_dispatch_table()
+        if need_multiprocessing:
+            self._reset_process_pool()
+
     def register_module(self, module: Module):
         ''' register module to rpc server
 
@@ -323,51 +952,277 @@ class JsonRPC2(_MethodContainer):
         .. versionadded:: 0.4
         '''
         self.modules[module.name] = module
+        module.add_listener(self._on_module_method_added)
+        self._rebuild_dispatch_table()
+        self._reset_process_pool()
+
+    def _on_module_method_added(self, rpc_method: RpcMethod):
+        ''' a method is added to a registered module '''
+        self._rebuild_dispatch_table()
+        if rpc_method.extra_need == ExtraNeed.PROCESS:
+            self._reset_process_pool()
+
+    def _rebuild_dispatch_table(self):
+        ''' rebuild the map of full qualified method name to RpcMethod, the methods
+        in modules can be called as "module.method" or "module/method" '''
+        dispatch_table = dict(self.methods)
+        for module_name, module in self.modules.items():
+            for name, rpc_method in module.methods.items():
+                dispatch_table[f'{module_name}.{name}'] = rpc_method
+                dispatch_table[f'{module_name}/{name}'] = rpc_method
+        if self.metrics is not None:
+            # the reserved method
+            dispatch_table["rpc.metrics"] = self._metrics_method
+        self._dispatch_table = dispatch_table
+
+    def shutdown_executors(self, wait: bool = True):
+        ''' shutdown the executors which are created by the server, the executors which
+        are passed to the server are not touched
+
+        :param wait: wait for the pending calls in the executors to complete
+        .. versionadded:: 0.6
+        '''
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+        # the retired pools may have stuck workers
+        for pool in self._retired_process_pools:
+            pool.terminate()
+        self._retired_process_pools = []
+        if self._own_thread_executor and self.thread_executor is not None:
+            self.thread_executor.shutdown(wait=wait)
+            self.thread_executor = None
+
+    def _add_metrics_gauges(self, metrics: Metrics):
+        metrics.add_gauge("connections", lambda: self.connections,
+                          "The number of open connections.")
+        metrics.add_gauge("thread_executor_queue_depth", self._get_thread_queue_depth,
+                          "The number of calls waiting for a thread.")
+        metrics.add_gauge("process_executor_queue_depth", self._get_process_queue_depth,
+                          "The number of calls submitted to the process pool and not completed.")
+        metrics.add_counter("cache_hits", lambda: self._sum_cache_stats("hits"),
+                            "The number of calls whose results are got from the caches.")
+        metrics.add_counter("cache_misses", lambda: self._sum_cache_stats("misses"),
+                            "The number of calls which execute the methods which have cache.")
+        metrics.add_counter("cache_coalesced", lambda: self._sum_cache_stats("coalesced"),
+                            "The number of calls which wait for an identical running call.")
+        metrics.add_counter("cache_evictions", lambda: self._sum_cache_stats("evictions"),
+                            "The number of cached results which are evicted by the size limit.")
+        metrics.add_gauge("cache_size", lambda: self._sum_cache_stats("size"),
+                          "The number of cached results.")
+        if self.admission is not None:
+            metrics.add_gauge("admission_inflight", lambda: self.admission.inflight,
+                              "The number of admitted calls.")
+            metrics.add_gauge("admission_queue_depth", lambda: self.admission.queued,
+                              "The number of requests waiting for admission.")
+            metrics.add_counter("admission_rejected", lambda: self.admission.rejected,
+                                "The number of rejected connections and requests.")
+
+    def _sum_cache_stats(self, name: str) -> Optional[int]:
+        ''' return the sum of *name* stat of the caches, or None if there is no cache '''
+        caches = self._get_caches()
+        if not caches:
+            return None
+        return sum(cache.to_json()[name] for cache in caches)
+
+    def _get_thread_queue_depth(self) -> Optional[int]:
+        # the private attributes of executor may not exist in other
+        # implementations or python versions
+        qsize = getattr(getattr(self.thread_executor, '_work_queue', None), 'qsize', None)
+        if qsize is None:
+            return None
+        return qsize()
+
+    def _get_process_queue_depth(self) -> Optional[int]:
+        executor = self.process_executor or self._process_pool
+        pending = getattr(executor, '_pending_work_items', None)
+        if not isinstance(pending, dict):
+            return None
+        return len(pending)
+
+    def _get_process_pool(self) -> MethodProcessPool:
+        ''' return the process pool which the rpc methods need multiprocessing
+        are installed in, the pool will be created if it's not existed '''
+        if self._process_pool is None:
+            self._process_pool = MethodProcessPool(self._get_process_methods(),
+                                                   max_workers=self.process_workers)
+        return self._process_pool
+
+    def _get_thread_executor(self) -> ThreadPoolExecutor:
+        ''' return the executor for the rpc methods which need multithreading,
+        the executor will be created if it's not existed '''
+        if self.thread_executor is None:
+            self.thread_executor = ThreadPoolExecutor(max_workers=self.thread_workers)
+        return self.thread_executor
+
+    def _prewarm_process_pool(self):
+        ''' start the workers of process pool before serving, if there are rpc
+        methods which need multiprocessing, so the first calls don't wait for them '''
+        if self.process_executor is None and self._get_process_methods():
+            self._get_process_pool().prewarm()
+
+    def _run_in_process_pool(self, func: Callable, *args) -> Future:
+        ''' run *func* in the process pool, the returned future is tracked by the pool,
+        so the pool isn't terminated before the future is done when it's recycled '''
+        pool = self._get_process_pool()
+        future = self.loop.run_in_executor(pool, func, *args)
+        pool.add_waiter(future)
+        return future
+
+    def _recycle_process_pool(self):
+        ''' retire the process pool, which may have a worker stuck in a call, the new calls
+        are sent to a new pool, and the old pool is terminated when the other calls in it
+        complete or time out.  The process_executor which is passed to the server is not
+        touched '''
+        if self._process_pool is not None:
+            self._process_pool.retire()
+            self._retired_process_pools = [pool for pool in self._retired_process_pools
+                                           if not pool.terminated]
+            self._retired_process_pools.append(self._process_pool)
+            self._process_pool = None
+
+    def _reset_process_pool(self):
+        ''' the methods which are installed in the process pool are changed,
+        so the pool should be recreated when it's used next time '''
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+    def _get_process_methods(self) -> Dict[str, Callable]:
+        ''' return the map of method name to the rpc methods which need multiprocessing,
+        the methods in modules are also included '''
+        return {
+            name: rpc_method.func
+            for name, rpc_method in self._dispatch_table.items()
+            if rpc_method.extra_need == ExtraNeed.PROCESS
+        }
 
     def _group_requests(self, request_json: list) -> _RequestGroup:
         result = _RequestGroup()
+        dispatch_table = self._dispatch_table
 
-        for request in request_json:
-            if isinstance(request, dict) is False or \
-               "method" not in request or \
-               request["method"] not in self.methods:
-                result.simple_requests.append(request)
+        for index, request in enumerate(request_json):
+            rpc_method = None
+            if isinstance(request, dict) and isinstance(request.get("method"), str):
+                rpc_method = dispatch_table.get(request["method"])
+
+            if rpc_method is None:
+                result.simple_indexes.append(index)
             else:
-                rpc_method = self.get_rpc_method(request["method"])
-                if rpc_method.extra_need == ExtraNeed.NOTHING:
-                    result.simple_requests.append(request)
+                # the method which has cache runs in a task as async function, so the
+                # identical calls in a batch share one execution
+                if rpc_method.is_coroutine or rpc_method.cache is not None:
+                    result.coroutine_indexes.append(index)
+                elif rpc_method.extra_need == ExtraNeed.NOTHING:
+                    result.simple_indexes.append(index)
                 elif rpc_method.extra_need == ExtraNeed.PROCESS:
-                    result.process_requests.append(request)
+                    result.process_indexes.append(index)
                 else:
-                    result.thread_requests.append(request)
+                    result.thread_indexes.append(index)
 
         return result
 
-    def _handle_process_requests(self, requests_json: List) -> List:
-        ''' handle for requests which need to be execute in other processes '''
+    def _handle_coroutine_requests(self, requests_json: List) -> List[Future]:
+        ''' handle for requests of async functions concurrently, each request runs
+        in its own task, and at most *max_batch_concurrency* requests are running at
+        the same time '''
+        if self.max_batch_concurrency is None:
+            return [self.loop.create_task(self.handle_simple_rpc_call(request_json))
+                    for request_json in requests_json]
+
+        semaphore = asyncio.Semaphore(self.max_batch_concurrency)
+
+        async def handle_request(request_json: JSON) -> Optional[_Response]:
+            async with semaphore:
+                return await self.handle_simple_rpc_call(request_json)
+
+        return [self.loop.create_task(handle_request(request_json))
+                for request_json in requests_json]
+
+    def _handle_process_requests(self, requests_json: List,
+                                 indexes: Optional[List[int]] = None) -> List:
+        ''' handle for requests which need to be execute in other processes,
+        the requests for the same method are submitted in chunks, each chunk
+        is executed in one worker round trip.  *indexes* are the positions of
+        requests in batch, the errors are returned as (index, response) pairs '''
+        if indexes is None:
+            indexes = range(len(requests_json))
         results = []
         errors = []
-        for request_json in requests_json:
+        requests_by_method = {}
+        for index, request_json in zip(indexes, requests_json):
             error = self.check_errors(request_json)
             if error:
-                errors.append(self._generate_error_response(request_json, error))
+                errors.append((index, self._generate_error_response(request_json, error)))
             else:
                 request = self._parse_request(request_json)
-                result = self._invoke_method_impl(request, need_resource=True)
-
-                if isinstance(request, Request):
-                    # Note: because result returns a future
-                    # and we don't want to lose request id information
-                    # so we add *req_id* attribute to the future object
-                    result.req_id = request.req_id
-                    results.append(result)
+                method_requests = requests_by_method.setdefault(request.method, ([], []))
+                method_requests[0].append(index)
+                method_requests[1].append(request)
+
+        for method_name, (method_indexes, requests) in requests_by_method.items():
+            rpc_method = self._dispatch_table[method_name]
+            has_timeout = self._get_method_timeout(rpc_method) is not None
+            # the method which has timeout is submitted one call per chunk, so each
+            # call has its own deadline, and a stuck call doesn't fail the others
+            chunk_size = 1 if has_timeout else self.process_chunk_size
+            for start in range(0, len(requests), chunk_size):
+                chunk = requests[start:start + chunk_size]
+                result = self._invoke_method_chunk(method_name, chunk)
+                if has_timeout:
+                    result = self.loop.create_task(self._wait_process_call(result, rpc_method))
+                # Note: because result returns a future
+                # and we don't want to lose request id information
+                # so we add *requests* and *indexes* attribute to the future object
+                result.requests = chunk
+                result.indexes = method_indexes[start:start + chunk_size]
+                results.append(result)
         return [results, errors]
 
+    async def _wait_process_call(self, future: Future,
+                                 rpc_method: RpcMethod) -> List[Tuple[bool, Any]]:
+        ''' wait for a chunk of one call with the timeout of method '''
+        try:
+            return await self._wait_for_method(future, rpc_method)
+        except MethodTimeoutError as e:
+            return [(False, e)]
+
+    def _invoke_method_chunk(self,
+                             method_name: str,
+                             requests: List[Union[Request, Notification]]) -> Future:
+        ''' invoke a rpc-method which need multiprocessing with the params of each request
+        in another process, it returns a future of the list of (succeeded, result) pairs '''
+        params_list = [request.params for request in requests]
+        if self.process_executor is None:
+            # the method is installed in the pool already
+            return self._run_in_process_pool(call_method_chunk, method_name, params_list)
+        return self.loop.run_in_executor(self.process_executor,
+                                         call_function_chunk,
+                                         self.get_method(method_name),
+                                         params_list)
+
     def _handle_thread_requests(self, requests_json: List) -> List[Future]:
-        ''' handle for requests which need to be execute in other threads '''
-        results = self._submit_requests_to_executor(self.thread_executor, requests_json)
+        ''' handle for requests which need to be execute in other threads, the request
+        for the method which has timeout is waited in a task with the timeout '''
+        results = self._submit_requests_to_executor(self._get_thread_executor(), requests_json)
+        for i, request_json in enumerate(requests_json):
+            rpc_method = self._dispatch_table[request_json['method']]
+            if self._get_method_timeout(rpc_method) is not None:
+                results[i] = self.loop.create_task(
+                    self._wait_thread_request(results[i], rpc_method, request_json)
+                )
         return results
 
+    async def _wait_thread_request(self, future: Future,
+                                   rpc_method: RpcMethod,
+                                   request_json: JSON) -> Optional[_Response]:
+        try:
+            return await self._wait_for_method(future, rpc_method)
+        except MethodTimeoutError as e:
+            if 'id' in request_json:
+                return self._generate_error_response(request_json, e)
+            return None
+
     def _submit_requests_to_executor(self, executor, requests_json: List) -> List[Future]:
         results = []
         for request_json in requests_json:
@@ -409,14 +1264,26 @@ class JsonRPC2(_MethodContainer):
         if isinstance(request, Request):
             return response
 
-    def _convert_to_response(self, rpc_call_results):
+    def _convert_to_response(self, rpc_call_results: Iterable[Future]) -> List[Tuple[int, _Response]]:
+        ''' convert the done futures of process requests to (index, response) pairs '''
         responses = []
-        for rpc_call_result in rpc_call_results[0]:
+        for rpc_call_result in rpc_call_results:
+            requests = rpc_call_result.requests
             try:
-                response = SuccessResponse(rpc_call_result.result(),
-                                           rpc_call_result.req_id)
-            except Exception as e:   # there is an error in the rpc call
-                response = ErrorResponse(InternalError("Internal error"),
-                                         rpc_call_result.req_id)
-            responses.append(response)
+                outcomes = rpc_call_result.result()
+            except Exception as e:   # the worker process is broken
+                outcomes = [(False, None)] * len(requests)
+
+            for index, request, (succeeded, result) in zip(rpc_call_result.indexes,
+                                                           requests, outcomes):
+                if not isinstance(request, Request):
+                    continue
+                if succeeded:
+                    response = SuccessResponse(result, request.req_id)
+                elif isinstance(result, JsonRPC2Error):   # like the timeout error
+                    response = ErrorResponse(result, request.req_id)
+                else:   # there is an error in the rpc call
+                    response = ErrorResponse(InternalError("Internal error"),
+                                             request.req_id)
+                responses.append((index, response))
         return responses
@@ -0,0 +1,116 @@
+''' signature of rpc method, which is computed once when the method is registered
+and is used to check if the params of request are valid for the method '''
+import inspect
+from .typedef import Callable, Any, Optional
+
+_POSITIONAL_KINDS = (inspect.Parameter.POSITIONAL_ONLY,
+                     inspect.Parameter.POSITIONAL_OR_KEYWORD)
+_KEYWORD_KINDS = (inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                  inspect.Parameter.KEYWORD_ONLY)
+
+
+class MethodSignature:
+    '''
+    A compact descriptor of the parameters of a rpc method
+    Usage example::
+
+        def substract(num1, num2=3, *, verbose=False):
+            pass
+
+        signature = MethodSignature(substract)
+        is_params_invalid = signature.compile_validator()
+        is_params_invalid([1])                 # False
+        is_params_invalid({"num2": 1})         # True, because num1 is required
+
+    :param func: the function to describe
+    '''
+    def __init__(self, func: Callable):
+        # when the signature can't be detected (some builtin functions)
+        # all params are treated as valid
+        self.is_detected = True
+        self.required_positional = 0
+        self.max_positional = 0        # None means unlimited, which the method have *args
+        self.keywords = frozenset()            # names which can be passed by keyword
+        self.required_keywords = frozenset()   # names which must be passed when call by keyword
+        self.kwonly = frozenset()              # keyword-only names
+        self.required_kwonly = frozenset()     # keyword-only names without default value
+        self.has_required_positional_only = False
+        self.var_positional = False
+        self.var_keyword = False
+
+        try:
+            parameters = inspect.signature(func).parameters.values()
+        except (TypeError, ValueError):
+            self.is_detected = False
+            return
+
+        keywords = []
+        required_keywords = []
+        kwonly = []
+        required_kwonly = []
+        for parameter in parameters:
+            has_default = parameter.default is not inspect.Parameter.empty
+            if parameter.kind in _POSITIONAL_KINDS:
+                self.max_positional += 1
+                if not has_default:
+                    self.required_positional += 1
+                    if parameter.kind is inspect.Parameter.POSITIONAL_ONLY:
+                        self.has_required_positional_only = True
+            if parameter.kind in _KEYWORD_KINDS:
+                keywords.append(parameter.name)
+                if not has_default:
+                    required_keywords.append(parameter.name)
+            if parameter.kind is inspect.Parameter.KEYWORD_ONLY:
+                kwonly.append(parameter.name)
+                if not has_default:
+                    required_kwonly.append(parameter.name)
+            elif parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+                self.var_positional = True
+            elif parameter.kind is inspect.Parameter.VAR_KEYWORD:
+                self.var_keyword = True
+
+        if self.var_positional:
+            self.max_positional = None
+        self.keywords = frozenset(keywords)
+        self.required_keywords = frozenset(required_keywords)
+        self.kwonly = frozenset(kwonly)
+        self.required_kwonly = frozenset(required_kwonly)
+
+    def compile_validator(self) -> Callable[[Any], bool]:
+        ''' build and return a function which accepts the params of request,
+        and return true if the params are not valid for the method '''
+        if not self.is_detected:
+            return lambda params: False
+
+        required_positional = self.required_positional
+        max_positional = self.max_positional
+        keywords = self.keywords
+        required_keywords = self.required_keywords
+        accept_any_keyword = self.var_keyword
+        # keyword-only arguments without default value can't be passed by position
+        positional_invalid = len(self.required_kwonly) != 0
+        # positional-only arguments without default value can't be passed by name
+        keyword_invalid = self.has_required_positional_only
+        no_params_invalid = required_positional != 0 or positional_invalid
+
+        def is_params_invalid(params: Optional[Any]) -> bool:
+            if isinstance(params, list):
+                if positional_invalid:
+                    return True
+                params_count = len(params)
+                if params_count < required_positional:
+                    return True
+                return max_positional is not None and params_count > max_positional
+            elif isinstance(params, dict):
+                if keyword_invalid:
+                    return True
+                params_keys = params.keys()
+                if not required_keywords <= params_keys:
+                    # have not provide required parameter
+                    return True
+                # the given parameter contains somthing that the function doesn't know
+                return not accept_any_keyword and not params_keys <= keywords
+            # don't provide any parameter, so check if the method
+            # don't need any parameters
+            return no_params_invalid
+        return is_params_invalid
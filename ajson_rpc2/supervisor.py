@@ -0,0 +1,112 @@
+''' supervisor for the multi-process server mode, which forks worker processes,
+restarts the dead workers, and propagates graceful shutdown to them '''
+import os
+import time
+import signal
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+
+from .typedef import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Supervisor:
+    '''
+    Fork *workers* processes which run *target*, and keep them alive
+    until SIGINT or SIGTERM is received (or `stop` is called), then the workers
+    will receive SIGTERM, and the workers which don't exit in *shutdown_timeout*
+    seconds will be killed.  Note that the worker processes are forked, so all
+    objects in the supervisor process (like registered rpc methods) are inherited
+
+    :param target: the function which runs in each worker process
+    :param workers: the number of worker processes
+    :param shutdown_timeout: how long to wait for the workers to exit when shutdown
+    :param restart_delay: when a worker dies in *restart_delay* seconds after it's started,
+                          the supervisor will wait for *restart_delay* seconds before restart it,
+                          so a broken worker won't be restarted repeatedly
+    .. versionadded:: 0.6
+    '''
+    def __init__(self, target: Callable[[], None],
+                 workers: int,
+                 shutdown_timeout: float = 10.0,
+                 restart_delay: float = 1.0):
+        self.target = target
+        self.workers = workers
+        self.shutdown_timeout = shutdown_timeout
+        self.restart_delay = restart_delay
+        self.processes = [None] * workers
+        self._start_times = [0.0] * workers
+        self._context = multiprocessing.get_context("fork")
+        self._stopping = False
+        self._wakeup_read, self._wakeup_write = os.pipe()
+
+    def run(self):
+        ''' start the workers and supervise them until shutdown '''
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_signal)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            for index in range(self.workers):
+                self._start_worker(index)
+
+            while not self._stopping:
+                sentinels = [process.sentinel for process in self.processes]
+                wait(sentinels + [self._wakeup_read])
+                for index, process in enumerate(self.processes):
+                    if not self._stopping and not process.is_alive():
+                        self._restart_worker(index)
+        finally:
+            self._shutdown_workers()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+
+    def stop(self):
+        ''' stop supervising and shutdown all workers '''
+        self._stopping = True
+        os.write(self._wakeup_write, b'\0')
+
+    def _handle_signal(self, signum, frame):
+        logger.info('received signal %s, shutting down workers', signum)
+        self.stop()
+
+    def _start_worker(self, index: int):
+        process = self._context.Process(target=self._run_target)
+        process.start()
+        self.processes[index] = process
+        self._start_times[index] = time.monotonic()
+
+    def _run_target(self):
+        # the worker shouldn't run the signal handlers of supervisor
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
+        self.target()
+
+    def _restart_worker(self, index: int):
+        process = self.processes[index]
+        logger.error('worker %s exited with code %s, restarting it', process.pid, process.exitcode)
+        process.join()
+        if time.monotonic() - self._start_times[index] < self.restart_delay:
+            time.sleep(self.restart_delay)
+        if not self._stopping:
+            self._start_worker(index)
+
+    def _shutdown_workers(self):
+        processes = [process for process in self.processes if process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.error('worker %s does not exit in time, killing it', process.pid)
+                process.kill()
+                process.join()
@@ -2,7 +2,8 @@
 
 from typing import (
     TypeVar, List, Mapping, Union,
-    Optional, Any, Dict, Callable
+    Optional, Any, Dict, Callable, Tuple,
+    Iterable, Iterator, AsyncIterator, Awaitable
 )
 
 JSON = TypeVar('JSON', List, Mapping)
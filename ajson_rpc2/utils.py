@@ -1,7 +1,7 @@
 ''' utils for json-rpc2 '''
 import json
-import inspect
 from .typedef import JSON, Mapping, Union
+from .signature import MethodSignature
 
 
 def is_json_invalid(json_str: str) -> bool:
@@ -38,35 +38,8 @@ def is_method_not_exist(method: str, rpc_methods: Mapping) -> bool:
 
 
 def is_params_invalid(method, params: Union[dict, list, None]) -> bool:
-    ''' return true if arguments if not valid for method '''
-    method_args = inspect.getfullargspec(method)
-    if isinstance(params, list):
-        if method_args.defaults is None:
-            return len(params) != len(method_args.args)
-        else:
-            if len(params) <= len(method_args.args) and \
-               len(params) >= len(method_args.args) - len(method_args.defaults):
-                return False
-            return True
-    elif isinstance(params, dict):
-        if method_args.defaults is None:
-            cant_omit_args = method_args.args
-        else:
-            cant_omit_args = method_args.args[0:len(method_args.args) - len(method_args.defaults)]
-        for arg in cant_omit_args:
-            if arg not in params:
-                # have not provide required parameter
-                return True
-        for param in params:
-            if param not in method_args.args:
-                # the given parameter contains somthing that the function doesn't know
-                return True
-        return False
-    else:
-        # don't provide any parameter, so check if the method
-        # don't need any parameters
-        if len(method_args.args) == 0:
-            return False
-        if method_args.defaults is not None:
-            return len(method_args.args) - len(method_args.defaults) != 0
-        return True
+    ''' return true if arguments if not valid for method
+
+    Note that the signature of method is detected for each call, for the rpc method
+    which is registered in the server, use the validator of RpcMethod instead '''
+    return MethodSignature(method).compile_validator()(params)
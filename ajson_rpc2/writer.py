@@ -0,0 +1,96 @@
+''' response writer for json-rpc2 connection, which coalesces the responses
+produced in the same loop iteration into one write, and applies backpressure
+when the client doesn't read responses fast enough '''
+import enum
+from asyncio import StreamWriter, AbstractEventLoop
+
+from .typedef import Optional
+
+
+class OverflowPolicy(enum.Enum):
+    "what to do when the write buffer of a connection exceeds the limit"
+    BLOCK = 0   # wait until the client reads enough data
+    CLOSE = 1   # drop the connection
+
+
+class WriteBufferOverflow(ConnectionError):
+    ''' raised when the write buffer exceeds the limit,
+    and the connection is dropped '''
+
+
+class ResponseWriter:
+    '''
+    Wrap for StreamWriter, the data written in the same loop iteration is sent in one
+    write call at the end of iteration.  When the buffered data (both in the
+    ResponseWriter and in the transport) exceeds *buffer_limit*, the writer will wait
+    until the transport is drained or drop the connection, according to *overflow_policy*
+
+    :param writer: the StreamWriter of connection
+    :param loop: the event loop which the connection is running
+    :param buffer_limit: the max bytes which can be buffered for the connection, it's also used as
+                         the high water mark of transport.  None means no limit
+    :param overflow_policy: what to do when the buffer exceeds the limit
+    '''
+    def __init__(self, writer: StreamWriter,
+                 loop: AbstractEventLoop,
+                 buffer_limit: Optional[int] = None,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK):
+        self.writer = writer
+        self.loop = loop
+        self.buffer_limit = buffer_limit
+        self.overflow_policy = overflow_policy
+        self._buffer = []
+        self._buffer_size = 0
+        self._flush_handle = None
+
+        if buffer_limit is not None:
+            writer.transport.set_write_buffer_limits(high=buffer_limit)
+
+    @property
+    def buffer_size(self) -> int:
+        ''' the bytes which are written but not sent to the client yet '''
+        return self._buffer_size + self.writer.transport.get_write_buffer_size()
+
+    async def write(self, data: bytes):
+        ''' write data to the connection, the data will be sent at the end of loop iteration,
+        if the buffer exceeds the limit, it will wait until the transport is drained, or
+        drop the connection and raise WriteBufferOverflow '''
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._flush_handle is None:
+            self._flush_handle = self.loop.call_soon(self.flush)
+
+        if self.buffer_limit is not None and self.buffer_size > self.buffer_limit:
+            if self.overflow_policy is OverflowPolicy.CLOSE:
+                self._buffer.clear()
+                self._buffer_size = 0
+                self.writer.transport.abort()
+                raise WriteBufferOverflow(f'write buffer exceeds the limit {self.buffer_limit}')
+            await self.drain()
+
+    def flush(self):
+        ''' send all buffered data to the transport '''
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer:
+            return
+
+        if len(self._buffer) == 1:
+            self.writer.write(self._buffer[0])
+        else:
+            self.writer.writelines(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+
+    def close(self):
+        ''' send all buffered data to the transport, and close the connection,
+        the data in transport is still sent before the socket is closed '''
+        self.flush()
+        self.writer.close()
+
+    async def drain(self):
+        ''' send all buffered data to the transport, and wait until
+        the transport buffer is below the low water mark '''
+        self.flush()
+        await self.writer.drain()
@@ -0,0 +1,145 @@
+''' microbenchmarks for the hot functions of the dispatch pipeline, so each of them
+can be measured in isolation
+
+The benchmarks are run by pyperf when it's installed (the options of pyperf, like
+``-o results.json`` and ``--compare-to``, can be used), otherwise they are run by
+timeit, and the results can be saved as JSON by ``--output``.
+
+Usage::
+
+    python benchmarks/bench_dispatch.py
+    python benchmarks/bench_dispatch.py --bench check_errors --bench group_requests
+    python benchmarks/bench_dispatch.py --timeit --output results.json
+'''
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ajson_rpc2 import JsonRPC2                                 # noqa: E402
+from ajson_rpc2.module import Module                            # noqa: E402
+from ajson_rpc2.utils import is_request_invalid, is_params_invalid  # noqa: E402
+from ajson_rpc2.models.request import Request                   # noqa: E402
+from ajson_rpc2.models.response import SuccessResponse, ErrorResponse  # noqa: E402
+from ajson_rpc2.models.batch_response import BatchResponse      # noqa: E402
+from ajson_rpc2.models.errors import MethodNotFoundError        # noqa: E402
+
+try:
+    import pyperf
+except ImportError:
+    pyperf = None
+
+REQUEST = {"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}
+BATCH_SIZE = 100
+
+
+def add(num1, num2):
+    return num1 + num2
+
+
+async def async_add(num1, num2):
+    return num1 + num2
+
+
+def process_add(num1, num2):
+    return num1 + num2
+
+
+def thread_add(num1, num2):
+    return num1 + num2
+
+
+def make_server() -> JsonRPC2:
+    server = JsonRPC2()
+    server.add_method(add)
+    server.add_method(async_add)
+    server.add_method(process_add, need_multiprocessing=True)
+    server.add_method(thread_add, need_multithreading=True)
+
+    document = Module("document")
+    document.add_method(add)
+    server.register_module(document)
+    return server
+
+
+def make_benchmarks():
+    ''' return the map of benchmark name to a function without arguments '''
+    server = make_server()
+    rpc_method = server.get_rpc_method("add")
+    methods = ["add", "async_add", "process_add", "thread_add", "document.add", "not_exist"]
+    batch_request = [dict(REQUEST, method=methods[i % len(methods)], id=i) for i in range(BATCH_SIZE)]
+    success_response = SuccessResponse(3, 1)
+    batch_response = BatchResponse(BATCH_SIZE)
+    for i in range(BATCH_SIZE):
+        batch_response[i] = SuccessResponse(i, i) if i % 10 else \
+            ErrorResponse(MethodNotFoundError("Method not found"), i)
+
+    return {
+        "is_request_invalid": lambda: is_request_invalid(REQUEST),
+        # detect the signature for each call
+        "is_params_invalid": lambda: is_params_invalid(add, [1, 2]),
+        # the validator of registered method, which is used by the server
+        "rpc_method_is_params_invalid": lambda: rpc_method.is_params_invalid([1, 2]),
+        "check_errors": lambda: server.check_errors(REQUEST),
+        # _get_method_in_module is replaced by the lookup of dispatch table
+        "get_rpc_method_in_module": lambda: server.get_rpc_method("document.add"),
+        "group_requests": lambda: server._group_requests(batch_request),
+        "request_from_json": lambda: Request.from_json(REQUEST),
+        "parse_request": lambda: server._parse_request(REQUEST),
+        "success_response_to_json": success_response.to_json,
+        "batch_response_to_json": batch_response.to_json,
+        "serialize_success_response": lambda: server.serialize_response(success_response),
+        "serialize_batch_response": lambda: server.serialize_response(batch_response),
+    }
+
+
+def run_pyperf(benchmarks):
+    runner = pyperf.Runner()
+    for name, func in benchmarks.items():
+        runner.bench_func(name, func)
+
+
+def run_timeit(benchmarks, repeat: int = 5):
+    ''' run each benchmark *repeat* times, and return the map of name to the
+    median and min time of one call in nanoseconds '''
+    results = {}
+    for name, func in benchmarks.items():
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        timings = [time / number * 1e9 for time in timer.repeat(repeat, number)]
+        results[name] = {"median_ns": statistics.median(timings), "min_ns": min(timings)}
+        print(f'{name:32s} {results[name]["median_ns"]:12.1f} ns  (min {results[name]["min_ns"]:.1f} ns)')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0], add_help=pyperf is None)
+    parser.add_argument('--bench', action='append', help='only run this benchmark, can be repeated')
+    parser.add_argument('--timeit', action='store_true', help='use timeit even if pyperf is installed')
+    parser.add_argument('--output', help='save the results of timeit as JSON to this file')
+    # the other arguments are passed to pyperf
+    args, sys.argv[1:] = parser.parse_known_args()
+
+    benchmarks = make_benchmarks()
+    if args.bench:
+        unknown = set(args.bench) - set(benchmarks)
+        if unknown:
+            raise SystemExit(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+        benchmarks = {name: func for name, func in benchmarks.items() if name in args.bench}
+
+    if pyperf is not None and not args.timeit:
+        run_pyperf(benchmarks)
+        return
+
+    results = run_timeit(benchmarks)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+''' microbenchmark for the model objects of handling one simple request
+
+It reports the bytes allocated for each Request and SuccessResponse object with
+and without __slots__ (a subclass without __slots__ has an instance dict), and the
+peak bytes allocated and the time of handling one request on the server path (build
+the SuccessResponse object, convert it to a dict and dump it).
+
+Usage::
+
+    python benchmarks/bench_models.py
+'''
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ajson_rpc2 import JsonRPC2                                 # noqa: E402
+from ajson_rpc2.models.request import Request                   # noqa: E402
+from ajson_rpc2.models.response import SuccessResponse          # noqa: E402
+
+REQUEST = {"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}
+ROUNDS = 100000
+OBJECTS = 10000
+
+# the same classes with an instance dict
+DictRequest = type('DictRequest', (Request,), {})
+DictSuccessResponse = type('DictSuccessResponse', (SuccessResponse,), {})
+
+
+def allocated_per_object(factory) -> float:
+    ''' return the bytes allocated for each object created by *factory* '''
+    factory()  # warm up, so the caches are filled before tracing
+    tracemalloc.start()
+    objects = [None] * OBJECTS
+    current, _ = tracemalloc.get_traced_memory()
+    for i in range(OBJECTS):
+        objects[i] = factory()
+    allocated = tracemalloc.get_traced_memory()[0] - current
+    tracemalloc.stop()
+    return allocated / OBJECTS
+
+
+async def handle(server: JsonRPC2) -> bytes:
+    response = await server.handle_simple_rpc_call(REQUEST)
+    return server.serialize_response(response)
+
+
+def allocated_per_request(server: JsonRPC2) -> int:
+    ''' return the peak bytes allocated while handling one request, the objects
+    which are freed before the request completes are counted too '''
+    server.loop.run_until_complete(handle(server))  # warm up
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    server.loop.run_until_complete(handle(server))
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak
+
+
+def time_per_request(server: JsonRPC2) -> float:
+    ''' return the time of handling one request in microseconds '''
+    async def run_rounds():
+        for _ in range(ROUNDS):
+            await handle(server)
+
+    start = time.perf_counter()
+    server.loop.run_until_complete(run_rounds())
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main():
+    server = JsonRPC2()
+
+    @server.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    params = [1, 2]
+    print('allocated for each object (bytes):')
+    print(f'  Request          dict: {allocated_per_object(lambda: DictRequest("add", params, 1)):6.1f}'
+          f'  slots: {allocated_per_object(lambda: Request("add", params, 1)):6.1f}')
+    print(f'  SuccessResponse  dict: {allocated_per_object(lambda: DictSuccessResponse(3, 1)):6.1f}'
+          f'  slots: {allocated_per_object(lambda: SuccessResponse(3, 1)):6.1f}')
+
+    print(f'handle one request, codec {server.codec.name}:')
+    print(f'  peak allocated (bytes): {allocated_per_request(server)}')
+    print(f'  time (us): {time_per_request(server):5.2f}')
+    server.loop.close()
+
+
+if __name__ == '__main__':
+    main()
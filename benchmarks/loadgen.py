@@ -0,0 +1,322 @@
+''' load generator for the json-rpc2 server
+
+It starts a local JsonRPC2 server in another process, drives it with *connections*
+connections, each connection has at most *depth* requests in flight (the server
+enables pipelining when depth is larger than 1), and reports requests/s and the
+p50/p99/p999 latencies of each method.  The server has these methods:
+
+add
+    sync function, which runs in the event loop
+async_sleep
+    async function, which sleeps *seconds*
+thread_work
+    sync function which need multithreading, which sleeps *seconds*
+process_work
+    sync function which need multiprocessing, which sums *n* numbers
+echo
+    returns the payload
+
+The requests are chosen randomly from a mix file, each line is a JSON object like::
+
+    {"method": "add", "params": [1, 2], "weight": 4}
+    {"method": "echo", "payload": true, "weight": 1}
+
+*weight* is the relative frequency (defaults to 1), when *payload* is true, the params
+are a string of --payload-size bytes.  The results can be saved as JSON, and compared
+with the results of another commit.
+
+Usage::
+
+    python benchmarks/loadgen.py --connections 8 --depth 16 --duration 10 --output results.json
+    python benchmarks/loadgen.py --only add --batch-size 10 --compare results.json
+'''
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ajson_rpc2 import JsonRPC2                                 # noqa: E402
+from ajson_rpc2.client import ClientConnection                  # noqa: E402
+from ajson_rpc2.codec import get_codec                          # noqa: E402
+from ajson_rpc2.framing import NewlineFramer, ContentLengthFramer  # noqa: E402
+
+DEFAULT_MIX = os.path.join(os.path.dirname(__file__), 'request_mix.jsonl')
+PERCENTILES = (50, 99, 99.9)
+
+
+def add(num1, num2):
+    return num1 + num2
+
+
+async def async_sleep(seconds):
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def thread_work(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def process_work(n):
+    return sum(range(n))
+
+
+def echo(payload):
+    return payload
+
+
+def make_framer(name: str):
+    return ContentLengthFramer() if name == 'content-length' else NewlineFramer()
+
+
+def run_server(port: int, pipelining: bool, framer: str):
+    ''' entry of the server process '''
+    server = JsonRPC2(pipelining=pipelining, max_inflight_requests=1024,
+                      framer=make_framer(framer))
+    server.add_method(add)
+    server.add_method(async_sleep)
+    server.add_method(thread_work, need_multithreading=True)
+    server.add_method(process_work, need_multiprocessing=True)
+    server.add_method(echo)
+    # stop the server gracefully, so the executors are shutdown
+    server.loop.add_signal_handler(signal.SIGTERM, server.loop.stop)
+    server.start(port=port)
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def load_mix(path: str, payload_size: int, only: str = None):
+    ''' return the (method, params) and weight lists of the request mix '''
+    requests = []
+    weights = []
+    payload = 'x' * payload_size
+    with open(path) as mix_file:
+        for line in mix_file:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if only is not None and entry['method'] != only:
+                continue
+            params = [payload] if entry.get('payload') else entry.get('params')
+            requests.append((entry['method'], params))
+            weights.append(entry.get('weight', 1))
+    if not requests:
+        raise SystemExit(f'no request in the mix file {path}')
+    return requests, weights
+
+
+class LoadGenerator:
+    ''' send requests through *connections* connections, with at most *depth*
+    requests(or batched requests) in flight for each connection '''
+    def __init__(self, args, requests, weights):
+        self.args = args
+        self.requests = requests
+        self.weights = weights
+        self.random = random.Random(args.seed)
+        self.codec = get_codec()
+        self.next_id = 0
+        # method -> the latencies of its calls, in seconds
+        self.latencies = {}
+        # method -> the number of error responses
+        self.errors = {}
+
+    async def run(self, port: int) -> float:
+        ''' run the load, and return the elapsed seconds '''
+        connections = []
+        for _ in range(self.args.connections):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=2 ** 24)
+            connections.append(ClientConnection(reader, writer, make_framer(self.args.framer),
+                                                self.codec, 2 ** 24))
+
+        # warm up, and the results are dropped
+        await self._run_workers(connections, time.monotonic() + self.args.warmup)
+        self.latencies.clear()
+        self.errors.clear()
+
+        start = time.perf_counter()
+        await self._run_workers(connections, time.monotonic() + self.args.duration)
+        elapsed = time.perf_counter() - start
+        for connection in connections:
+            await connection.close()
+        return elapsed
+
+    async def _run_workers(self, connections, deadline: float):
+        workers = [self._worker(connection, deadline)
+                   for connection in connections
+                   for _ in range(self.args.depth)]
+        await asyncio.gather(*workers)
+
+    async def _worker(self, connection: ClientConnection, deadline: float):
+        batch_size = self.args.batch_size
+        while time.monotonic() < deadline:
+            calls = self.random.choices(self.requests, self.weights, k=batch_size)
+            payload = []
+            ids = []
+            for method, params in calls:
+                self.next_id += 1
+                ids.append(self.next_id)
+                payload.append({"jsonrpc": "2.0", "method": method, "params": params,
+                                "id": self.next_id})
+            start = time.perf_counter()
+            futures = await connection.send(payload if batch_size > 1 else payload[0], ids)
+            for (method, _), future in zip(calls, futures):
+                try:
+                    await future
+                except Exception:
+                    self.errors[method] = self.errors.get(method, 0) + 1
+                self.latencies.setdefault(method, []).append(time.perf_counter() - start)
+
+
+def percentile(sorted_values, percent: float) -> float:
+    ''' nearest-rank percentile of *sorted_values* '''
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed: float):
+    def stats(values, error_count):
+        values = sorted(values)
+        result = {
+            "requests": len(values),
+            "errors": error_count,
+            "requests_per_second": len(values) / elapsed
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent:g}_ms"] = percentile(values, percent) * 1000 if values else None
+        return result
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "overall": stats(all_latencies, sum(errors.values())),
+        "methods": {method: stats(values, errors.get(method, 0))
+                    for method, values in sorted(latencies.items())}
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    columns = ('requests_per_second', 'p50_ms', 'p99_ms', 'p99.9_ms')
+    print(f'{"method":14s} {"req/s":>10s} {"p50 ms":>9s} {"p99 ms":>9s} {"p999 ms":>9s} {"errors":>7s}')
+    rows = [('overall', results['overall'])] + list(results['methods'].items())
+    for name, stats in rows:
+        values = ' '.join(_format(stats[column], 10, 1) if column == 'requests_per_second'
+                          else _format(stats[column], 9, 3) for column in columns)
+        print(f'{name:14s} {values} {stats["errors"]:7d}')
+        if baseline is None:
+            continue
+        base = baseline['overall'] if name == 'overall' else baseline['methods'].get(name)
+        if base is None:
+            continue
+        changes = ' '.join(f'{_change(stats[column], base[column]):>9s}' if column != 'requests_per_second'
+                           else f'{_change(stats[column], base[column]):>10s}' for column in columns)
+        print(f'{"  vs baseline":14s} {changes}')
+
+
+def _format(value, width: int, precision: int) -> str:
+    # the percentiles of a method without successful requests are None
+    if value is None:
+        return f'{"n/a":>{width}s}'
+    return f'{value:{width}.{precision}f}'
+
+
+def _change(value, base) -> str:
+    if not value or not base:
+        return '-'
+    return f'{(value - base) / base * 100:+.1f}%'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='load generator for the json-rpc2 server')
+    parser.add_argument('--connections', type=int, default=4, help='the number of connections')
+    parser.add_argument('--depth', type=int, default=1,
+                        help='the max requests in flight for each connection, '
+                             'the server enables pipelining when it is larger than 1')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='the number of calls in each request, 1 sends single requests')
+    parser.add_argument('--payload-size', type=int, default=1024,
+                        help='the bytes of payload for the requests which have payload in the mix')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='the JSONL file of request mix')
+    parser.add_argument('--only', help='only send the requests for this method in the mix')
+    parser.add_argument('--duration', type=float, default=5, help='seconds to run the load')
+    parser.add_argument('--warmup', type=float, default=1, help='seconds to warm up before measuring')
+    parser.add_argument('--framer', choices=('newline', 'content-length'), default='newline')
+    parser.add_argument('--seed', type=int, default=0, help='the seed to choose requests from the mix')
+    parser.add_argument('--output', help='save the results as JSON to this file')
+    parser.add_argument('--compare', help='compare the results with the JSON results of a previous run')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    requests, weights = load_mix(args.mix, args.payload_size, args.only)
+
+    port = get_free_port()
+    context = multiprocessing.get_context('fork')
+    server_process = context.Process(target=run_server, args=(port, args.depth > 1, args.framer))
+    server_process.start()
+    try:
+        wait_for_port(port)
+        generator = LoadGenerator(args, requests, weights)
+        elapsed = asyncio.run(generator.run(port))
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+    results = summarize(generator.latencies, generator.errors, elapsed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            "commit": get_commit(),
+            "python": sys.version.split()[0],
+            "codec": generator.codec.name,
+            "config": {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'compare')},
+            "elapsed": elapsed,
+            "results": results
+        }
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,8 @@ from ajson_rpc2.utils import (
 from ajson_rpc2.models.errors import (
     ParseError, InvalidRequestError,
     MethodNotFoundError, InvalidParamsError,
-    InternalError
+    InternalError, MethodTimeoutError, ServerBusyError,
+    JsonRPC2Error, error_from_json
 )
 
 from ajson_rpc2.models.response import (
@@ -27,8 +28,37 @@ from ajson_rpc2.models.batch_request import BatchRequest
 
 from ajson_rpc2.models.batch_response import BatchResponse
 
-from ajson_rpc2.models.fixed_list import FixedList
+from ajson_rpc2.models.slot_list import SlotList
 
 from ajson_rpc2.method import ExtraNeed, RpcMethod
 
+from ajson_rpc2.signature import MethodSignature
+
 from ajson_rpc2.module import Module
+
+from ajson_rpc2.codec import (
+    get_codec, JsonCodec, StdlibCodec, OrjsonCodec, UjsonCodec
+)
+
+from ajson_rpc2.writer import ResponseWriter, OverflowPolicy, WriteBufferOverflow
+
+from ajson_rpc2.access_log import AccessLog, use_queue_handler, ACCESS_LOGGER_NAME
+
+from ajson_rpc2.supervisor import Supervisor
+
+from ajson_rpc2.process_pool import (
+    MethodProcessPool, call_method,
+    call_method_chunk, call_function_chunk
+)
+
+from ajson_rpc2.framing import (
+    Framer, NewlineFramer, ContentLengthFramer, FrameError, FrameTooLarge
+)
+
+from ajson_rpc2.admission import AdmissionControl, Admission
+
+from ajson_rpc2.metrics import Metrics, MethodMetrics, Histogram
+
+from ajson_rpc2.client import JsonRPC2Client, ClientConnection, BatchCall
+
+from ajson_rpc2.cache import ResultCache
@@ -0,0 +1,98 @@
+''' test for access_log module '''
+import json
+import logging
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from .context import (
+    JsonRPC2, AccessLog, use_queue_handler, ACCESS_LOGGER_NAME,
+    SuccessResponse, ErrorResponse, BatchResponse, MethodNotFoundError
+)
+
+
+@pytest.fixture
+def response_writer():
+    mock_writer = Mock()
+    mock_writer.write = AsyncMock()
+    return mock_writer
+
+
+def test_sample_when_logger_is_disabled():
+    logger = logging.getLogger("test_access_log.disabled")
+    logger.setLevel(logging.WARNING)
+    assert AccessLog(logger).sample() is False
+
+
+def test_sample_when_logger_is_enabled():
+    logger = logging.getLogger("test_access_log.enabled")
+    logger.setLevel(logging.INFO)
+    assert AccessLog(logger).sample() is True
+    assert AccessLog(logger, sample_rate=0).sample() is False
+
+
+def test_log_simple_request(caplog):
+    access_log = AccessLog()
+    with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER_NAME):
+        access_log.log(("127.0.0.1", 80), {"jsonrpc": "2.0", "method": "add", "id": 3},
+                       SuccessResponse(3, 3), 0.002)
+        access_log.log(("127.0.0.1", 80), {"jsonrpc": "2.0", "method": "sub", "id": 4},
+                       ErrorResponse(MethodNotFoundError("Method not found"), 4), 0.001)
+
+    success_record, error_record = caplog.records
+    assert success_record.rpc_method == "add"
+    assert success_record.rpc_id == 3
+    assert success_record.rpc_status == "ok"
+    assert success_record.rpc_latency == 0.002
+    assert error_record.rpc_status == -32601
+    assert "sub id=4 status=-32601" in error_record.getMessage()
+
+
+def test_log_batched_request(caplog):
+    batch_response = BatchResponse()
+    batch_response.append(SuccessResponse(3, 1))
+    batch_response.append(ErrorResponse(MethodNotFoundError("Method not found"), 2))
+
+    with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER_NAME):
+        AccessLog().log(None, [{}, {}], batch_response, 0.001)
+
+    assert caplog.records[0].rpc_method == "batch[2]"
+    assert caplog.records[0].rpc_status == "errors=1"
+
+
+def test_server_write_access_log(test_app: JsonRPC2, response_writer: Mock, caplog):
+    @test_app.rpc_call
+    def half(num):
+        return num // 2
+
+    request_raw = json.dumps({"jsonrpc": "2.0", "method": "half", "params": [4], "id": 1}).encode()
+    with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER_NAME):
+        test_app.loop.run_until_complete(test_app.handle_request_raw(response_writer, request_raw, "peer"))
+
+    record, = caplog.records
+    assert record.rpc_peer == "peer"
+    assert record.rpc_method == "half"
+    assert record.rpc_status == "ok"
+
+
+def test_server_not_write_access_log_by_default(test_app: JsonRPC2, response_writer: Mock, caplog):
+    @test_app.rpc_call
+    def half(num):
+        return num // 2
+
+    request_raw = json.dumps({"jsonrpc": "2.0", "method": "half", "params": [4], "id": 1}).encode()
+    test_app.loop.run_until_complete(test_app.handle_request_raw(response_writer, request_raw, "peer"))
+    assert len(caplog.records) == 0
+
+
+def test_use_queue_handler():
+    logger = logging.getLogger("test_access_log.queue")
+    logger.setLevel(logging.INFO)
+    handler = Mock()
+    handler.level = logging.NOTSET
+
+    listener = use_queue_handler(handler, logger=logger)
+    AccessLog(logger).log(None, {"method": "add", "id": 1}, None, 0.001)
+    listener.stop()
+
+    assert logger.propagate is False
+    handler.handle.assert_called_once()
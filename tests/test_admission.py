@@ -0,0 +1,112 @@
+''' test for admission module '''
+import asyncio
+import pytest
+
+from .context import AdmissionControl, ServerBusyError
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_limit_connections():
+    admission = AdmissionControl(max_connections=2)
+    assert admission.open_connection()
+    assert admission.open_connection()
+    assert not admission.open_connection()
+    assert admission.rejected == 1
+
+    admission.close_connection()
+    assert admission.open_connection()
+    assert admission.connections == 2
+
+
+def test_reject_when_queue_is_full(loop):
+    admission = AdmissionControl(max_inflight=1)
+
+    async def acquire_twice():
+        first = await admission.acquire(["add"])
+        with pytest.raises(ServerBusyError):
+            await admission.acquire(["add"])
+        admission.release(first)
+        # the slot is free again
+        admission.release(await admission.acquire(["add"]))
+
+    loop.run_until_complete(acquire_twice())
+    assert admission.rejected == 1
+    assert admission.inflight == 0
+
+
+def test_wait_in_queue_in_order(loop):
+    admission = AdmissionControl(max_inflight=2, max_queue=2)
+    admitted = []
+
+    async def call(name, calls):
+        admission_ = await admission.acquire([name] * calls)
+        admitted.append(name)
+        return admission_
+
+    async def main():
+        first = await admission.acquire(["first", "first"])
+        # the big request is at the head of queue, so the small one
+        # can't go ahead of it
+        big = asyncio.ensure_future(call("big", 2))
+        small = asyncio.ensure_future(call("small", 1))
+        await asyncio.sleep(0)
+        assert admission.queued == 2
+        with pytest.raises(ServerBusyError):
+            await admission.acquire(["rejected"])
+
+        admission.release(first)
+        admission.release(await big)
+        admission.release(await small)
+
+    loop.run_until_complete(main())
+    assert admitted == ["big", "small"]
+    assert admission.inflight == 0
+
+
+def test_queue_timeout(loop):
+    admission = AdmissionControl(max_inflight=1, max_queue=1, queue_timeout=0.01)
+
+    async def main():
+        first = await admission.acquire(["add"])
+        with pytest.raises(ServerBusyError):
+            await admission.acquire(["add"])
+        assert admission.queued == 0
+        admission.release(first)
+
+    loop.run_until_complete(main())
+    assert admission.rejected == 1
+
+
+def test_limit_method_inflight(loop):
+    admission = AdmissionControl(method_limits={"report": 1})
+
+    async def main():
+        report = await admission.acquire(["report"])
+        # other methods are not limited
+        admission.release(await admission.acquire(["add", "add", None]))
+        with pytest.raises(ServerBusyError):
+            await admission.acquire(["add", "report"])
+        admission.release(report)
+        assert admission.method_inflight == {"report": 0}
+
+    loop.run_until_complete(main())
+
+
+def test_admit_large_request_when_idle(loop):
+    admission = AdmissionControl(max_inflight=2)
+
+    async def main():
+        large = await admission.acquire(["add"] * 5)
+        assert admission.inflight == 2
+        with pytest.raises(ServerBusyError):
+            await admission.acquire(["add"])
+        admission.release(large)
+
+    loop.run_until_complete(main())
+    assert admission.inflight == 0
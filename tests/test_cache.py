@@ -0,0 +1,135 @@
+''' test for cache module '''
+import asyncio
+import pytest
+
+from .context import ResultCache
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_canonical_key():
+    assert ResultCache.make_key("add", {"num1": 1, "num2": 2}) == \
+        ResultCache.make_key("add", {"num2": 2, "num1": 1})
+    assert ResultCache.make_key("add", [1, 2]) != ResultCache.make_key("sub", [1, 2])
+    assert ResultCache.make_key("add", [1, 2]) != ResultCache.make_key("add", [2, 1])
+
+
+def test_evict_least_recently_used():
+    cache = ResultCache(max_size=2)
+    cache.set(("add", "[1]"), 1)
+    cache.set(("add", "[2]"), 2)
+    # use the first result, so the second one is evicted
+    assert cache.get(("add", "[1]")) == (True, 1)
+    cache.set(("add", "[3]"), 3)
+
+    assert cache.get(("add", "[2]")) == (False, None)
+    assert cache.get(("add", "[1]")) == (True, 1)
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+
+def test_expire_result(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("ajson_rpc2.cache.time.monotonic", lambda: now)
+    cache = ResultCache(ttl=10)
+    cache.set(("add", "[1]"), 1)
+
+    now = 109.0
+    assert cache.get(("add", "[1]")) == (True, 1)
+    now = 110.0
+    assert cache.get(("add", "[1]")) == (False, None)
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = ResultCache()
+    cache.set(cache.make_key("add", [1]), 1)
+    cache.set(cache.make_key("add", [2]), 2)
+    cache.set(cache.make_key("sub", [1]), -1)
+
+    assert cache.invalidate("add", [1]) == 1
+    assert cache.invalidate("add", [1]) == 0
+    assert cache.invalidate("add") == 1
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+
+def test_single_flight(loop):
+    cache = ResultCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def call_concurrently():
+        key = cache.make_key("compute", [])
+        results = await asyncio.gather(*[cache.get_or_call(key, compute) for _ in range(3)])
+        results.append(await cache.get_or_call(key, compute))
+        return results
+
+    assert loop.run_until_complete(call_concurrently()) == [1, 1, 1, 1]
+    assert calls == 1
+    assert cache.to_json() == {"size": 1, "hits": 1, "misses": 1, "coalesced": 2, "evictions": 0}
+
+
+def test_error_is_not_cached(loop):
+    cache = ResultCache()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("fail")
+
+    async def call_concurrently():
+        key = cache.make_key("fail", [])
+        return await asyncio.gather(cache.get_or_call(key, fail), cache.get_or_call(key, fail),
+                                    return_exceptions=True)
+
+    results = loop.run_until_complete(call_concurrently())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(cache) == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_call(loop):
+    cache = ResultCache()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 1
+
+    async def call_and_cancel():
+        key = cache.make_key("compute", [])
+        first = asyncio.ensure_future(cache.get_or_call(key, compute))
+        second = asyncio.ensure_future(cache.get_or_call(key, compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert loop.run_until_complete(call_and_cancel()) == 1
+    assert len(cache) == 1
+
+
+def test_invalidate_running_call(loop):
+    cache = ResultCache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def call_and_invalidate():
+        key = cache.make_key("compute", [])
+        call = asyncio.ensure_future(cache.get_or_call(key, compute))
+        await asyncio.sleep(0)
+        cache.invalidate("compute")
+        return await call
+
+    # the caller still gets the result, but it isn't cached
+    assert loop.run_until_complete(call_and_invalidate()) == 1
+    assert len(cache) == 0
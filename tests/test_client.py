@@ -0,0 +1,285 @@
+''' test for client module '''
+import asyncio
+import pytest
+
+from .context import (
+    JsonRPC2, JsonRPC2Client, ContentLengthFramer, Metrics,
+    MethodNotFoundError, InvalidParamsError, InvalidRequestError, JsonRPC2Error
+)
+
+
+@pytest.fixture
+def server():
+    server = JsonRPC2(pipelining=True)
+
+    @server.rpc_call
+    def subtract(num1, num2):
+        return num1 - num2
+
+    @server.rpc_call
+    async def sleep(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    @server.rpc_call
+    def echo(data):
+        return data
+
+    yield server
+    server.loop.close()
+
+
+def run_with_server(server: JsonRPC2, client_main, framer=None, **client_kwargs):
+    ''' start *server* on a free port, and run *client_main* with a client connecting to it '''
+    async def main():
+        handler = server._get_client_handler(framer)
+        listener = await asyncio.start_server(handler, '127.0.0.1', 0,
+                                              limit=server.max_request_size)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            async with JsonRPC2Client('127.0.0.1', port, framer=framer, **client_kwargs) as client:
+                return await client_main(client)
+        finally:
+            listener.close()
+            # let the server handle the closed connections
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            if tasks:
+                await asyncio.wait(tasks, timeout=1)
+
+    return server.loop.run_until_complete(main())
+
+
+def test_call(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        return [await client.call("subtract", [42, 23]),
+                await client.call("subtract", {"num1": 23, "num2": 42})]
+
+    assert run_with_server(server, main) == [19, -19]
+
+
+def test_call_with_error(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        with pytest.raises(MethodNotFoundError):
+            await client.call("not_exist")
+        with pytest.raises(InvalidParamsError) as exc_info:
+            await client.call("subtract", [1])
+        assert exc_info.value.to_json() == {"code": -32602, "message": "Invalid params"}
+        # the connection is still usable
+        return await client.call("subtract", [2, 1])
+
+    assert run_with_server(server, main) == 1
+
+
+def test_multiplex_calls_on_one_connection(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        # the responses come back in the order of completion
+        results = await asyncio.gather(client.call("sleep", [0.05]),
+                                       client.call("sleep", [0]),
+                                       client.call("sleep", [0.02]))
+        assert len(client.connections) == 1
+        return results
+
+    assert run_with_server(server, main) == [0.05, 0, 0.02]
+
+
+def test_connection_pool(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        await asyncio.gather(*[client.call("sleep", [0.01]) for _ in range(5)])
+        assert len(client.connections) == 2
+        # the idle connection is reused
+        await client.call("sleep", [0])
+        return len(client.connections)
+
+    assert run_with_server(server, main, pool_size=2) == 2
+
+
+def test_call_timeout(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call("sleep", [0.1], timeout=0.01)
+        return await client.call("sleep", [0])
+
+    assert run_with_server(server, main) == 0
+
+
+def test_notify(server: JsonRPC2):
+    called = []
+
+    @server.rpc_call
+    def log(message):
+        called.append(message)
+
+    async def main(client: JsonRPC2Client):
+        await client.notify("log", ["hello"])
+        # the notification has no response, so wait for a call after it
+        return await client.call("subtract", [1, 1])
+
+    assert run_with_server(server, main) == 0
+    assert called == ["hello"]
+
+
+def test_batch(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        batch = client.batch()
+        subtract = batch.call("subtract", [42, 23])
+        batch.notify("subtract", [1, 1])
+        not_exist = batch.call("not_exist")
+        echo = batch.call("echo", ["hello"])
+        results = await batch.send(return_exceptions=True)
+
+        assert subtract.result() == 19
+        assert isinstance(not_exist.exception(), MethodNotFoundError)
+        assert echo.result() == "hello"
+        return results
+
+    results = run_with_server(server, main)
+    assert results[0] == 19
+    assert isinstance(results[1], MethodNotFoundError)
+    assert results[2] == "hello"
+
+
+def test_batch_raise_first_error(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        batch = client.batch()
+        batch.call("subtract", [42, 23])
+        batch.call("subtract", [1])
+        with pytest.raises(InvalidParamsError):
+            await batch.send()
+
+    run_with_server(server, main)
+
+
+def test_content_length_framer_and_large_response(server: JsonRPC2):
+    data = "a\nb" * 100000
+
+    async def main(client: JsonRPC2Client):
+        return await client.call("echo", [data])
+
+    assert run_with_server(server, main, framer=ContentLengthFramer()) == data
+
+
+def test_large_response_in_newline_framer(server: JsonRPC2):
+    data = "a" * 300000
+
+    async def main(client: JsonRPC2Client):
+        return await client.call("echo", [data])
+
+    assert run_with_server(server, main) == data
+
+
+def test_fail_calls_when_connection_is_closed(server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        call = asyncio.ensure_future(client.call("sleep", [0.1]))
+        await asyncio.sleep(0.01)
+        await client.connections[0].close()
+        with pytest.raises(ConnectionError):
+            await call
+        # a new connection is opened
+        return await client.call("subtract", [2, 1])
+
+    assert run_with_server(server, main) == 1
+
+
+def test_fail_calls_when_request_is_too_large():
+    server = JsonRPC2(pipelining=True, max_request_size=1024)
+
+    @server.rpc_call
+    def echo(data):
+        return data
+
+    async def main(client: JsonRPC2Client):
+        # the error response of an oversized request has no id
+        with pytest.raises(InvalidRequestError):
+            await client.call("echo", ["x" * 2048], timeout=5)
+        # the connection is still usable
+        return await client.call("echo", ["x"])
+
+    try:
+        assert run_with_server(server, main) == "x"
+    finally:
+        server.loop.close()
+
+
+def test_unknown_error_code(server: JsonRPC2):
+    @server.rpc_call
+    def fail():
+        return None
+
+    async def main(client: JsonRPC2Client):
+        connection = await client.get_connection()
+        [future] = await connection.send({"jsonrpc": "2.0", "method": "fail", "id": "x"}, ["x"])
+        connection._dispatch_response({"jsonrpc": "2.0", "id": "x",
+                                       "error": {"code": -32099, "message": "Custom", "data": 1}})
+        with pytest.raises(JsonRPC2Error) as exc_info:
+            await future
+        assert exc_info.value.err_code == -32099
+        assert exc_info.value.data == 1
+
+    run_with_server(server, main)
+
+
+@pytest.fixture
+def metrics_server():
+    server = JsonRPC2(metrics=Metrics())
+
+    @server.rpc_call
+    def subtract(num1, num2):
+        return num1 - num2
+
+    yield server
+    server.loop.close()
+
+
+def test_coalesce_calls(metrics_server: JsonRPC2):
+    called = []
+
+    @metrics_server.rpc_call
+    def log(message):
+        called.append(message)
+
+    async def main(client: JsonRPC2Client):
+        await client.notify("log", ["hello"])
+        return await asyncio.gather(*[client.call("subtract", [i, 1]) for i in range(4)],
+                                    client.call("subtract", [1]),
+                                    return_exceptions=True)
+
+    results = run_with_server(metrics_server, main, coalesce_delay=0)
+    assert results[:4] == [-1, 0, 1, 2]
+    assert isinstance(results[4], InvalidParamsError)
+    assert called == ["hello"]
+
+    methods = metrics_server.metrics.methods
+    assert methods["rpc.batch"].calls == 1
+    assert methods["subtract"].calls == 5
+
+
+def test_coalesce_calls_with_max_batch_size(metrics_server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        return await asyncio.gather(*[client.call("subtract", [i, 1]) for i in range(5)])
+
+    results = run_with_server(metrics_server, main, coalesce_delay=0.05, max_batch_size=2)
+    assert results == [-1, 0, 1, 2, 3]
+
+    methods = metrics_server.metrics.methods
+    # the last call is sent as a single request after the delay
+    assert methods["rpc.batch"].calls == 2
+    assert methods["subtract"].calls == 5
+
+
+def test_coalesce_single_call(metrics_server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        return await client.call("subtract", [3, 1])
+
+    assert run_with_server(metrics_server, main, coalesce_delay=0.01) == 2
+    assert "rpc.batch" not in metrics_server.metrics.methods
+
+
+def test_coalesced_call_timeout(metrics_server: JsonRPC2):
+    async def main(client: JsonRPC2Client):
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call("subtract", [3, 1], timeout=0.01)
+        return await client.call("subtract", [2, 1], timeout=1)
+
+    assert run_with_server(metrics_server, main, coalesce_delay=0.05) == 1
+    # the call which is timed out before it's sent is dropped
+    assert metrics_server.metrics.methods["subtract"].calls == 1
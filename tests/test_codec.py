@@ -0,0 +1,104 @@
+''' test for codec module '''
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from .context import (
+    JsonRPC2,
+    get_codec, JsonCodec, StdlibCodec, OrjsonCodec, UjsonCodec
+)
+
+
+def _installed_codecs():
+    codecs = [StdlibCodec()]
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.fixture(params=_installed_codecs(), ids=lambda codec: codec.name)
+def codec(request):
+    return request.param
+
+
+def test_codec_loads_from_bytes(codec: JsonCodec):
+    assert codec.loads(b'{"jsonrpc": "2.0", "method": "foo", "params": [1, "\xe4\xbd\xa0"]}') == {
+        "jsonrpc": "2.0", "method": "foo", "params": [1, "你"]
+    }
+
+
+def test_codec_dumps_to_bytes(codec: JsonCodec):
+    data = {"jsonrpc": "2.0", "id": 1, "result": ["你", 2.5, None]}
+    dumped = codec.dumps(data)
+    assert isinstance(dumped, bytes)
+    assert codec.loads(dumped) == data
+
+
+def test_codec_dumps_big_int_and_non_str_keys(codec: JsonCodec):
+    data = {"result": 2 ** 70, "keys": {1: "a", None: "b"}}
+    # the same as the json module
+    assert json.loads(codec.dumps(data)) == json.loads(json.dumps(data))
+    assert codec.loads(codec.dumps({"result": 2 ** 70}))["result"] == 2 ** 70
+
+
+def test_codec_encode_errors(codec: JsonCodec):
+    with pytest.raises(codec.encode_errors):
+        codec.dumps({"result": object()})
+
+
+def test_server_replaces_unserializable_result(codec: JsonCodec):
+    app = JsonRPC2(codec=codec)
+    response_writer = Mock()
+    response_writer.write = AsyncMock()
+
+    @app.rpc_call
+    def big():
+        return 2 ** 70
+
+    @app.rpc_call
+    def unserializable():
+        return object()
+
+    async def send_requests():
+        for request in (b'{"jsonrpc": "2.0", "method": "unserializable", "id": 1}',
+                        b'[{"jsonrpc": "2.0", "method": "big", "id": 2}, '
+                        b'{"jsonrpc": "2.0", "method": "unserializable", "id": 3}]',
+                        b'{"jsonrpc": "2.0", "method": "big", "id": 4}'):
+            await app.handle_request_raw(response_writer, request)
+
+    app.loop.run_until_complete(send_requests())
+    app.loop.close()
+    internal_error = {"code": -32603, "message": "Internal error"}
+    assert [json.loads(call.args[0]) for call in response_writer.write.call_args_list] == [
+        {"jsonrpc": "2.0", "error": internal_error, "id": 1},
+        [{"jsonrpc": "2.0", "result": 2 ** 70, "id": 2},
+         {"jsonrpc": "2.0", "error": internal_error, "id": 3}],
+        {"jsonrpc": "2.0", "result": 2 ** 70, "id": 4}
+    ]
+
+
+def test_codec_decode_errors(codec: JsonCodec):
+    for invalid_data in (b'{"id": 1, "jsonrpc":}', b'\xff\xfe', b''):
+        with pytest.raises(codec.decode_errors):
+            codec.loads(invalid_data)
+
+
+def test_get_codec_by_name():
+    assert isinstance(get_codec("json"), StdlibCodec)
+
+
+def test_get_not_supported_codec():
+    with pytest.raises(ValueError):
+        get_codec("foo")
+
+
+def test_get_default_codec():
+    assert isinstance(get_codec(), JsonCodec)
+
+
+def test_init_server_with_codec():
+    codec = StdlibCodec()
+    app = JsonRPC2(codec=codec)
+    assert app.codec is codec
@@ -0,0 +1,109 @@
+''' test for framing module '''
+import asyncio
+import pytest
+
+from .context import NewlineFramer, ContentLengthFramer, FrameError, FrameTooLarge
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def read_frames(loop, framer, data: bytes):
+    ''' feed *data* to a StreamReader, and read frames until the end of stream '''
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        frames = []
+        while True:
+            frame = await framer.read_frame(reader)
+            if not frame:
+                return frames
+            frames.append(frame)
+
+    return loop.run_until_complete(read_all())
+
+
+def test_newline_framer(loop):
+    framer = NewlineFramer()
+    frames = read_frames(loop, framer, b'{"a": 1}\n{"b": 2}\n')
+    assert frames == [b'{"a": 1}\n', b'{"b": 2}\n']
+    assert framer.frame(b'{"a": 1}') == b'{"a": 1}\n'
+
+
+def test_content_length_framer(loop):
+    framer = ContentLengthFramer()
+    payload = b'{\n  "jsonrpc": "2.0",\n  "method": "exit"\n}'
+    data = framer.frame(payload) + framer.frame(b'[]')
+    assert data.startswith(b'Content-Length: %d\r\n\r\n' % len(payload))
+    assert read_frames(loop, framer, data) == [payload, b'[]']
+
+
+def test_content_length_framer_with_other_headers(loop):
+    framer = ContentLengthFramer()
+    data = (b'content-length: 2\r\n'
+            b'Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n'
+            b'\r\n'
+            b'[]')
+    assert read_frames(loop, framer, data) == [b'[]']
+
+
+def test_content_length_framer_incomplete_body(loop):
+    framer = ContentLengthFramer()
+    assert read_frames(loop, framer, b'Content-Length: 10\r\n\r\n[]') == []
+
+
+@pytest.mark.parametrize('data', [
+    b'Content-Type: application/json\r\n\r\n[]',
+    b'Content-Length: abc\r\n\r\n[]',
+    b'Content-Length: 0\r\n\r\n',
+    b'Content-Length: 2\r\n'
+])
+def test_content_length_framer_invalid_headers(loop, data):
+    with pytest.raises(FrameError):
+        read_frames(loop, ContentLengthFramer(), data)
+
+
+def test_newline_framer_discard_oversized_line(loop):
+    async def read_all():
+        # the line exceeds the limit of reader
+        reader = asyncio.StreamReader(limit=16)
+        reader.feed_data(b'x' * 100 + b'\n' + b'[]\n')
+        reader.feed_eof()
+        framer = NewlineFramer()
+        with pytest.raises(FrameTooLarge):
+            await framer.read_frame(reader, 16)
+        return await framer.read_frame(reader, 16)
+
+    assert loop.run_until_complete(read_all()) == b'[]\n'
+
+
+def test_newline_framer_with_max_size(loop):
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'x' * 17 + b'\n' + b'x' * 16 + b'\n')
+        reader.feed_eof()
+        framer = NewlineFramer()
+        with pytest.raises(FrameTooLarge):
+            await framer.read_frame(reader, 16)
+        return await framer.read_frame(reader, 16)
+
+    assert loop.run_until_complete(read_all()) == b'x' * 16 + b'\n'
+
+
+def test_content_length_framer_discard_oversized_content(loop):
+    framer = ContentLengthFramer()
+
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(framer.frame(b'x' * 100) + framer.frame(b'[]'))
+        reader.feed_eof()
+        with pytest.raises(FrameTooLarge):
+            await framer.read_frame(reader, 16)
+        return await framer.read_frame(reader, 16)
+
+    assert loop.run_until_complete(read_all()) == b'[]'
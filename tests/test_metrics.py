@@ -0,0 +1,78 @@
+''' test for metrics module '''
+from .context import Metrics, Histogram
+
+
+def test_histogram():
+    histogram = Histogram([0.1, 1])
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == 3.65
+
+
+def test_record_method_metrics():
+    metrics = Metrics(buckets=[0.1, 1])
+    metrics.count_call("add")
+    metrics.count_call("add", -32602)
+    metrics.observe("add", "execute", 0.5)
+
+    result = metrics.to_json()["methods"]["add"]
+    assert result["calls"] == 2
+    assert result["errors"] == {"-32602": 1}
+    # the phases which are not recorded are omitted
+    assert result["latency"] == {
+        "execute": {"buckets": [0.1, 1], "counts": [0, 1, 0], "sum": 0.5, "count": 1}
+    }
+
+
+def test_gauges():
+    metrics = Metrics()
+    metrics.add_gauge("connections", lambda: 3, "The number of open connections.")
+    metrics.add_gauge("omitted", lambda: None)
+
+    assert metrics.to_json()["gauges"] == {"connections": 3}
+
+
+def test_counters():
+    metrics = Metrics()
+    metrics.add_counter("cache_hits", lambda: 2, "The number of cache hits.")
+    metrics.add_counter("omitted", lambda: None)
+
+    assert metrics.to_json()["counters"] == {"cache_hits": 2}
+    assert metrics.to_prometheus().splitlines()[-3:] == [
+        '# HELP ajson_rpc2_cache_hits_total The number of cache hits.',
+        '# TYPE ajson_rpc2_cache_hits_total counter',
+        'ajson_rpc2_cache_hits_total 2.0'
+    ]
+
+
+def test_to_prometheus():
+    metrics = Metrics(buckets=[0.1, 1])
+    metrics.count_call("add", -32602)
+    metrics.observe("add", "execute", 0.05)
+    metrics.observe("add", "execute", 0.5)
+    metrics.add_gauge("connections", lambda: 3, "The number of open connections.")
+
+    lines = metrics.to_prometheus().splitlines()
+    assert 'ajson_rpc2_calls_total{method="add"} 1' in lines
+    assert 'ajson_rpc2_errors_total{method="add",code="-32602"} 1' in lines
+    assert lines[lines.index('# TYPE ajson_rpc2_latency_seconds histogram') + 1:][:5] == [
+        'ajson_rpc2_latency_seconds_bucket{method="add",phase="execute",le="0.1"} 1',
+        'ajson_rpc2_latency_seconds_bucket{method="add",phase="execute",le="1.0"} 2',
+        'ajson_rpc2_latency_seconds_bucket{method="add",phase="execute",le="+Inf"} 2',
+        'ajson_rpc2_latency_seconds_sum{method="add",phase="execute"} 0.55',
+        'ajson_rpc2_latency_seconds_count{method="add",phase="execute"} 2'
+    ]
+    assert lines[-3:] == [
+        '# HELP ajson_rpc2_connections The number of open connections.',
+        '# TYPE ajson_rpc2_connections gauge',
+        'ajson_rpc2_connections 3.0'
+    ]
+
+
+def test_escape_label_value():
+    metrics = Metrics()
+    metrics.count_call('say "hi"')
+    assert 'ajson_rpc2_calls_total{method="say \\"hi\\""} 1' in metrics.to_prometheus().splitlines()
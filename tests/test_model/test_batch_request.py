@@ -1,23 +1,23 @@
 import pytest
 
 from ..context import (
-    BatchRequest, FixedList,
+    BatchRequest, SlotList,
     Request, Notification
 )
 
 
 def test_batch_request_initialize():
     requests = BatchRequest()
-    assert isinstance(requests.requests, FixedList) is True
-    assert isinstance(requests.notifications, FixedList) is True
+    assert isinstance(requests.requests, SlotList) is True
+    assert isinstance(requests.notifications, SlotList) is True
     assert len(requests.requests) == 0
     assert len(requests.notifications) == 0
 
 
 def test_batch_request_initialize_with_initial_requests_and_notifications():
-    init_requests = FixedList(Request)
+    init_requests = SlotList(item_type=Request)
     init_requests.append(Request("test", [1, 2], 3))
-    notifications = FixedList(Notification)
+    notifications = SlotList(item_type=Notification)
     notifications.append(Notification("test", None))
     requests = BatchRequest(init_requests, notifications)
 
@@ -71,3 +71,9 @@ def test_batch_request_with_empty_json():
 def test_batch_request_from_json_wrong_type():
     with pytest.raises(TypeError):
         BatchRequest.from_json({})
+
+
+def test_batch_request_with_check_type():
+    requests = BatchRequest(check_type=True)
+    with pytest.raises(TypeError):
+        requests.requests.append(Notification("test", None))
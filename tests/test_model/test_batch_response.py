@@ -1,76 +1,70 @@
 import pytest
 from ..context import (
     SuccessResponse, ErrorResponse,
-    FixedList, BatchResponse, MethodNotFoundError
+    SlotList, BatchResponse, MethodNotFoundError
 )
 
 
 def test_init_empty_batch_response():
     responses = BatchResponse()
-    assert isinstance(responses.successes, FixedList) is True
-    assert isinstance(responses.errors, FixedList) is True
-
+    assert isinstance(responses.responses, SlotList) is True
+    assert len(responses) == 0
+    assert responses.successes == []
+    assert responses.errors == []
 
-def test_init_batch_response():
-    response_list = FixedList(SuccessResponse)
-    error_list = FixedList(ErrorResponse)
 
-    response_list.append(SuccessResponse(3, 4))
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 3))
+def test_init_batch_response_with_size():
+    responses = BatchResponse(3)
+    assert len(responses) == 0
 
-    responses = BatchResponse(response_list, error_list)
-    assert responses.successes is response_list
-    assert responses.errors is error_list
+    success_resp = SuccessResponse(3, 4)
+    responses[1] = success_resp
+    assert len(responses) == 1
+    assert list(responses) == [success_resp]
 
 
 def test_batch_response_to_json():
-    response_list = FixedList(SuccessResponse)
-    error_list = FixedList(ErrorResponse)
-
-    response_list.append(SuccessResponse(3, 4))
-    response_list.append(SuccessResponse(4, 5))
-    response_list.append(SuccessResponse("test_result", 10))
-
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 4))
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 3))
+    responses = BatchResponse()
 
-    responses = BatchResponse(response_list, error_list)
+    responses.append(SuccessResponse(3, 4))
+    responses.append(ErrorResponse(MethodNotFoundError("Method not found"), 3))
+    responses.append(SuccessResponse("test_result", 10))
 
     resp_json = responses.to_json()
 
     assert resp_json == [
         {"result": 3, "id": 4, "jsonrpc": "2.0"},
-        {"result": 4, "id": 5, "jsonrpc": "2.0"},
-        {"result": "test_result", "id": 10, "jsonrpc": "2.0"},
-        {"id": 4, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"},
-        {"id": 3, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"}
+        {"id": 3, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"},
+        {"result": "test_result", "id": 10, "jsonrpc": "2.0"}
     ]
 
 
-def test_batch_response_to_json_with_only_success():
-    response_list = FixedList(SuccessResponse)
-
-    response_list.append(SuccessResponse(3, 4))
-    responses = BatchResponse(response_list)
+def test_batch_response_from_responses():
+    success_resp = SuccessResponse(3, 4)
+    error_resp = ErrorResponse(MethodNotFoundError("Method not found"), 3)
+    responses = BatchResponse.from_responses([success_resp], [error_resp])
 
-    resp_json = responses.to_json()
-    assert resp_json == [
-        {"result": 3, "id": 4, "jsonrpc": "2.0"}
-    ]
+    assert len(responses) == 2
+    assert responses.successes == [success_resp]
+    assert responses.errors == [error_resp]
 
+    with pytest.raises(TypeError):
+        BatchResponse.from_responses(["abc"], check_type=True)
 
-def test_batch_response_to_json_with_only_error():
-    error_list = FixedList(ErrorResponse)
 
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 4))
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 3))
+def test_batch_response_to_json_by_index():
+    responses = BatchResponse(4)
 
-    responses = BatchResponse(errors=error_list)
+    # the slot for notification is empty
+    responses[3] = SuccessResponse(4, 5)
+    responses[0] = ErrorResponse(MethodNotFoundError("Method not found"), 3)
+    responses[1] = SuccessResponse(3, 4)
 
     resp_json = responses.to_json()
     assert resp_json == [
-        {"id": 4, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"},
-        {"id": 3, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"}
+        {"id": 3, "error": {"code": -32601, "message": "Method not found"}, "jsonrpc": "2.0"},
+        {"result": 3, "id": 4, "jsonrpc": "2.0"},
+        {"result": 4, "id": 5, "jsonrpc": "2.0"}
     ]
 
 
@@ -86,9 +80,8 @@ def test_append_success_response():
     success_resp = SuccessResponse(3, 4)
     responses.append(success_resp)
 
-    assert len(responses.successes) == 1
-    assert len(responses.errors) == 0
-    assert responses.successes[-1] is success_resp
+    assert responses.successes == [success_resp]
+    assert responses.errors == []
 
 
 def test_append_error_response():
@@ -97,17 +90,19 @@ def test_append_error_response():
 
     responses.append(error)
 
-    assert len(responses.successes) == 0
-    assert len(responses.errors) == 1
-    assert responses.errors[-1] is error
+    assert responses.successes == []
+    assert responses.errors == [error]
 
 
-def test_append_other_things():
-    responses = BatchResponse()
+def test_append_other_things_with_check_type():
+    responses = BatchResponse(check_type=True)
 
     with pytest.raises(TypeError):
         responses.append(3)
 
+    with pytest.raises(TypeError):
+        BatchResponse(1, check_type=True)[0] = 3
+
 
 def test_len_method_on_batch_response():
     responses = BatchResponse()
@@ -123,23 +118,13 @@ def test_len_method_on_batch_response():
 
 
 def test_batch_response_iterable():
-    response_list = FixedList(SuccessResponse)
-    error_list = FixedList(ErrorResponse)
-
-    response_list.append(SuccessResponse(3, 4))
-    response_list.append(SuccessResponse(4, 5))
-    response_list.append(SuccessResponse("test_result", 10))
-
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 4))
-    error_list.append(ErrorResponse(MethodNotFoundError("Method not found"), 3))
-
-    responses = BatchResponse(response_list, error_list)
-
-    response_index = 0
-    success_resp_length = len(response_list)
-    for response in responses:
-        if response_index < success_resp_length:
-            assert isinstance(response, SuccessResponse)
-        else:
-            assert isinstance(response, ErrorResponse)
-        response_index += 1
+    responses = BatchResponse()
+    response_list = [
+        SuccessResponse(3, 4),
+        ErrorResponse(MethodNotFoundError("Method not found"), 4),
+        SuccessResponse(4, 5)
+    ]
+    for response in response_list:
+        responses.append(response)
+
+    assert list(responses) == response_list
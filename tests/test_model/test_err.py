@@ -4,7 +4,8 @@ proper error code '''
 from ..context import (
     ParseError, InvalidRequestError,
     MethodNotFoundError, InvalidParamsError,
-    InternalError
+    InternalError, ServerBusyError,
+    JsonRPC2Error, error_from_json
 )
 
 
@@ -26,3 +27,21 @@ def test_invalid_request_err_code():
 
 def test_internal_error_code():
     assert InternalError.err_code == -32603
+
+
+def test_server_busy_error_code():
+    assert ServerBusyError.err_code == -32002
+
+
+def test_error_from_json():
+    error = error_from_json({"code": -32601, "message": "Method not found"})
+    assert isinstance(error, MethodNotFoundError)
+    assert error.to_json() == {"code": -32601, "message": "Method not found"}
+    assert error.data is None
+
+
+def test_error_from_json_with_unknown_code():
+    error = error_from_json({"code": 1, "message": "Custom", "data": [1]})
+    assert type(error) is JsonRPC2Error
+    assert error.to_json() == {"code": 1, "message": "Custom"}
+    assert error.data == [1]
@@ -57,3 +57,8 @@ def test_notification_from_json_with_no_params():
 
     assert req.method == 'test'
     assert req.params is None
+
+
+def test_request_has_no_instance_dict():
+    for request in (Request("foo", [1], 1), Notification("foo", [1])):
+        assert not hasattr(request, "__dict__")
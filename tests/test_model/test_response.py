@@ -40,3 +40,8 @@ def test_err_response_to_json_with_no_id():
             "message": "Parse error"
         }
     }
+
+
+def test_response_has_no_instance_dict():
+    for response in (SuccessResponse(3, 5), ErrorResponse(MethodNotFoundError("Method not found"), 5)):
+        assert not hasattr(response, "__dict__")
@@ -0,0 +1,50 @@
+import pytest
+from ..context import SlotList
+
+
+def test_preallocated_slots():
+    slots = SlotList(3)
+    assert len(slots) == 0
+    assert list(slots) == []
+
+    slots[2] = "c"
+    slots[0] = "a"
+    assert len(slots) == 2
+    assert slots[0] == "a"
+    assert slots[1] is None
+    assert list(slots) == ["a", "c"]
+
+
+def test_set_filled_slot():
+    slots = SlotList(1)
+    slots[0] = "a"
+    slots[0] = "b"
+    assert len(slots) == 1
+    assert list(slots) == ["b"]
+
+
+def test_append_and_extend():
+    slots = SlotList(1)
+    slots.append("b")
+    slots.extend(iter(["c", "d"]))
+    slots[0] = "a"
+    assert len(slots) == 4
+    assert list(slots) == ["a", "b", "c", "d"]
+
+
+def test_not_check_type_by_default():
+    slots = SlotList()
+    slots.append(3)
+    slots.append("abc")
+    assert list(slots) == [3, "abc"]
+
+
+def test_check_type():
+    slots = SlotList(1, item_type=int)
+    slots.append(3)
+    with pytest.raises(TypeError):
+        slots.append("abc")
+    with pytest.raises(TypeError):
+        slots[0] = "abc"
+    with pytest.raises(TypeError):
+        slots.extend([4, "abc"])
@@ -1,5 +1,5 @@
 import pytest
-from .context import Module, JsonRPC2
+from .context import Module, JsonRPC2, SuccessResponse, ExtraNeed
 
 
 @pytest.fixture
@@ -44,3 +44,53 @@ def test_get_method_when_give_invalid_method_name(test_app: JsonRPC2,
     with pytest.raises(ValueError):
         for invalid_method in ("document.open.add", "document..open"):
             test_app.get_method(invalid_method)
+
+
+def test_call_method_in_module(test_app: JsonRPC2, test_module: Module,
+                               test_module_name: str):
+    def add(num1, num2):
+        return num1 + num2
+
+    test_module.add_method(add)
+    test_app.register_module(test_module)
+
+    request_data = {"id": 1, "method": f"{test_module_name}.add", "params": [1, 2], "jsonrpc": "2.0"}
+    assert test_app.check_errors(request_data) is None
+    response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+    assert isinstance(response, SuccessResponse)
+    assert response.result == 3
+
+
+def test_batched_call_method_in_module(test_app: JsonRPC2, test_module: Module,
+                                       test_module_name: str):
+    test_app.register_module(test_module)
+
+    # the method added after the module is registered can be called too
+    @test_module.rpc_call
+    async def add(num1, num2):
+        return num1 + num2
+
+    request_data = [
+        {"id": 1, "method": f"{test_module_name}.add", "params": [1, 2], "jsonrpc": "2.0"},
+        {"id": 2, "method": f"{test_module_name}/add", "params": [4, 5], "jsonrpc": "2.0"}
+    ]
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    assert sorted((response.resp_id, response.result) for response in responses) == [(1, 3), (2, 9)]
+
+
+def test_add_method_which_need_multiprocessing_to_module(test_app: JsonRPC2,
+                                                         test_module: Module,
+                                                         test_module_name: str):
+    def add(num1, num2):
+        return num1 + num2
+
+    test_app.register_module(test_module)
+    test_module.add_method(add, need_multiprocessing=True)
+
+    rpc_method = test_app.get_rpc_method(f"{test_module_name}.add")
+    assert rpc_method.extra_need == ExtraNeed.PROCESS
+    assert test_app._get_process_methods() == {
+        f"{test_module_name}.add": add,
+        f"{test_module_name}/add": add
+    }
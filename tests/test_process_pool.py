@@ -0,0 +1,201 @@
+''' test for process_pool module '''
+import asyncio
+import time
+import pytest
+
+from .context import (
+    MethodProcessPool, call_method, call_method_chunk, call_function_chunk,
+    JsonRPC2, Module, SuccessResponse, ErrorResponse, InternalError,
+    MethodTimeoutError
+)
+
+
+def square(num):
+    return num * num
+
+
+def test_call_method_in_pool():
+    with MethodProcessPool({"square": square}, max_workers=1) as pool:
+        assert pool.submit(call_method, "square", [3]).result() == 9
+        assert pool.submit(call_method, "square", {"num": 4}).result() == 16
+
+
+def test_call_closure_in_pool():
+    base = 10
+
+    def add_base(num):
+        return num + base
+
+    with MethodProcessPool({"add_base": add_base, "answer": lambda: 42}, max_workers=1) as pool:
+        assert pool.submit(call_method, "add_base", [1]).result() == 11
+        assert pool.submit(call_method, "answer", None).result() == 42
+
+
+def test_prewarm_pool():
+    with MethodProcessPool({}, max_workers=2) as pool:
+        pool.prewarm()
+        assert len(pool._processes) == 2
+
+
+def test_call_not_installed_method_in_pool():
+    with MethodProcessPool({}, max_workers=1) as pool:
+        with pytest.raises(KeyError):
+            pool.submit(call_method, "square", [3]).result()
+
+
+def divide(num):
+    return 12 // num
+
+
+def test_call_function_chunk():
+    assert call_function_chunk(divide, [[1], {"num": 3}, [0], None]) == [
+        (True, 12), (True, 4), (False, None), (False, None)
+    ]
+
+
+def test_call_method_chunk_in_pool():
+    with MethodProcessPool({"divide": divide}, max_workers=1) as pool:
+        assert pool.submit(call_method_chunk, "divide", [[2], [0]]).result() == [(True, 6), (False, None)]
+
+
+def test_server_submit_process_requests_in_chunks():
+    test_app = JsonRPC2(process_chunk_size=3)
+    test_app.add_method(divide, need_multiprocessing=True)
+    test_app.add_method(square, need_multiprocessing=True)
+    request_data = [{"id": i, "method": "divide", "jsonrpc": "2.0", "params": [i]} for i in range(7)]
+    request_data.append({"id": 7, "method": "square", "jsonrpc": "2.0", "params": [3]})
+    request_data.append({"method": "square", "jsonrpc": "2.0", "params": [3]})
+
+    [results, errors] = test_app._handle_process_requests(request_data)
+
+    assert errors == []
+    assert sorted(len(result.requests) for result in results) == [1, 2, 3, 3]
+    test_app.loop.run_until_complete(asyncio.wait(results))
+
+
+def test_server_handle_chunk_with_errors():
+    test_app = JsonRPC2(process_chunk_size=10)
+    test_app.add_method(divide, need_multiprocessing=True)
+    request_data = [
+        {"id": 1, "method": "divide", "jsonrpc": "2.0", "params": [2]},
+        {"id": 2, "method": "divide", "jsonrpc": "2.0", "params": [0]},
+        {"method": "divide", "jsonrpc": "2.0", "params": [0]},
+        {"id": 4, "method": "divide", "jsonrpc": "2.0", "params": {"num": 4}},
+    ]
+
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    responses = {response.resp_id: response for response in responses}
+    assert len(responses) == 3
+    assert isinstance(responses[1], SuccessResponse) and responses[1].result == 6
+    assert isinstance(responses[2], ErrorResponse) and isinstance(responses[2].error, InternalError)
+    assert isinstance(responses[4], SuccessResponse) and responses[4].result == 3
+
+
+def test_server_call_closure_which_need_multiprocessing(test_app: JsonRPC2):
+    factor = 3
+
+    def triple(num):
+        return num * factor
+
+    test_app.add_method(triple, need_multiprocessing=True)
+    request_data = [
+        {"id": 1, "method": "triple", "jsonrpc": "2.0", "params": [2]},
+        {"id": 2, "method": "triple", "jsonrpc": "2.0", "params": {"num": 5}},
+    ]
+
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    assert {response.resp_id: response.result for response in responses} == {1: 6, 2: 15}
+
+
+def test_server_recreate_pool_when_method_is_added(test_app: JsonRPC2):
+    test_app.add_method(square, need_multiprocessing=True)
+    pool = test_app._get_process_pool()
+    assert pool.methods == {"square": square}
+
+    def cube(num):
+        return num ** 3
+
+    test_app.add_method(cube, need_multiprocessing=True)
+    new_pool = test_app._get_process_pool()
+    assert new_pool is not pool
+    assert new_pool.methods == {"square": square, "cube": cube}
+
+
+def test_server_install_module_methods_in_pool(test_app: JsonRPC2):
+    module = Module("math")
+    module.add_method(square, need_multiprocessing=True)
+    test_app.register_module(module)
+
+    assert test_app._get_process_pool().methods == {"math.square": square, "math/square": square}
+
+
+def sleep_and_return(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_recycle_process_pool_when_method_timeout():
+    test_app = JsonRPC2(process_workers=1, process_chunk_size=2)
+    test_app.add_method(sleep_and_return, need_multiprocessing=True, timeout=0.5)
+    try:
+        request_data = {"id": 1, "method": "sleep_and_return", "params": [0], "jsonrpc": "2.0"}
+        response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+        assert response.result == 0
+        pool = test_app._get_process_pool()
+        worker = list(pool._processes.values())[0]
+
+        request_data = {"id": 2, "method": "sleep_and_return", "params": [30], "jsonrpc": "2.0"}
+        response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+        assert isinstance(response.error, MethodTimeoutError)
+        # the stuck worker is killed, and a new pool is created for the next call
+        worker.join(5)
+        assert not worker.is_alive()
+        assert test_app._get_process_pool() is not pool
+
+        request_data = [
+            {"id": 3, "method": "sleep_and_return", "params": [0], "jsonrpc": "2.0"},
+            {"id": 4, "method": "sleep_and_return", "params": [30], "jsonrpc": "2.0"}
+        ]
+        responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+        # the requests for the method which has timeout are not chunked, each of them
+        # has its own deadline
+        assert responses.responses[0].result == 0
+        assert isinstance(responses.responses[1].error, MethodTimeoutError)
+    finally:
+        test_app.shutdown_executors(wait=False)
+
+
+def test_other_calls_survive_method_timeout():
+    test_app = JsonRPC2(process_workers=2)
+    test_app.add_method(sleep_and_return, need_multiprocessing=True, timeout=0.5)
+
+    def other(seconds):
+        time.sleep(seconds)
+        return seconds
+
+    test_app.add_method(other, need_multiprocessing=True)
+    try:
+        test_app._prewarm_process_pool()
+        pool = test_app._get_process_pool()
+
+        async def send_requests():
+            return await asyncio.gather(
+                test_app.handle_simple_rpc_call(
+                    {"id": 1, "method": "sleep_and_return", "params": [30], "jsonrpc": "2.0"}
+                ),
+                test_app.handle_simple_rpc_call(
+                    {"id": 2, "method": "other", "params": [1], "jsonrpc": "2.0"}
+                )
+            )
+
+        responses = test_app.loop.run_until_complete(send_requests())
+        assert isinstance(responses[0].error, MethodTimeoutError)
+        # the call in the same pool completes, then the pool is terminated
+        assert responses[1].result == 1
+        assert test_app._get_process_pool() is not pool
+        test_app.loop.run_until_complete(asyncio.sleep(0))
+        assert pool.terminated
+    finally:
+        test_app.shutdown_executors(wait=False)
@@ -1,18 +1,24 @@
+import os
 import pytest
 import json
+import time
 import asyncio
+import threading
 
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from queue import Queue
 
 from .context import (
     JsonRPC2,
     InvalidParamsError, InvalidRequestError, MethodNotFoundError,
-    ParseError, InternalError,
+    ParseError, InternalError, MethodTimeoutError, ServerBusyError,
     SuccessResponse, ErrorResponse,
     Request,
     BatchResponse,
-    ExtraNeed
+    ExtraNeed,
+    NewlineFramer, ContentLengthFramer,
+    AdmissionControl, Metrics,
+    Module, ResultCache
 )
 
 mock_queue = Queue()
@@ -45,10 +51,18 @@ def empty_queue():
     mock_queue.queue.clear()
 
 
+def read_all_written() -> bytes:
+    data = b''
+    while not mock_queue.empty():
+        data += mock_queue.get()
+    return data
+
+
 @pytest.fixture
 def reader():
     mock_reader = Mock()
     mock_reader.readline.side_effect = read_request
+    mock_reader.readuntil.side_effect = lambda separator=b'\n': read_request()
     mock_reader.close.side_effect = empty_queue
 
     yield mock_reader
@@ -60,6 +74,10 @@ def writer():
     mock_writer = Mock()
 
     mock_writer.write.side_effect = write_request
+    mock_writer.writelines.side_effect = lambda lines: [write_request(line) for line in lines]
+    mock_writer.drain = AsyncMock()
+    mock_writer.transport.get_write_buffer_size.return_value = 0
+    mock_writer.is_closing.return_value = False
     mock_writer.close.side_effect = empty_queue
     connection_info = mock_writer.get_extra_info.return_value
     connection_info.getpeername.return_value = "test"
@@ -72,7 +90,7 @@ def test_handle_client(test_app: JsonRPC2, reader: Mock, writer: Mock):
     # for testing handle_client method
     # the inner method handle_rpc_call is not what we interested
     # so mock the function to make test_app call
-    async def mock_handle_rpc_call(reader, writer):
+    async def mock_handle_rpc_call(reader, writer, framer=None):
         pass
 
     setattr(test_app, "handle_rpc_call", mock_handle_rpc_call)
@@ -83,7 +101,7 @@ def test_handle_client_for_client_error(test_app: JsonRPC2, reader: Mock, writer
     # for testing handle_client method
     # the inner method handle_rpc_call is not what we interested
     # so mock the function to make test_app call
-    async def mock_handle_error_rpc_call(reader, writer):
+    async def mock_handle_error_rpc_call(reader, writer, framer=None):
         1 / 0
 
     setattr(test_app, "handle_rpc_call", mock_handle_error_rpc_call)
@@ -180,12 +198,303 @@ def test_handle_rpc_call_with_batched_request(test_app: JsonRPC2, reader: Mock,
         assert resp['result'] == id_to_result_dict[resp['id']]
 
 
+def test_handle_rpc_call_with_pipelining(reader: Mock, writer: Mock):
+    test_app = JsonRPC2(pipelining=True)
+
+    @test_app.rpc_call
+    async def slow_half(num):
+        await asyncio.sleep(0.1)
+        return num // 2
+
+    @test_app.rpc_call
+    def half(num):
+        return num // 2
+
+    # the slow request is sent first, but it shouldn't block the second one
+    writer.write(json.dumps({"id": 1, "jsonrpc": "2.0", "method": "slow_half", "params": [4]}).encode())
+    writer.write(json.dumps({"id": 2, "jsonrpc": "2.0", "method": "half", "params": [8]}).encode())
+    # send empty string to break server forever loop
+    writer.write('')
+
+    test_app.loop.run_until_complete(test_app.handle_rpc_call(reader, writer))
+
+    first_resp = json.loads(test_app.loop.run_until_complete(reader.readline()).decode())
+    second_resp = json.loads(test_app.loop.run_until_complete(reader.readline()).decode())
+    assert first_resp == {"id": 2, "jsonrpc": "2.0", "result": 4}
+    assert second_resp == {"id": 1, "jsonrpc": "2.0", "result": 2}
+
+
+@pytest.mark.parametrize("pipelining", [False, True])
+def test_close_idle_connections(pipelining: bool):
+    test_app = JsonRPC2(pipelining=pipelining)
+
+    @test_app.rpc_call
+    async def slow_half(num):
+        await asyncio.sleep(0.1)
+        return num // 2
+
+    async def main():
+        listener = await asyncio.start_server(test_app.handle_client, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        idle_reader, idle_writer = await asyncio.open_connection('127.0.0.1', port)
+        busy_reader, busy_writer = await asyncio.open_connection('127.0.0.1', port)
+        request = {"id": 1, "jsonrpc": "2.0", "method": "slow_half", "params": [4]}
+        busy_writer.write(json.dumps(request).encode() + b"\n")
+        await asyncio.sleep(0.05)
+
+        listener.close()
+        test_app.close_idle_connections()
+        # the idle connection is closed at once
+        assert await asyncio.wait_for(idle_reader.read(), 0.05) == b""
+        # the busy connection is closed after its response is sent
+        response = await asyncio.wait_for(busy_reader.readline(), 1)
+        assert json.loads(response) == {"id": 1, "jsonrpc": "2.0", "result": 2}
+        assert await asyncio.wait_for(busy_reader.read(), 1) == b""
+        idle_writer.close()
+        busy_writer.close()
+
+    try:
+        test_app.loop.run_until_complete(main())
+    finally:
+        test_app.loop.close()
+
+
+def test_handle_rpc_call_with_pipelining_limit_inflight_requests(reader: Mock, writer: Mock):
+    test_app = JsonRPC2(pipelining=True, max_inflight_requests=2)
+    running = 0
+    max_running = 0
+
+    @test_app.rpc_call
+    async def count(num):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return num
+
+    for req_id in range(5):
+        writer.write(json.dumps({"id": req_id, "jsonrpc": "2.0", "method": "count", "params": [req_id]}).encode())
+    writer.write('')
+
+    test_app.loop.run_until_complete(test_app.handle_rpc_call(reader, writer))
+
+    assert max_running == 2
+    resp_ids = set()
+    for _ in range(5):
+        resp_ids.add(json.loads(test_app.loop.run_until_complete(reader.readline()).decode())["id"])
+    assert resp_ids == set(range(5))
+
+
+def test_handle_rpc_call_with_content_length_framer(writer: Mock):
+    test_app = JsonRPC2(framer=ContentLengthFramer())
+
+    @test_app.rpc_call
+    def half(num):
+        return num // 2
+
+    # the request body is pretty-printed, which contains newlines
+    request_body = json.dumps({
+        "id": 1,
+        "jsonrpc": "2.0",
+        "method": "half",
+        "params": [4]
+    }, indent=2).encode()
+
+    async def handle_request():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'Content-Length: %d\r\n\r\n' % len(request_body) + request_body)
+        reader.feed_eof()
+        await test_app.handle_rpc_call(reader, writer)
+
+    test_app.loop.run_until_complete(handle_request())
+
+    resp_bytes = mock_queue.get()
+    headers, _, body = resp_bytes.partition(b'\r\n\r\n')
+    assert headers == b'Content-Length: %d' % len(body)
+    assert json.loads(body) == {
+        "id": 1,
+        "jsonrpc": "2.0",
+        "result": 2
+    }
+
+
+@pytest.mark.parametrize('framer', [NewlineFramer(), ContentLengthFramer()])
+def test_handle_rpc_call_with_oversized_request(writer: Mock, framer):
+    test_app = JsonRPC2(framer=framer, max_request_size=64)
+
+    @test_app.rpc_call
+    def echo(text):
+        return text
+
+    oversized_request = json.dumps({
+        "id": 1,
+        "jsonrpc": "2.0",
+        "method": "echo",
+        "params": ["a" * 100]
+    }).encode()
+    request = json.dumps({
+        "id": 2,
+        "jsonrpc": "2.0",
+        "method": "echo",
+        "params": ["a"]
+    }).encode()
+
+    async def handle_requests():
+        # the reader limit is max_request_size, as the server creates it
+        reader = asyncio.StreamReader(limit=64)
+        reader.feed_data(framer.frame(oversized_request) + framer.frame(request))
+        reader.feed_eof()
+        await test_app.handle_rpc_call(reader, writer)
+
+    test_app.loop.run_until_complete(handle_requests())
+
+    responses = []
+
+    async def read_responses():
+        reader = asyncio.StreamReader()
+        while not mock_queue.empty():
+            reader.feed_data(mock_queue.get())
+        reader.feed_eof()
+        while True:
+            response = await framer.read_frame(reader)
+            if not response:
+                return
+            responses.append(json.loads(response))
+
+    test_app.loop.run_until_complete(read_responses())
+    # the connection is kept alive after the oversized request is rejected
+    assert responses == [
+        {
+            "id": "null",
+            "jsonrpc": "2.0",
+            "error": {"code": -32600, "message": "Request too large"}
+        },
+        {
+            "id": 2,
+            "jsonrpc": "2.0",
+            "result": "a"
+        }
+    ]
+
+
+def test_handle_rpc_call_with_streaming_batch_responses(writer: Mock):
+    test_app = JsonRPC2(stream_batch_responses=True)
+
+    @test_app.rpc_call
+    async def sleep_and_return(num):
+        await asyncio.sleep(0.01 * num)
+        return num
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    request_data = [
+        {"id": 1, "method": "sleep_and_return", "params": [2], "jsonrpc": "2.0"},
+        {"id": 2, "method": "sleep_and_return", "params": [1], "jsonrpc": "2.0"},
+        {"method": "add", "params": [1, 2], "jsonrpc": "2.0"},
+        {"id": 3, "method": "add", "params": [1, 2], "jsonrpc": "2.0"}
+    ]
+
+    async def handle_requests():
+        reader = asyncio.StreamReader()
+        reader.feed_data(json.dumps(request_data).encode() + b'\n')
+        reader.feed_eof()
+        await test_app.handle_rpc_call(reader, writer)
+
+    test_app.loop.run_until_complete(handle_requests())
+
+    data = read_all_written()
+    assert data.startswith(b'[') and data.endswith(b']\n') and data.count(b'\n') == 1
+    # the responses are in the order of completion
+    assert [response["id"] for response in json.loads(data)] == [3, 2, 1]
+
+
+def test_streaming_batch_responses_with_all_notifications(writer: Mock):
+    test_app = JsonRPC2(stream_batch_responses=True)
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    request_data = [{"method": "add", "params": [1, 2], "jsonrpc": "2.0"}] * 2
+
+    async def handle_requests():
+        reader = asyncio.StreamReader()
+        reader.feed_data(json.dumps(request_data).encode() + b'\n')
+        reader.feed_eof()
+        await test_app.handle_rpc_call(reader, writer)
+
+    test_app.loop.run_until_complete(handle_requests())
+    assert read_all_written() == b''
+
+
+def test_streaming_batch_responses_fall_back_for_content_length_framer(writer: Mock):
+    framer = ContentLengthFramer()
+    test_app = JsonRPC2(stream_batch_responses=True, framer=framer)
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    request_data = [{"id": i, "method": "add", "params": [i, 2], "jsonrpc": "2.0"} for i in range(3)]
+
+    async def handle_requests():
+        reader = asyncio.StreamReader()
+        reader.feed_data(framer.frame(json.dumps(request_data).encode()))
+        reader.feed_eof()
+        await test_app.handle_rpc_call(reader, writer)
+
+    test_app.loop.run_until_complete(handle_requests())
+
+    headers, _, body = read_all_written().partition(b'\r\n\r\n')
+    assert headers == b'Content-Length: %d' % len(body)
+    assert [response["result"] for response in json.loads(body)] == [2, 3, 4]
+
+
 def test_init_server_with_other_eventloop():
     loop = asyncio.new_event_loop()
     app = JsonRPC2(loop=loop)
     assert app.loop is loop
 
 
+def test_init_server_without_executors(test_app: JsonRPC2):
+    assert test_app.thread_executor is None
+    assert test_app._process_pool is None
+    assert test_app.process_workers == os.cpu_count()
+    assert test_app.thread_workers == os.cpu_count()
+
+
+def test_create_executors_lazily():
+    test_app = JsonRPC2(process_workers=2, thread_workers=3)
+    test_app.add_method(duplicate_add, need_multithreading=True)
+    test_app.add_method(substract_for_multiprocessing, need_multiprocessing=True)
+    request_data = [
+        {"id": 1, "method": "duplicate_add", "jsonrpc": "2.0"},
+        {"id": 2, "method": "substract_for_multiprocessing", "jsonrpc": "2.0", "params": [3, 1]},
+    ]
+
+    test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    assert test_app.thread_executor._max_workers == 3
+    assert test_app._process_pool._max_workers == 2
+
+    test_app.shutdown_executors()
+    assert test_app.thread_executor is None
+    assert test_app._process_pool is None
+
+
+def test_shutdown_executors_not_touch_given_executor():
+    thread_executor = Mock()
+    test_app = JsonRPC2(thread_executor=thread_executor)
+
+    test_app.shutdown_executors()
+
+    thread_executor.shutdown.assert_not_called()
+    assert test_app.thread_executor is thread_executor
+
+
 def test_handle_simple_rpc_call(test_app: JsonRPC2):
     @test_app.rpc_call
     def half(num):
@@ -264,6 +573,83 @@ def test_handle_batched_rpc_call(test_app: JsonRPC2):
         assert response.result == response_dict[response.resp_id]
 
 
+def test_handle_batched_rpc_call_with_async_methods_concurrently(test_app: JsonRPC2):
+    @test_app.rpc_call
+    async def sleep_and_return(num):
+        await asyncio.sleep(0.2)
+        return num
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    request_data = [{"id": i, "method": "sleep_and_return", "params": [i], "jsonrpc": "2.0"} for i in range(10)]
+    request_data.append({"id": 10, "method": "add", "params": [1, 2], "jsonrpc": "2.0"})
+
+    start_time = time.monotonic()
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+    assert time.monotonic() - start_time < 1
+
+    assert {response.resp_id: response.result for response in responses} == {
+        **{i: i for i in range(10)}, 10: 3
+    }
+
+
+def test_handle_batched_rpc_call_with_max_batch_concurrency():
+    test_app = JsonRPC2(max_batch_concurrency=3)
+    running = 0
+    max_running = 0
+
+    @test_app.rpc_call
+    async def count(num):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return num
+
+    request_data = [{"id": i, "method": "count", "params": [i], "jsonrpc": "2.0"} for i in range(10)]
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    assert max_running == 3
+    assert len(responses) == 10
+
+
+def test_handle_batched_rpc_call_in_request_order(test_app: JsonRPC2):
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    @test_app.rpc_call
+    async def async_add(num1, num2):
+        await asyncio.sleep(0.01)
+        return num1 + num2
+
+    def thread_add(num1, num2):
+        return num1 + num2
+
+    test_app.add_method(thread_add, need_multithreading=True)
+    test_app.add_method(substract_for_multiprocessing, need_multiprocessing=True)
+
+    request_data = [
+        {"id": 1, "method": "async_add", "params": [1, 2], "jsonrpc": "2.0"},
+        {"id": 2, "method": "substract_for_multiprocessing", "params": [5, 2], "jsonrpc": "2.0"},
+        {"method": "add", "params": [1, 2], "jsonrpc": "2.0"},
+        {"id": 3, "method": "not_existed", "jsonrpc": "2.0"},
+        {"id": 4, "method": "thread_add", "params": [2, 2], "jsonrpc": "2.0"},
+        {"id": 5, "method": "add", "params": [2, 3], "jsonrpc": "2.0"},
+        {"id": 6, "method": "substract_for_multiprocessing", "params": [5], "jsonrpc": "2.0"},
+    ]
+
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+    test_app.shutdown_executors()
+
+    # the notification doesn't have response
+    assert [response.resp_id for response in responses] == [1, 2, 3, 4, 5, 6]
+    assert [response.to_json().get("result") for response in responses] == [3, 3, None, 4, 5, None]
+
+
 def test_handle_batched_rpc_call_with_an_invalid_batch(test_app: JsonRPC2):
     request_data = [1]
 
@@ -577,6 +963,28 @@ def test_start():
         mock_loop.close.assert_called_with()
 
 
+def test_start_prewarm_process_pool():
+    mock_loop = Mock()
+    test_app = JsonRPC2(mock_loop)
+    test_app.add_method(substract_for_multiprocessing, need_multiprocessing=True)
+
+    with patch("asyncio.start_server", Mock(return_value=1)), \
+            patch("ajson_rpc2.server.MethodProcessPool") as mock_pool_class:
+        test_app.start()
+        mock_pool_class.return_value.prewarm.assert_called_once_with()
+        # the pool is shutdown when server stops
+        mock_pool_class.return_value.shutdown.assert_called_once_with(wait=True)
+
+
+def test_start_not_prewarm_process_pool_when_not_needed():
+    test_app = JsonRPC2(Mock())
+
+    with patch("asyncio.start_server", Mock(return_value=1)), \
+            patch("ajson_rpc2.server.MethodProcessPool") as mock_pool_class:
+        test_app.start()
+        mock_pool_class.assert_not_called()
+
+
 def _test_for_special_need_rpc_call(test_app: JsonRPC2, special_need: str):
     if special_need == "multiprocessing":
         test_app.add_method(duplicate_add, need_multiprocessing=True)
@@ -608,3 +1016,360 @@ def _test_for_special_need_rpc_call(test_app: JsonRPC2, special_need: str):
             assert response.to_json()["result"] == resp_data_dict[response.resp_id]["result"]
         else:
             assert response.to_json()["error"] == resp_data_dict[response.resp_id]["error"]
+
+
+def test_check_params_errors_for_keyword_only_arguments(test_app: JsonRPC2):
+    @test_app.rpc_call
+    def add(num1, *, num2):
+        pass
+
+    request = {"id": 1, "method": "add", "params": [1, 2], "jsonrpc": "2.0"}
+    assert isinstance(test_app.check_errors(request), InvalidParamsError)
+
+    request["params"] = {"num1": 1, "num2": 2}
+    assert test_app.check_errors(request) is None
+
+
+def test_decorate_a_rpc_call_with_timeout(test_app: JsonRPC2):
+    @test_app.rpc_call(timeout=3)
+    def add(num1, num2):
+        return num1 + num2
+
+    assert add(1, 2) == 3
+    assert test_app.get_rpc_method("add").timeout == 3
+
+
+def test_async_method_timeout(test_app: JsonRPC2):
+    cancelled = False
+
+    @test_app.rpc_call(timeout=0.05)
+    async def sleep_forever():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    request_data = {"id": 1, "method": "sleep_forever", "jsonrpc": "2.0"}
+    response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+
+    assert isinstance(response, ErrorResponse)
+    assert isinstance(response.error, MethodTimeoutError)
+    assert response.to_json()["error"] == {"code": -32001, "message": "Method timeout"}
+    assert cancelled
+
+
+def test_default_method_timeout():
+    test_app = JsonRPC2(method_timeout=0.05)
+
+    @test_app.rpc_call
+    async def sleep(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    # the timeout of method overrides the default timeout
+    @test_app.rpc_call(timeout=1)
+    async def sleep_longer(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    request_data = [
+        {"id": 1, "method": "sleep", "params": [0.01], "jsonrpc": "2.0"},
+        {"id": 2, "method": "sleep", "params": [1], "jsonrpc": "2.0"},
+        {"id": 3, "method": "sleep_longer", "params": [0.1], "jsonrpc": "2.0"},
+        {"method": "sleep", "params": [1], "jsonrpc": "2.0"}
+    ]
+    responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+
+    assert [response.to_json().get("result") for response in responses] == [0.01, None, 0.1]
+    assert isinstance(responses.responses[1].error, MethodTimeoutError)
+
+
+def test_thread_method_timeout(test_app: JsonRPC2):
+    event = threading.Event()
+
+    def wait_event():
+        event.wait(5)
+        return "done"
+
+    test_app.add_method(wait_event, need_multithreading=True, timeout=0.05)
+    request_data = {"id": 1, "method": "wait_event", "jsonrpc": "2.0"}
+    try:
+        response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+        assert isinstance(response.error, MethodTimeoutError)
+
+        responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call([request_data]))
+        assert isinstance(responses.responses[0].error, MethodTimeoutError)
+    finally:
+        event.set()
+        test_app.shutdown_executors()
+
+
+def test_reject_connection_when_too_many_connections(reader: Mock, writer: Mock):
+    test_app = JsonRPC2(admission=AdmissionControl(max_connections=0))
+    written = []
+    writer.write.side_effect = written.append
+    test_app.loop.run_until_complete(test_app.handle_client(reader, writer))
+
+    assert json.loads(written[0]) == {
+        "jsonrpc": "2.0",
+        "error": {"code": ServerBusyError.err_code, "message": "Server busy"},
+        "id": "null"
+    }
+    writer.close.assert_called()
+    assert test_app.admission.connections == 0
+
+
+def test_reject_request_when_server_busy(writer: Mock):
+    test_app = JsonRPC2(admission=AdmissionControl(max_inflight=1))
+    response_writer = Mock()
+    response_writer.write = AsyncMock()
+
+    @test_app.rpc_call
+    async def sleep(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    async def send_requests():
+        first = asyncio.ensure_future(test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "sleep", "params": [0.05], "id": 1}'
+        ))
+        await asyncio.sleep(0)
+        await test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "sleep", "params": [0], "id": 2}'
+        )
+        await test_app.handle_request_raw(response_writer, b'[{"jsonrpc": "2.0", "method": "sleep", '
+                                                           b'"params": [0], "id": 3}, 1, '
+                                                           b'{"jsonrpc": "2.0", "method": "sleep", '
+                                                           b'"params": [0]}]')
+        await first
+
+    test_app.loop.run_until_complete(send_requests())
+    responses = [json.loads(call.args[0]) for call in response_writer.write.call_args_list]
+    busy_error = {"code": ServerBusyError.err_code, "message": "Server busy"}
+    assert responses == [
+        {"jsonrpc": "2.0", "error": busy_error, "id": 2},
+        [{"jsonrpc": "2.0", "error": busy_error, "id": 3},
+         {"jsonrpc": "2.0", "error": busy_error, "id": "null"}],
+        {"jsonrpc": "2.0", "result": 0.05, "id": 1}
+    ]
+    assert test_app.admission.inflight == 0
+
+
+def test_record_metrics():
+    test_app = JsonRPC2(metrics=Metrics())
+    response_writer = Mock()
+    response_writer.write = AsyncMock()
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    def wait(seconds):
+        time.sleep(seconds)
+
+    test_app.add_method(wait, need_multithreading=True)
+
+    async def send_requests():
+        await test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}'
+        )
+        await test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "add", "params": [1], "id": 2}'
+        )
+        await test_app.handle_request_raw(
+            response_writer, b'[{"jsonrpc": "2.0", "method": "wait", "params": [0], "id": 3}, '
+                             b'{"jsonrpc": "2.0", "method": "not_exist", "id": 4}]'
+        )
+        await test_app.handle_request_raw(response_writer, b'{"jsonrpc": "2.0", "method"')
+        await test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "rpc.metrics", "id": 5}'
+        )
+
+    try:
+        test_app.loop.run_until_complete(send_requests())
+    finally:
+        test_app.shutdown_executors()
+
+    result = json.loads(response_writer.write.call_args.args[0])["result"]
+    methods = result["methods"]
+    assert methods["add"]["calls"] == 2
+    assert methods["add"]["errors"] == {"-32602": 1}
+    assert set(methods["add"]["latency"]) == {"parse", "validate", "execute", "serialize"}
+    assert methods["add"]["latency"]["execute"]["count"] == 1
+    assert methods["wait"]["calls"] == 1
+    assert methods["wait"]["latency"]["execute"]["count"] == 1
+    assert methods["rpc.batch"]["calls"] == 1
+    assert set(methods["rpc.batch"]["latency"]) == {"parse", "serialize"}
+    assert methods["rpc.invalid"]["calls"] == 2
+    assert methods["rpc.invalid"]["errors"] == {"-32601": 1, "-32700": 1}
+    assert result["gauges"]["connections"] == 0
+    assert result["gauges"]["thread_executor_queue_depth"] == 0
+
+
+def test_queue_depth_of_other_executors():
+    # the executors which don't have the private attributes of the standard ones
+    test_app = JsonRPC2(metrics=Metrics(), thread_executor=Mock(spec=[]),
+                        process_executor=Mock(spec=[]))
+    gauges = test_app.metrics.to_json()["gauges"]
+    assert "thread_executor_queue_depth" not in gauges
+    assert "process_executor_queue_depth" not in gauges
+
+
+def test_record_metrics_of_rejected_requests():
+    test_app = JsonRPC2(metrics=Metrics(), admission=AdmissionControl(method_limits={"add": 1}))
+
+    @test_app.rpc_call
+    def add(num1, num2):
+        return num1 + num2
+
+    response_writer = Mock()
+    response_writer.write = AsyncMock()
+
+    async def send_request():
+        # the slot of "add" is taken by another request
+        await test_app.admission.acquire(["add"])
+        await test_app.handle_request_raw(
+            response_writer, b'{"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}'
+        )
+
+    test_app.loop.run_until_complete(send_request())
+
+    assert test_app.metrics.methods["add"].errors == {-32002: 1}
+    assert test_app.metrics.to_json()["counters"]["admission_rejected"] == 1
+    assert test_app.metrics.to_json()["gauges"]["admission_queue_depth"] == 0
+
+
+def test_cache_results(test_app: JsonRPC2):
+    calls = []
+
+    @test_app.rpc_call(cache=True)
+    def add(num1, num2):
+        calls.append((num1, num2))
+        return num1 + num2
+
+    async def send_requests():
+        return [
+            await test_app.handle_simple_rpc_call(
+                {"jsonrpc": "2.0", "method": "add", "params": params, "id": i}
+            )
+            for i, params in enumerate([{"num1": 1, "num2": 2}, {"num2": 2, "num1": 1},
+                                        [1], [2, 3]])
+        ]
+
+    responses = test_app.loop.run_until_complete(send_requests())
+    assert [response.to_json() for response in responses[:2]] == [
+        {"jsonrpc": "2.0", "result": 3, "id": 0},
+        {"jsonrpc": "2.0", "result": 3, "id": 1}
+    ]
+    # the errors are not cached
+    assert isinstance(responses[2].error, InvalidParamsError)
+    assert calls == [(1, 2), (2, 3)]
+    assert test_app.get_cache_stats()["add"] == {
+        "size": 2, "hits": 1, "misses": 2, "coalesced": 0, "evictions": 0
+    }
+
+    assert test_app.invalidate_cache("add", {"num1": 1, "num2": 2}) == 1
+    test_app.loop.run_until_complete(send_requests())
+    assert calls == [(1, 2), (2, 3), (1, 2)]
+
+
+def test_cache_results_of_batched_requests(test_app: JsonRPC2):
+    calls = []
+
+    def slow_add(num1, num2):
+        calls.append((num1, num2))
+        time.sleep(0.01)
+        return num1 + num2
+
+    test_app.add_method(slow_add, need_multithreading=True, cache=ResultCache(max_size=10))
+    request_data = [
+        {"jsonrpc": "2.0", "method": "slow_add", "params": [1, 2], "id": 1},
+        {"jsonrpc": "2.0", "method": "slow_add", "params": [1, 2], "id": 2},
+        {"jsonrpc": "2.0", "method": "slow_add", "params": [1, 2]},
+        {"jsonrpc": "2.0", "method": "slow_add", "params": [2, 3], "id": 3}
+    ]
+    try:
+        responses = test_app.loop.run_until_complete(test_app.handle_batched_rpc_call(request_data))
+    finally:
+        test_app.shutdown_executors()
+
+    assert [response.to_json()["result"] for response in responses] == [3, 3, 5]
+    # the identical calls share one execution
+    assert sorted(calls) == [(1, 2), (2, 3)]
+    assert test_app.get_cache_stats()["slow_add"]["coalesced"] == 2
+
+
+def test_invalidate_cache_of_module_method(test_app: JsonRPC2):
+    module = Module("math")
+
+    @module.rpc_call(cache=True)
+    def double(num):
+        return num * 2
+
+    test_app.register_module(module)
+    request_data = {"jsonrpc": "2.0", "method": "math/double", "params": [2], "id": 1}
+    test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+
+    assert test_app.invalidate_cache("math.double") == 1
+    assert test_app.invalidate_cache() == 0
+    # the method has no cache
+    test_app.add_method(duplicate_add)
+    with pytest.raises(ValueError):
+        test_app.invalidate_cache("duplicate_add")
+
+
+def test_shared_cache_of_module_methods(test_app: JsonRPC2):
+    cache = ResultCache()
+    module_a, module_b = Module("a"), Module("b")
+
+    @module_a.rpc_call(cache=cache)
+    def get(key):
+        return f"a:{key}"
+
+    def make_get_of_b():
+        def get(key):
+            return f"b:{key}"
+        return get
+
+    module_b.add_method(make_get_of_b(), cache=cache)
+    test_app.register_module(module_a)
+    test_app.register_module(module_b)
+
+    def call(method):
+        request_data = {"jsonrpc": "2.0", "method": method, "params": ["x"], "id": 1}
+        response = test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+        return response.result
+
+    assert call("a.get") == "a:x"
+    # the methods with the same name in different modules don't share the results
+    assert call("b.get") == "b:x"
+    assert call("a/get") == "a:x"
+    assert cache.hits == 1
+    assert test_app.invalidate_cache("b/get", ["x"]) == 1
+    assert call("a.get") == "a:x"
+    assert len(cache) == 1
+
+
+def test_record_cache_metrics():
+    test_app = JsonRPC2(metrics=Metrics())
+    counters = test_app.metrics.to_json()["counters"]
+    # the counters are omitted when there is no cache
+    assert "cache_hits" not in counters
+
+    @test_app.rpc_call(cache=True)
+    def add(num1, num2):
+        return num1 + num2
+
+    request_data = {"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}
+    for _ in range(3):
+        test_app.loop.run_until_complete(test_app.handle_simple_rpc_call(request_data))
+
+    counters = test_app.metrics.to_json()["counters"]
+    assert counters["cache_hits"] == 2
+    assert counters["cache_misses"] == 1
+    assert counters["cache_evictions"] == 0
+    assert test_app.metrics.to_json()["gauges"]["cache_size"] == 1
+    assert "ajson_rpc2_cache_hits_total 2.0" in test_app.metrics.to_prometheus().splitlines()
+    assert test_app.metrics.methods["add"].calls == 3
@@ -0,0 +1,107 @@
+''' test for signature module '''
+from .context import MethodSignature
+
+
+def simple_rpc_call(num1, num2):
+    return num1 - num2
+
+
+def default_rpc_call(num1, num2=3):
+    return num1 - num2
+
+
+def kwonly_rpc_call(num1, *, num2, num3=4):
+    return num1 + num2 + num3
+
+
+def varargs_rpc_call(num1, *nums):
+    return num1 + sum(nums)
+
+
+def varkw_rpc_call(num1, **options):
+    return num1
+
+
+def positional_only_rpc_call(num1, /, num2):
+    return num1 - num2
+
+
+def test_signature_descriptor():
+    signature = MethodSignature(kwonly_rpc_call)
+    assert signature.required_positional == 1
+    assert signature.max_positional == 1
+    assert signature.keywords == {"num1", "num2", "num3"}
+    assert signature.required_keywords == {"num1", "num2"}
+    assert signature.kwonly == {"num2", "num3"}
+    assert signature.var_positional is False
+    assert signature.var_keyword is False
+
+
+def test_validator_with_positional_params():
+    is_params_invalid = MethodSignature(default_rpc_call).compile_validator()
+
+    assert is_params_invalid([1]) is False
+    assert is_params_invalid([1, 2]) is False
+    assert is_params_invalid([]) is True
+    assert is_params_invalid([1, 2, 3]) is True
+    assert is_params_invalid(None) is True
+
+
+def test_validator_with_keyword_params():
+    is_params_invalid = MethodSignature(simple_rpc_call).compile_validator()
+
+    assert is_params_invalid({"num1": 1, "num2": 2}) is False
+    assert is_params_invalid({"num1": 1}) is True
+    assert is_params_invalid({"num1": 1, "num2": 2, "num3": 3}) is True
+
+
+def test_validator_with_keyword_only_params():
+    is_params_invalid = MethodSignature(kwonly_rpc_call).compile_validator()
+
+    assert is_params_invalid({"num1": 1, "num2": 2}) is False
+    assert is_params_invalid({"num1": 1, "num2": 2, "num3": 3}) is False
+    assert is_params_invalid({"num1": 1}) is True
+    # keyword-only argument can't be passed by position
+    assert is_params_invalid([1, 2]) is True
+    assert is_params_invalid(None) is True
+
+
+def test_validator_with_var_positional_params():
+    is_params_invalid = MethodSignature(varargs_rpc_call).compile_validator()
+
+    assert is_params_invalid([1]) is False
+    assert is_params_invalid([1, 2, 3, 4, 5]) is False
+    assert is_params_invalid([]) is True
+    assert is_params_invalid({"num1": 1}) is False
+    assert is_params_invalid({"num1": 1, "nums": [2]}) is True
+
+
+def test_validator_with_var_keyword_params():
+    is_params_invalid = MethodSignature(varkw_rpc_call).compile_validator()
+
+    assert is_params_invalid({"num1": 1, "foo": 2, "bar": 3}) is False
+    assert is_params_invalid({"foo": 2}) is True
+    assert is_params_invalid([1]) is False
+    assert is_params_invalid([1, 2]) is True
+
+
+def test_validator_with_positional_only_params():
+    is_params_invalid = MethodSignature(positional_only_rpc_call).compile_validator()
+
+    assert is_params_invalid([1, 2]) is False
+    assert is_params_invalid({"num1": 1, "num2": 2}) is True
+
+
+def test_validator_with_no_parameter_method():
+    is_params_invalid = MethodSignature(lambda: 3).compile_validator()
+
+    assert is_params_invalid(None) is False
+    assert is_params_invalid([]) is False
+    assert is_params_invalid({}) is False
+    assert is_params_invalid([1]) is True
+
+
+def test_validator_with_undetectable_signature():
+    # some builtin functions don't provide signature
+    is_params_invalid = MethodSignature(getattr).compile_validator()
+    assert is_params_invalid([1, 2]) is False
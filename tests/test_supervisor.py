@@ -0,0 +1,79 @@
+''' test for supervisor module and multi-process server mode '''
+import json
+import time
+import socket
+import threading
+import multiprocessing
+
+from .context import Supervisor, JsonRPC2
+
+fork_context = multiprocessing.get_context("fork")
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_supervisor_start_workers():
+    started = fork_context.Value('i', 0)
+
+    def target():
+        with started.get_lock():
+            started.value += 1
+        time.sleep(10)
+
+    supervisor = Supervisor(target, workers=3, shutdown_timeout=1)
+    threading.Timer(0.5, supervisor.stop).start()
+    supervisor.run()
+
+    assert started.value == 3
+    for process in supervisor.processes:
+        assert process.is_alive() is False
+
+
+def test_supervisor_restart_dead_worker():
+    started = fork_context.Value('i', 0)
+
+    def target():
+        with started.get_lock():
+            started.value += 1
+            if started.value <= 2:
+                # the first two workers die immediately
+                return
+        time.sleep(10)
+
+    supervisor = Supervisor(target, workers=1, shutdown_timeout=1, restart_delay=0)
+    threading.Timer(1, supervisor.stop).start()
+    supervisor.run()
+
+    assert started.value == 3
+
+
+def test_start_server_with_multiple_workers():
+    port = _get_free_port()
+    app = JsonRPC2()
+
+    @app.rpc_call
+    def subtract(num1, num2):
+        return num1 - num2
+
+    server_process = fork_context.Process(target=app.start, args=(port, 2))
+    server_process.start()
+    try:
+        for _ in range(50):
+            try:
+                client = socket.create_connection(("127.0.0.1", port))
+            except ConnectionRefusedError:
+                time.sleep(0.1)
+            else:
+                break
+        with client:
+            client.sendall(b'{"jsonrpc": "2.0", "method": "subtract", "params": [42, 23], "id": 1}\n')
+            resp = json.loads(client.makefile('rb').readline())
+        assert resp == {"jsonrpc": "2.0", "result": 19, "id": 1}
+    finally:
+        server_process.terminate()
+        server_process.join(10)
+    assert server_process.exitcode is not None
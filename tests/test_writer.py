@@ -0,0 +1,95 @@
+''' test for writer module '''
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from .context import ResponseWriter, OverflowPolicy, WriteBufferOverflow
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def writer():
+    mock_writer = Mock()
+    mock_writer.drain = AsyncMock()
+    mock_writer.transport.get_write_buffer_size.return_value = 0
+    return mock_writer
+
+
+def test_coalesce_writes_in_same_iteration(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop)
+
+    async def write_responses():
+        await response_writer.write(b'1\n')
+        await response_writer.write(b'2\n')
+        await response_writer.write(b'3\n')
+        # let the loop run the scheduled flush
+        await asyncio.sleep(0)
+
+    loop.run_until_complete(write_responses())
+
+    writer.write.assert_not_called()
+    writer.writelines.assert_called_once_with([b'1\n', b'2\n', b'3\n'])
+    writer.drain.assert_not_called()
+
+
+def test_single_write_is_not_joined(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop)
+
+    loop.run_until_complete(response_writer.write(b'1\n'))
+    response_writer.flush()
+
+    writer.write.assert_called_once_with(b'1\n')
+    writer.writelines.assert_not_called()
+
+
+def test_set_transport_high_water_mark(loop, writer: Mock):
+    ResponseWriter(writer, loop, buffer_limit=1024)
+    writer.transport.set_write_buffer_limits.assert_called_once_with(high=1024)
+
+
+def test_block_when_exceed_buffer_limit(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop, buffer_limit=4)
+    writer.transport.get_write_buffer_size.return_value = 3
+
+    loop.run_until_complete(response_writer.write(b'12\n'))
+
+    writer.write.assert_called_once_with(b'12\n')
+    writer.drain.assert_awaited_once()
+
+
+def test_close_when_exceed_buffer_limit(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop, buffer_limit=4,
+                                     overflow_policy=OverflowPolicy.CLOSE)
+
+    with pytest.raises(WriteBufferOverflow):
+        loop.run_until_complete(response_writer.write(b'12345\n'))
+
+    writer.transport.abort.assert_called_once_with()
+    writer.write.assert_not_called()
+    assert response_writer.buffer_size == 0
+
+
+def test_drain_flush_buffer(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop)
+
+    loop.run_until_complete(response_writer.write(b'1\n'))
+    loop.run_until_complete(response_writer.drain())
+
+    writer.write.assert_called_once_with(b'1\n')
+    writer.drain.assert_awaited_once()
+
+
+def test_close_flush_buffer(loop, writer: Mock):
+    response_writer = ResponseWriter(writer, loop)
+
+    loop.run_until_complete(response_writer.write(b'1\n'))
+    response_writer.close()
+
+    writer.write.assert_called_once_with(b'1\n')
+    writer.close.assert_called_once()